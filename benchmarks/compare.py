@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+保存したベンチマーク結果の比較
+pytest-benchmarkが .benchmarks/ に保存した2回分の結果（既定は最新とその1つ前）を
+ベンチマークごとに比べ、処理速度（rows/s）とピークメモリの変化を表示する。
+しきい値を超えて悪化したものがあれば終了コード1を返す（CIで使う）。
+
+使い方:
+    pytest benchmarks --benchmark-autosave         # 結果をコミットIDつきで保存
+    python benchmarks/compare.py [基準.json 比較.json] [--max-slowdown 10] [--max-memory-growth 10]
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+STORAGE = Path(__file__).resolve().parent.parent / ".benchmarks"
+
+
+def saved_runs(storage: Path = STORAGE) -> list[Path]:
+    """保存済みの結果（古い順）"""
+    return sorted(storage.glob("*/*.json"), key=lambda path: path.name)
+
+
+def load(path: Path) -> tuple[str, dict[str, dict]]:
+    """(コミットID, {ベンチマーク名: extra_info + mean})"""
+    data = json.loads(path.read_text(encoding="utf-8"))
+    commit = (data.get("commit_info") or {}).get("id", "")[:10] or path.stem
+    results = {
+        bench["fullname"]: {**bench["extra_info"], "mean": bench["stats"]["mean"]}
+        for bench in data["benchmarks"]
+    }
+    return commit, results
+
+
+def change(before: float, after: float) -> float:
+    """変化率（%）"""
+    return (after - before) / before * 100 if before else 0.0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compare two saved benchmark runs")
+    parser.add_argument("runs", nargs="*", type=Path, help="基準と比較の結果ファイル")
+    parser.add_argument("--max-slowdown", type=float, default=10.0, help="許容する速度低下（%%）")
+    parser.add_argument(
+        "--max-memory-growth", type=float, default=10.0, help="許容するピークメモリ増加（%%）"
+    )
+    args = parser.parse_args()
+
+    runs = args.runs or saved_runs()[-2:]
+    if len(runs) != 2:
+        print("❌ 比較する結果が2つありません（pytest benchmarks --benchmark-autosave で保存）")
+        return 2
+
+    (base_commit, base), (head_commit, head) = load(runs[0]), load(runs[1])
+    print(f"📊 {base_commit} → {head_commit}")
+    print(f"{'benchmark':<60} {'rows/s':>10} {'peak MiB':>10}")
+
+    regressions = []
+    for name in sorted(base.keys() & head.keys()):
+        before, after = base[name], head[name]
+        # rows_per_secは速いほど大きい（低下がマイナス）
+        speed = change(before.get("rows_per_sec", 0), after.get("rows_per_sec", 0))
+        memory = change(before.get("peak_mib", 0), after.get("peak_mib", 0))
+        mark = ""
+        if speed < -args.max_slowdown or memory > args.max_memory_growth:
+            regressions.append(name)
+            mark = " ⚠️"
+        print(f"{name:<60} {speed:>+9.1f}% {memory:>+9.1f}%{mark}")
+
+    if regressions:
+        print(f"❌ {len(regressions)}件が悪化しました")
+        return 1
+    print("✅ 悪化はありません")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+"""ベンチマークの共通設定
+
+件数はBENCH_SIZES（カンマ区切り、既定は 1000,10000,100000）で指定する。1M件は
+BENCH_SIZES=1000000 のように明示したときだけ測る。
+
+各ベンチマークは時間のほかに、1回分の実行を別にtracemallocで測った
+ピークメモリ（peak_mib）と1秒あたりの件数（rows_per_sec）をextra_infoに残す。
+"""
+
+import importlib.util
+import os
+import tracemalloc
+from pathlib import Path
+
+import pytest
+
+from benchmarks.synthetic import notion_pages, supabase_rows
+
+BENCH_SIZES = [int(n) for n in os.getenv("BENCH_SIZES", "1000,10000,100000").split(",")]
+
+_SCRIPT = Path(__file__).resolve().parent.parent / "scripts" / "sync_notion_to_supabase.py"
+
+
+def pytest_generate_tests(metafunc):
+    if "size" in metafunc.fixturenames:
+        metafunc.parametrize("size", BENCH_SIZES, ids=[f"{n:_}" for n in BENCH_SIZES])
+
+
+_rows_cache: dict[int, list[dict]] = {}
+_pages_cache: dict[int, list[dict]] = {}
+
+
+@pytest.fixture
+def rows(size: int) -> list[dict]:
+    """notion_ordersの行（件数ごとに1回だけ作る）"""
+    if size not in _rows_cache:
+        _rows_cache[size] = supabase_rows(size)
+    return _rows_cache[size]
+
+
+@pytest.fixture
+def pages(size: int) -> list[dict]:
+    """Notion APIのページ（件数ごとに1回だけ作る）"""
+    if size not in _pages_cache:
+        _pages_cache[size] = notion_pages(size)
+    return _pages_cache[size]
+
+
+@pytest.fixture(scope="session")
+def sync():
+    """同期スクリプト（scripts/sync_notion_to_supabase.py）"""
+    spec = importlib.util.spec_from_file_location("sync_notion_to_supabase", _SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+def measure(benchmark, size: int):
+    """benchmark(fn, *args)を実行し、ピークメモリと件数あたりの速度を記録する
+
+    setupを渡すと各回の前にsetup()を呼ぶ（測定には含めない。キャッシュを消す場合など）。
+    """
+
+    def run(fn, *args, setup=None, rounds: int = 5):
+        if setup is None:
+            result = benchmark(fn, *args)
+        else:
+            result = benchmark.pedantic(fn, args, setup=setup, rounds=rounds, iterations=1)
+        # --benchmark-disable では1回実行するだけで統計が無いので記録しない
+        if benchmark.stats is None:
+            return result
+
+        if setup is not None:
+            setup()
+        tracemalloc.start()
+        try:
+            fn(*args)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        benchmark.extra_info["rows"] = size
+        benchmark.extra_info["peak_mib"] = round(peak / 2**20, 2)
+        benchmark.extra_info["rows_per_sec"] = round(size / benchmark.stats.stats.mean)
+        return result
+
+    return run
@@ -0,0 +1,109 @@
+"""ベンチマーク用のローカルPostgRESTスタブ
+
+127.0.0.1の空いているポートでnotion_ordersのGETだけに応答するHTTPサーバーを
+別スレッドで動かす。Supabaseには接続せず、実際のHTTP（keep-alive・gzip・
+ストリーミング）を通してダッシュボードの取得処理を測れるようにする。
+
+- Range / Range-Unit: items でページを返し、Prefer: count=exact なら総件数を付ける
+- select で指定された列だけを返す（ダッシュボードの射影のselectならproject_rowで射影する）
+- Accept-Encoding: gzip ならgzipで返す
+
+レスポンス本文は(select, 範囲, gzip)ごとに1回だけ作り、以降は使い回す
+（スタブ側のJSON化の時間を測定に混ぜないため）。
+"""
+
+import gzip
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from management_dashboard.projection import ORDER_PROJECTION_SELECT, project_row
+from management_dashboard.supabase_api import ORDERS_PATH
+
+
+class SupabaseStub:
+    """rowsをnotion_ordersとして返すスタブ（withで起動・停止）"""
+
+    def __init__(self, rows: list[dict]):
+        self.rows = rows
+        self.requests = 0
+        self._bodies: dict[tuple, bytes] = {}
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _handler(self))
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self) -> "SupabaseStub":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+    def body(self, select: tuple[str, ...], start: int, end: int, compress: bool) -> bytes:
+        key = (select, start, end, compress)
+        with self._lock:
+            body = self._bodies.get(key)
+        if body is None:
+            page = self.rows[start:end]
+            if ",".join(select) == ORDER_PROJECTION_SELECT:
+                page = [project_row(row) for row in page]
+            elif select != ("*",):
+                page = [{column: row.get(column) for column in select} for row in page]
+            body = json.dumps(page, ensure_ascii=False).encode()
+            if compress:
+                body = gzip.compress(body, compresslevel=1)
+            with self._lock:
+                self._bodies[key] = body
+        return body
+
+
+def _handler(stub: SupabaseStub) -> type[BaseHTTPRequestHandler]:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self) -> None:
+            stub.requests += 1
+            url = urlsplit(self.path)
+            if url.path != ORDERS_PATH:
+                self._send(404, b"[]", {})
+                return
+
+            total = len(stub.rows)
+            start, end = 0, total - 1
+            if "Range" in self.headers:
+                start, end = (int(x) for x in self.headers["Range"].split("-"))
+            if start >= total and total:
+                self._send(416, b"", {"Content-Range": f"*/{total}"})
+                return
+            end = min(end, total - 1)
+
+            select = tuple(parse_qs(url.query).get("select", ["*"])[0].split(","))
+            compress = "gzip" in self.headers.get("Accept-Encoding", "")
+            count = str(total) if "count=exact" in self.headers.get("Prefer", "") else "*"
+            headers = {"Content-Range": f"{start}-{end}/{count}"}
+            if compress:
+                headers["Content-Encoding"] = "gzip"
+            self._send(206, stub.body(select, start, end + 1, compress), headers)
+
+        def _send(self, status: int, body: bytes, headers: dict[str, str]) -> None:
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args) -> None:
+            pass
+
+    return Handler
@@ -0,0 +1,113 @@
+"""ベンチマーク用の合成データ
+
+data/notion_cost_records_sample.json のレコードを雛形に、
+data/notion_cost_schema.json の型・選択肢に沿って値をばらした発注をn件作る。
+
+- export_records: Notionエクスポート形式（プロパティ名 → 値のフラットなdict）
+- notion_pages: Notion APIのページ形式（同期スクリプトの入力）
+- supabase_rows: notion_ordersの行（ダッシュボードの入力）
+
+同じ(n, seed)からは同じデータができる。
+"""
+
+import json
+import random
+import uuid
+from datetime import date, timedelta
+from functools import cache
+from pathlib import Path
+
+from management_dashboard.notion_export import export_record_to_page
+from management_dashboard.notion_properties import compile_extractor, load_schema, page_to_record
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+SAMPLE_PATH = DATA_DIR / "notion_cost_records_sample.json"
+SCHEMA_PATH = DATA_DIR / "notion_cost_schema.json"
+
+SYNCED_AT = "2026-01-07T13:34:07+00:00"
+# supabase_rowsで同期スクリプトの変換を通す件数（これを超える分は申請日・金額を変えた複製）
+ROW_POOL_SIZE = 20_000
+# 申請日を散らす期間（日）と、選択肢・日付を空にする割合（サンプルと同程度）
+DATE_SPAN_DAYS = 730
+EMPTY_RATE = 0.2
+
+
+@cache
+def schema() -> dict:
+    return load_schema(SCHEMA_PATH)
+
+
+@cache
+def sample_records() -> list[dict]:
+    return json.loads(SAMPLE_PATH.read_text(encoding="utf-8"))["records"]
+
+
+def _options(prop: dict) -> list[str]:
+    return [option["name"] for option in prop.get("options", [])]
+
+
+def export_records(n: int, seed: int = 0) -> list[dict]:
+    """エクスポート形式の発注をn件作る"""
+    rng = random.Random(seed)
+    properties = schema()
+    choices = {
+        name: _options(prop)
+        for name, prop in properties.items()
+        if prop["type"] in ("select", "status", "multi_select") and _options(prop)
+    }
+    dates = [name for name, prop in properties.items() if prop["type"] == "date"]
+    start = date(2024, 1, 1)
+    templates = sample_records()
+
+    records = []
+    for i in range(n):
+        record = dict(templates[i % len(templates)])
+        record["id"] = str(uuid.UUID(int=rng.getrandbits(128)))
+        record["発注決裁名"] = f"{record.get('発注決裁名') or '発注'} #{i}"
+        for name, options in choices.items():
+            if rng.random() < EMPTY_RATE:
+                record[name] = [] if properties[name]["type"] == "multi_select" else None
+            elif properties[name]["type"] == "multi_select":
+                record[name] = rng.sample(options, k=min(len(options), rng.randint(1, 2)))
+            else:
+                record[name] = rng.choice(options)
+        for name in dates:
+            offset = rng.randrange(DATE_SPAN_DAYS)
+            record[name] = None if rng.random() < EMPTY_RATE / 4 else str(start + timedelta(offset))
+        unit_price = rng.randint(10, 300) * 50
+        quantity = rng.randint(1, 40)
+        record["時給/数量単価"] = unit_price
+        record["時間/数量"] = quantity
+        record["総支給額"] = unit_price * quantity
+        records.append(record)
+    return records
+
+
+def notion_pages(n: int, seed: int = 0) -> list[dict]:
+    """Notion APIのページ形式の発注をn件作る"""
+    return [export_record_to_page(record, schema()) for record in export_records(n, seed)]
+
+
+def supabase_rows(n: int, seed: int = 0) -> list[dict]:
+    """notion_ordersの行をn件作る
+
+    ROW_POOL_SIZE件までは同期スクリプトと同じ変換を通し、それを超える分は
+    その行を複製してnotion_id・申請日・総支給額だけを変える（1M件を現実的な時間で作るため）。
+    """
+    extract = compile_extractor(schema())
+    pool = [
+        page_to_record(page, extract, SYNCED_AT)
+        for page in notion_pages(min(n, ROW_POOL_SIZE), seed)
+    ]
+    rng = random.Random(seed + 1)
+    start = date(2024, 1, 1)
+    rows = pool
+    for i in range(len(pool), n):
+        row = pool[i % len(pool)]
+        properties = dict(row["properties"])
+        properties["申請日"] = str(start + timedelta(rng.randrange(DATE_SPAN_DAYS)))
+        properties["総支給額"] = rng.randint(10, 300) * 50 * rng.randint(1, 40)
+        rows.append(
+            {**row, "notion_id": str(uuid.UUID(int=rng.getrandbits(128))), "properties": properties}
+        )
+    return rows
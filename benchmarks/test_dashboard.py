@@ -0,0 +1,71 @@
+"""ダッシュボード側（取得・集計・一覧）のベンチマーク."""
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from benchmarks.supabase_stub import SupabaseStub  # noqa: E402
+from management_dashboard.dataset import DatasetBuilder  # noqa: E402
+from management_dashboard.http_client import create_client  # noqa: E402
+from management_dashboard.management_dashboard import State  # noqa: E402
+from management_dashboard.supabase_api import iter_order_pages  # noqa: E402
+
+
+def _state(rows: list[dict]) -> State:
+    state = State(_reflex_internal_init=True)
+    state._process_data(rows)
+    return state
+
+
+def test_process_data(measure, rows):
+    """行のパース・列データ化・期間別集計（State._process_data）."""
+
+    def process():
+        _state(rows)
+
+    measure(process)
+
+
+def test_filtered_orders_page_turn(measure, rows):
+    """ページ送り1回ごとのfiltered_orders（並び替え済みの行から1ページ分を作る）."""
+    state = _state(rows)
+    pages = iter(range(10**9))
+
+    def turn():
+        state.set_page(next(pages) % state.page_count)
+        return state.filtered_orders
+
+    assert len(measure(turn)) == min(len(rows), state.page_size)
+
+
+def test_filtered_orders_resort(measure, rows):
+    """並び替え1回ごとのfiltered_orders（全件の並び替えを含む）."""
+    state = _state(rows)
+
+    def clear_sorted():
+        # 並び替え結果は列データごとにキャッシュされるので、毎回消して並び替えから測る
+        state._columns._sorted.clear()
+
+    def resort():
+        state.set_sort("amount")
+        return state.filtered_orders
+
+    measure(resort, setup=clear_sorted)
+
+
+def test_load_from_supabase_stub(measure, rows):
+    """ローカルのPostgRESTスタブからの全件取得とデータセット作成（HTTP・gzip・JSONデコード込み）."""
+    with SupabaseStub(rows) as stub:
+
+        async def load():
+            builder = DatasetBuilder()
+            async with create_client(stub.url) as client:
+                async for page, page_rows in iter_order_pages(client):
+                    builder.add_rows(page_rows, page=page)
+            return builder.build()
+
+        dataset = measure(lambda: asyncio.run(load()))
+
+    assert dataset.total_count == len(rows)
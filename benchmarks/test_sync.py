@@ -0,0 +1,24 @@
+"""同期スクリプト側（Notionページの変換）のベンチマーク."""
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+
+def test_extract_simple_properties(measure, sync, pages):
+    """Notionのpropertiesからnotion_orders.propertiesへの変換."""
+    properties = [page["properties"] for page in pages]
+
+    def extract():
+        return [sync.extract_simple_properties(p) for p in properties]
+
+    assert len(measure(extract)) == len(pages)
+
+
+def test_convert_page_to_record(measure, sync, pages):
+    """ページからupsertするレコードへの変換（content_hashの計算を含む）."""
+
+    def convert():
+        return [sync.convert_page_to_record(page) for page in pages]
+
+    assert len(measure(convert)) == len(pages)
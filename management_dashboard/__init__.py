@@ -0,0 +1,7 @@
+"""発注管理ダッシュボード
+
+同期スクリプト（scripts/sync_notion_to_supabase.py）と共有するモジュールは、
+Reflex・NumPyを入れずに動くよう標準ライブラリとhttpxだけに依存する:
+http_client・json_stream・retry・metrics・logging_config・notion_properties・
+notion_export・bulk_load（psycopgはCOPYでロードするときだけ読み込む）。
+"""
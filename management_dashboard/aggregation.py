@@ -0,0 +1,38 @@
+"""期間別集計（Python集計 / Postgres RPC集計）"""
+
+import asyncio
+import os
+
+import httpx
+
+from management_dashboard.models import AggregateItem
+from management_dashboard.supabase_api import fetch_period_totals
+
+# "python": 取得した行からPythonで集計（ローカル実行向け）
+# "rpc": Postgresの order_period_totals で集計し、表示するバケットだけ受け取る
+AGGREGATION_MODE = os.getenv("DASHBOARD_AGGREGATION", "python")
+
+# 集計モードごとの表示バケット数
+PERIOD_LIMITS = {"daily": 30, "weekly": 12, "monthly": 12}
+
+
+def to_aggregate_items(granularity: str, rows: list[dict]) -> list[AggregateItem]:
+    """RPCの結果をAggregateItemに変換（週次は期間名に「週」を付ける）"""
+    suffix = "週" if granularity == "weekly" else ""
+    return [
+        AggregateItem(period=f"{row['period']}{suffix}", count=row["count"], total=row["total"])
+        for row in rows
+    ]
+
+
+async def fetch_period_aggregates(
+    client: httpx.AsyncClient | None = None,
+) -> dict[str, list[AggregateItem]]:
+    """日次・週次・月次の集計をRPCで並列に取得（OrderDatasetのフィールド名で返す）"""
+    results = await asyncio.gather(
+        *(fetch_period_totals(g, limit, client) for g, limit in PERIOD_LIMITS.items())
+    )
+    return {
+        f"{granularity}_agg": to_aggregate_items(granularity, rows)
+        for granularity, rows in zip(PERIOD_LIMITS, results, strict=True)
+    }
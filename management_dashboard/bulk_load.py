@@ -0,0 +1,112 @@
+"""PostgresへのCOPYによるnotion_ordersの一括ロード（初回のバックフィル用）
+
+PostgREST経由のupsert（100件ずつのJSON POST）の代わりに、Postgresへ直接つないで
+1トランザクションで次を行う:
+
+1. 一時テーブル（notion_orders_staging）を作る
+2. COPY ... FROM STDIN でレコードを流し込む（text形式、列はCOPY_COLUMNS）
+3. 1つのINSERT ... ON CONFLICT (notion_id) でnotion_ordersにマージする
+   （content_hashが同じ行は書き換えない）
+
+psycopg（v3）が必要だが任意の依存なので、使うときにだけimportする。
+"""
+
+from collections.abc import AsyncIterable, Callable
+from dataclasses import dataclass
+
+from management_dashboard.notion_export import COPY_COLUMNS
+
+STAGING_TABLE = "notion_orders_staging"
+
+_COLUMNS = ", ".join(COPY_COLUMNS)
+
+CREATE_STAGING_SQL = f"""
+CREATE TEMP TABLE {STAGING_TABLE} (
+  notion_id TEXT NOT NULL,
+  properties JSONB NOT NULL,
+  content_hash TEXT,
+  notion_created_at TIMESTAMPTZ,
+  notion_updated_at TIMESTAMPTZ,
+  synced_at TIMESTAMPTZ
+) ON COMMIT DROP
+"""
+
+COPY_SQL = f"COPY {STAGING_TABLE} ({_COLUMNS}) FROM STDIN"
+
+# 同じnotion_idが複数あると ON CONFLICT が失敗するので、最後に編集されたものだけを残す
+MERGE_SQL = f"""
+INSERT INTO notion_orders ({_COLUMNS})
+SELECT DISTINCT ON (notion_id) {_COLUMNS}
+FROM {STAGING_TABLE}
+ORDER BY notion_id, notion_updated_at DESC NULLS LAST
+ON CONFLICT (notion_id) DO UPDATE SET
+  properties = EXCLUDED.properties,
+  content_hash = EXCLUDED.content_hash,
+  notion_created_at = EXCLUDED.notion_created_at,
+  notion_updated_at = EXCLUDED.notion_updated_at,
+  synced_at = EXCLUDED.synced_at
+WHERE notion_orders.content_hash IS DISTINCT FROM EXCLUDED.content_hash
+"""
+
+# ハイウォーターマークは後退させない
+SYNC_STATE_SQL = """
+INSERT INTO sync_state (source, high_water_mark, updated_at)
+VALUES (%s, %s, NOW())
+ON CONFLICT (source) DO UPDATE SET
+  high_water_mark = GREATEST(sync_state.high_water_mark, EXCLUDED.high_water_mark),
+  updated_at = NOW()
+"""
+
+
+@dataclass
+class LoadResult:
+    """COPYした行数と、notion_ordersに挿入・更新された行数"""
+
+    staged: int = 0
+    merged: int = 0
+
+    @property
+    def unchanged(self) -> int:
+        return self.staged - self.merged
+
+
+def _import_psycopg():
+    try:
+        import psycopg
+    except ImportError:
+        raise RuntimeError(
+            "psycopg is required for COPY bulk load: pip install 'psycopg[binary]>=3.1'"
+        ) from None
+    return psycopg
+
+
+async def bulk_load(
+    dsn: str,
+    chunks: AsyncIterable[str],
+    *,
+    source: str | None = None,
+    high_water_mark: Callable[[], str | None] | None = None,
+) -> LoadResult:
+    """COPYのtext形式の文字列（1レコード1行）を流し込み、最後にまとめてマージする
+
+    sourceとhigh_water_markを渡すと、COPYが終わった後にhigh_water_mark()の値で
+    sync_stateを同じトランザクション内で更新する。途中で失敗したら何も書き込まない。
+    """
+    psycopg = _import_psycopg()
+    result = LoadResult()
+    async with (
+        await psycopg.AsyncConnection.connect(dsn) as conn,
+        conn.cursor() as cursor,
+    ):
+        await cursor.execute(CREATE_STAGING_SQL)
+        async with cursor.copy(COPY_SQL) as copy:
+            async for text in chunks:
+                if text:
+                    await copy.write(text)
+                    result.staged += text.count("\n")
+        await cursor.execute(MERGE_SQL)
+        result.merged = cursor.rowcount
+        if source is not None and high_water_mark is not None and (hwm := high_water_mark()):
+            await cursor.execute(SYNC_STATE_SQL, (source, hwm))
+    # 例外なく抜けるとAsyncConnectionがコミットする
+    return result
@@ -0,0 +1,241 @@
+"""発注データの列指向表現
+
+全発注をOrderItem（pydantic）のリストで持つ代わりに、金額はNumPy配列、
+職務範囲・ステータス・媒体・申請日は辞書エンコード（コード配列＋ラベル表）で持つ。
+画面に送るときだけ表示行をOrderItemに戻す。
+"""
+
+from collections.abc import Sequence
+from functools import cached_property
+
+import numpy as np
+
+from management_dashboard.models import OrderItem
+from management_dashboard.search import SearchIndex
+
+# 並び替えキー（それ以外は取得順＝同期が新しい順）
+SORT_KEYS = ("amount", "date", "status")
+
+
+def encode(values: Sequence[str]) -> tuple[np.ndarray, list[str]]:
+    """文字列を(コード配列, ラベル表)に辞書エンコード"""
+    table: dict[str, int] = {}
+    codes = np.fromiter(
+        (table.setdefault(value, len(table)) for value in values),
+        dtype=np.int32,
+        count=len(values),
+    )
+    return codes, list(table)
+
+
+def encode_more(values: Sequence[str], labels: list[str]) -> tuple[np.ndarray, list[str]]:
+    """既存のラベル表に続けて辞書エンコード（既存のコードは変わらない）
+
+    新しいラベルがあるときはラベル表をコピーして追記する（元のラベル表は共有中のため変更しない）。
+    """
+    table = {label: code for code, label in enumerate(labels)}
+    codes = np.fromiter(
+        (table.setdefault(value, len(table)) for value in values),
+        dtype=np.int32,
+        count=len(values),
+    )
+    return codes, labels if len(table) == len(labels) else list(table)
+
+
+def _compact(codes: np.ndarray, labels: list[str]) -> tuple[np.ndarray, list[str]]:
+    """使われなくなったラベルをラベル表から除き、コードを振り直す"""
+    used = np.bincount(codes, minlength=len(labels)) > 0
+    if used.all():
+        return codes, labels
+    remap = (np.cumsum(used) - 1).astype(np.int32)
+    return remap[codes], [label for label, ok in zip(labels, used.tolist(), strict=True) if ok]
+
+
+def _without(values: list[str], rows: list[int]) -> list[str]:
+    """rowsの位置を除いたリスト（除く行が少ない前提で、コピーしてから削除する）"""
+    values = list(values)
+    for row in sorted(rows, reverse=True):
+        del values[row]
+    return values
+
+
+def _label_ranks(labels: list[str]) -> np.ndarray:
+    """ラベルの文字列順での順位（コードを順位に置き換えると文字列順に並ぶ）"""
+    ranks = np.empty(len(labels), dtype=np.int32)
+    ranks[np.argsort(np.array(labels, dtype=object), kind="stable")] = np.arange(len(labels))
+    return ranks
+
+
+class OrderColumns:
+    """発注の列指向データ（作成後は変更しない）
+
+    行番号はdatasetの並び順（同期が新しい順）。
+    並び替え結果と検索インデックスはオブジェクトごとに1回だけ作る。
+    """
+
+    def __init__(
+        self,
+        notion_ids: list[str],
+        names: list[str],
+        amounts: np.ndarray,
+        date_codes: np.ndarray,
+        date_labels: list[str],
+        scope_codes: np.ndarray,
+        scope_labels: list[str],
+        status_codes: np.ndarray,
+        status_labels: list[str],
+        platform_codes: np.ndarray,
+        platform_labels: list[str],
+    ):
+        self.notion_ids = notion_ids
+        self.names = names
+        self.amounts = amounts
+        self.date_codes = date_codes
+        self.date_labels = date_labels
+        self.scope_codes = scope_codes
+        self.scope_labels = scope_labels
+        self.status_codes = status_codes
+        self.status_labels = status_labels
+        self.platform_codes = platform_codes
+        self.platform_labels = platform_labels
+        self._sorted: dict[tuple[str, bool], np.ndarray] = {}
+
+    @classmethod
+    def from_orders(cls, orders: Sequence[OrderItem]) -> "OrderColumns":
+        date_codes, date_labels = encode([o.date for o in orders])
+        scope_codes, scope_labels = encode([o.scope for o in orders])
+        status_codes, status_labels = encode([o.status for o in orders])
+        platform_codes, platform_labels = encode([o.platform for o in orders])
+        return cls(
+            notion_ids=[o.notion_id for o in orders],
+            names=[o.name for o in orders],
+            amounts=np.fromiter((o.amount for o in orders), dtype=np.int64, count=len(orders)),
+            date_codes=date_codes,
+            date_labels=date_labels,
+            scope_codes=scope_codes,
+            scope_labels=scope_labels,
+            status_codes=status_codes,
+            status_labels=status_labels,
+            platform_codes=platform_codes,
+            platform_labels=platform_labels,
+        )
+
+    def __len__(self) -> int:
+        return len(self.notion_ids)
+
+    def __getstate__(self) -> dict:
+        # 並び替え結果や検索インデックスは再作成できるのでStateの永続化に含めない
+        state = self.__dict__.copy()
+        state["_sorted"] = {}
+        state.pop("search_index", None)
+        return state
+
+    def take(self, rows: np.ndarray) -> "OrderColumns":
+        """指定した行だけの列データを作る"""
+        row_list = rows.tolist()
+        return OrderColumns(
+            notion_ids=[self.notion_ids[i] for i in row_list],
+            names=[self.names[i] for i in row_list],
+            amounts=self.amounts[rows],
+            date_codes=self.date_codes[rows],
+            date_labels=self.date_labels,
+            scope_codes=self.scope_codes[rows],
+            scope_labels=self.scope_labels,
+            status_codes=self.status_codes[rows],
+            status_labels=self.status_labels,
+            platform_codes=self.platform_codes[rows],
+            platform_labels=self.platform_labels,
+        )
+
+    def patched(self, items: Sequence[OrderItem], drop_rows: np.ndarray) -> "OrderColumns":
+        """先頭にitemsを加え、drop_rowsの行を除いた列データを作る（差分マージ用）
+
+        行ごとのPython処理はitemsとdrop_rowsの分だけで、残りの行は配列のコピーで済ませる。
+        申請日のラベル表は追記のみ（コードを集計の配列の添字に使うため）、
+        職務範囲・ステータス・媒体のラベル表は使われなくなったラベルを除く。
+        """
+        keep = np.ones(len(self), dtype=bool)
+        keep[drop_rows] = False
+        drop_list = drop_rows.tolist()
+
+        def merged(values: list[str], new_values: list[str]) -> list[str]:
+            return new_values + (_without(values, drop_list) if drop_list else values)
+
+        def codes(old: np.ndarray, labels: list[str], new_values: list[str]):
+            new_codes, labels = encode_more(new_values, labels)
+            return np.concatenate([new_codes, old[keep]]), labels
+
+        date_codes, date_labels = codes(self.date_codes, self.date_labels, [o.date for o in items])
+        scope_codes, scope_labels = _compact(
+            *codes(self.scope_codes, self.scope_labels, [o.scope for o in items])
+        )
+        status_codes, status_labels = _compact(
+            *codes(self.status_codes, self.status_labels, [o.status for o in items])
+        )
+        platform_codes, platform_labels = _compact(
+            *codes(self.platform_codes, self.platform_labels, [o.platform for o in items])
+        )
+        new_amounts = np.fromiter((o.amount for o in items), dtype=np.int64, count=len(items))
+        return OrderColumns(
+            notion_ids=merged(self.notion_ids, [o.notion_id for o in items]),
+            names=merged(self.names, [o.name for o in items]),
+            amounts=np.concatenate([new_amounts, self.amounts[keep]]),
+            date_codes=date_codes,
+            date_labels=date_labels,
+            scope_codes=scope_codes,
+            scope_labels=scope_labels,
+            status_codes=status_codes,
+            status_labels=status_labels,
+            platform_codes=platform_codes,
+            platform_labels=platform_labels,
+        )
+
+    def to_items(self, rows: np.ndarray | None = None) -> list[OrderItem]:
+        """指定した行（省略時は全行）をOrderItemに戻す"""
+        row_list = range(len(self)) if rows is None else rows.tolist()
+        return [
+            OrderItem(
+                notion_id=self.notion_ids[i],
+                name=self.names[i],
+                scope=self.scope_labels[self.scope_codes[i]],
+                amount=int(self.amounts[i]),
+                date=self.date_labels[self.date_codes[i]],
+                status=self.status_labels[self.status_codes[i]],
+                platform=self.platform_labels[self.platform_codes[i]],
+            )
+            for i in row_list
+        ]
+
+    def sorted_rows(self, sort_key: str, descending: bool) -> np.ndarray:
+        """並び替えた行番号（同じ値どうしは取得順を保つ）"""
+        rows = self._sorted.get((sort_key, descending))
+        if rows is not None:
+            return rows
+
+        if sort_key == "amount":
+            key = self.amounts
+        elif sort_key == "date":
+            key = _label_ranks(self.date_labels)[self.date_codes]
+        elif sort_key == "status":
+            key = _label_ranks(self.status_labels)[self.status_codes]
+        else:
+            key = None
+
+        if key is None:
+            rows = np.arange(len(self)) if descending else np.arange(len(self))[::-1]
+        else:
+            rows = np.argsort(-key if descending else key, kind="stable")
+        self._sorted[(sort_key, descending)] = rows
+        return rows
+
+    @cached_property
+    def search_index(self) -> SearchIndex:
+        """発注決裁名の検索インデックス（初回検索時に1回だけ作成）"""
+        return SearchIndex(self.names)
+
+    def search(self, query: str) -> np.ndarray:
+        """発注決裁名にqueryを含む行番号"""
+        return np.asarray(self.search_index.search(query), dtype=np.int64)
+
+
+EMPTY_COLUMNS = OrderColumns.from_orders([])
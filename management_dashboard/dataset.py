@@ -0,0 +1,233 @@
+"""発注データセット（パース・集計済みデータ）"""
+
+from dataclasses import dataclass, field
+from datetime import timedelta
+from functools import cached_property
+
+import numpy as np
+
+from management_dashboard.columns import EMPTY_COLUMNS, OrderColumns
+from management_dashboard.metrics import span
+from management_dashboard.models import AggregateItem, OrderItem
+from management_dashboard.periods import date_totals, label_aggregates, parse_date
+from management_dashboard.projection import parse_projected_order
+from management_dashboard.rollup import RollupCube
+
+
+@dataclass
+class OrderDataset:
+    """集計済み発注データ（全セッションで共有するため読み取り専用として扱う）"""
+
+    columns: OrderColumns = EMPTY_COLUMNS
+    daily_agg: list[AggregateItem] = field(default_factory=list)
+    weekly_agg: list[AggregateItem] = field(default_factory=list)
+    monthly_agg: list[AggregateItem] = field(default_factory=list)
+    total_amount: int = 0
+    version: str = ""
+
+    @property
+    def orders(self) -> list[OrderItem]:
+        """全発注をOrderItemとして取り出す（表示用には使わない）"""
+        return self.columns.to_items()
+
+    @property
+    def total_count(self) -> int:
+        return len(self.columns)
+
+    @property
+    def avg_amount(self) -> int:
+        return self.total_amount // self.total_count if self.total_count else 0
+
+    @cached_property
+    def cube(self) -> RollupCube:
+        """フィルタ・期間指定の集計用キューブ（最初に使われたときに1回だけ作る）"""
+        return RollupCube(self.columns)
+
+
+def data_version(count: int, latest_synced_at: str) -> str:
+    """件数と最新のsynced_atからデータバージョンを算出"""
+    return f"{count}:{latest_synced_at}"
+
+
+def period_keys(date_str: str) -> tuple[str, str, str] | None:
+    """申請日から(日, 週初め, 月)の集計キーを求める（日付でなければNone）
+
+    1件ずつ求める参照実装。データセットの集計はperiods.label_aggregatesで行う。
+    """
+    dt = parse_date(date_str)
+    if dt is None:
+        return None
+    week_start = dt - timedelta(days=dt.weekday())
+    return date_str, week_start.strftime("%Y-%m-%d"), dt.strftime("%Y-%m")
+
+
+def parse_order(row: dict) -> OrderItem:
+    """notion_ordersの1行をOrderItemに変換（射影した行・propertiesを丸ごと持つ行のどちらも可）"""
+    if "properties" not in row:
+        return parse_projected_order(row)
+    props = row.get("properties", {})
+    raw_amount = props.get("総支給額", 0) or 0
+
+    try:
+        amount = int(float(raw_amount))
+    except (ValueError, TypeError):
+        amount = 0
+
+    return OrderItem(
+        notion_id=row.get("notion_id", ""),
+        name=str(props.get("発注決裁名", "-") or "-"),
+        scope=str(props.get("職務範囲", "-") or "-"),
+        amount=amount,
+        date=str(props.get("申請日", "-") or "-"),
+        status=str(props.get("発注ステータス", "-") or "-"),
+        platform=str(props.get("発注/依頼媒体", "-") or "-"),
+    )
+
+
+class DatasetBuilder:
+    """行を取り込んでnotion_idごとの最新の発注を保持する
+
+    - add_rows: 全件取得時にページ単位で取り込む（生データの行は保持しない）
+    - merge_rows: 差分行をnotion_id単位でマージし、古い発注を置き換える
+    - build: 前回のbuild以降に取り込んだ分を列データと集計に反映する（何度でも呼べる）
+
+    buildは前回の列データの先頭に取り込んだ発注を加えて置き換えられた行を除き、
+    申請日ごとの件数・合計も増減分だけ更新する。行ごとのPython処理は取り込んだ件数分だけで、
+    全件の列データ・集計は作り直さない。
+
+    aggregate_periods=Falseの場合は期間別集計を行わない（RPC集計を使う場合）。
+    """
+
+    def __init__(self, aggregate_periods: bool = True):
+        self._aggregate_periods = aggregate_periods
+        # 前回のbuild以降に取り込んだ発注（notion_idごとに最後に取り込んだもの）
+        self._pending: dict[str, OrderItem] = {}
+        self._pages: dict[int, list[OrderItem]] = {}
+        self._merged: list[OrderItem] = []
+        self._latest_synced_at = ""
+
+        self._columns = EMPTY_COLUMNS
+        # 行の通し番号（新しく加えた行ほど大きい。列データの行順に降順で並ぶ）
+        self._row_stamps = np.zeros(0, dtype=np.int64)
+        self._stamps: dict[str, int] = {}
+        # 申請日コードごとの件数・合計
+        self._date_counts = np.zeros(0, dtype=np.int64)
+        self._date_totals = np.zeros(0, dtype=np.int64)
+
+    @classmethod
+    def from_columns(
+        cls, columns: OrderColumns, watermark: str, aggregate_periods: bool = True
+    ) -> "DatasetBuilder":
+        """列データ（スナップショット）から取り込み済みの状態を復元"""
+        builder = cls(aggregate_periods)
+        builder._columns = columns
+        builder._row_stamps = np.arange(len(columns), 0, -1, dtype=np.int64)
+        builder._stamps = dict(zip(columns.notion_ids, builder._row_stamps.tolist(), strict=True))
+        builder._date_counts, builder._date_totals = date_totals(
+            columns.date_codes, columns.amounts, len(columns.date_labels)
+        )
+        builder._latest_synced_at = watermark
+        return builder
+
+    @property
+    def count(self) -> int:
+        return len(self._stamps) + sum(1 for key in self._pending if key not in self._stamps)
+
+    @property
+    def watermark(self) -> str:
+        """取り込み済みの最大synced_at"""
+        return self._latest_synced_at
+
+    @property
+    def version(self) -> str:
+        return data_version(self.count, self._latest_synced_at)
+
+    def add_rows(self, rows: list[dict], page: int = 0) -> None:
+        """行を取り込む（pageはページの並び順。到着順は問わない）"""
+        items = self._pages.setdefault(page, [])
+        with span("parse"):
+            for row in rows:
+                items.append(self._upsert(row))
+
+    def merge_rows(self, rows: list[dict]) -> None:
+        """差分行をマージ（同じ行を再度マージしても結果は変わらない）"""
+        rows = sorted(rows, key=lambda r: str(r.get("synced_at") or ""), reverse=True)
+        with span("parse"):
+            self._merged = [self._upsert(row) for row in rows] + self._merged
+
+    def _upsert(self, row: dict) -> OrderItem:
+        item = parse_order(row)
+        self._pending[item.notion_id] = item
+
+        synced_at = str(row.get("synced_at") or "")
+        if synced_at > self._latest_synced_at:
+            self._latest_synced_at = synced_at
+        return item
+
+    def build(self, version: str | None = None) -> OrderDataset:
+        """取り込んだ内容からデータセットを作成"""
+        with span("aggregate"):
+            return self._build(version)
+
+    def _build(self, version: str | None) -> OrderDataset:
+        if self._pending:
+            self._apply_pending()
+
+        daily: list[AggregateItem] = []
+        weekly: list[AggregateItem] = []
+        monthly: list[AggregateItem] = []
+        if self._aggregate_periods:
+            daily, weekly, monthly = label_aggregates(
+                self._columns.date_labels, self._date_counts, self._date_totals
+            )
+        return OrderDataset(
+            columns=self._columns,
+            daily_agg=daily,
+            weekly_agg=weekly,
+            monthly_agg=monthly,
+            total_amount=int(self._date_totals.sum()),
+            version=self.version if version is None else version,
+        )
+
+    def _apply_pending(self) -> None:
+        """取り込んだ発注を列データの先頭に加え、置き換えられた行を除く"""
+        fresh = self._merged + [item for page in sorted(self._pages) for item in self._pages[page]]
+        # 同じnotion_idを何度か取り込んだ場合は最後に取り込んだものだけを残す
+        fresh = [item for item in fresh if self._pending[item.notion_id] is item]
+        self._pending = {}
+        self._merged = []
+        self._pages = {}
+
+        # 通し番号は行順に降順なので、符号を反転して二分探索すると行番号になる
+        replaced = [
+            self._stamps[item.notion_id] for item in fresh if item.notion_id in self._stamps
+        ]
+        drop_rows = np.searchsorted(-self._row_stamps, -np.array(replaced, dtype=np.int64))
+        keep = np.ones(len(self._row_stamps), dtype=bool)
+        keep[drop_rows] = False
+
+        previous = self._columns
+        self._columns = previous.patched(fresh, drop_rows)
+
+        first = int(self._row_stamps[0]) + 1 if len(self._row_stamps) else 1
+        stamps = np.arange(first + len(fresh) - 1, first - 1, -1, dtype=np.int64)
+        self._row_stamps = np.concatenate([stamps, self._row_stamps[keep]])
+        self._stamps.update(zip((item.notion_id for item in fresh), stamps.tolist(), strict=True))
+
+        # 申請日ごとの件数・合計は、除いた行の分を引いて加えた行の分を足す
+        # （申請日のラベル表は追記のみなので、前回のコードはそのまま使える）
+        n_labels = len(self._columns.date_labels)
+        added = date_totals(
+            self._columns.date_codes[: len(fresh)], self._columns.amounts[: len(fresh)], n_labels
+        )
+        removed = date_totals(previous.date_codes[drop_rows], previous.amounts[drop_rows], n_labels)
+        grow = n_labels - len(self._date_counts)
+        self._date_counts = np.pad(self._date_counts, (0, grow)) + added[0] - removed[0]
+        self._date_totals = np.pad(self._date_totals, (0, grow)) + added[1] - removed[1]
+
+
+def build_dataset(rows: list[dict], version: str | None = None) -> OrderDataset:
+    """notion_ordersの行をパースして集計"""
+    builder = DatasetBuilder()
+    builder.add_rows(rows)
+    return builder.build(version)
@@ -0,0 +1,54 @@
+"""使い回すHTTPクライアント（ダッシュボードと同期スクリプトで共通）
+
+- プロセスで長く使うAsyncClientを作る（keep-aliveで接続を再利用し、DNS・TCP・TLSを毎回やり直さない）
+- 同時接続数の上限（max_connections）を超えるリクエストはプール側で待たせる
+- h2パッケージがあればHTTP/2を使う（1本の接続で複数のリクエストを多重化）
+- gzipでレスポンスを受け取る（展開はhttpxが行う）
+- タイムアウトは接続と読み込みで分け、リクエストごとにも上書きできる
+- read_json_array: レスポンスをストリーミングで読み、届いた分から行に変換する
+"""
+
+import importlib.util
+
+import httpx
+
+from management_dashboard.json_stream import iter_json_array
+
+# h2が入っていればHTTP/2を使う（httpx[http2]）
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+DEFAULT_TIMEOUT = httpx.Timeout(30.0, connect=10.0)
+# 使っていない接続を閉じるまでの秒数
+KEEPALIVE_EXPIRY = 60.0
+
+
+def create_client(
+    base_url: str,
+    headers: dict[str, str] | None = None,
+    *,
+    max_connections: int = 8,
+    timeout: httpx.Timeout = DEFAULT_TIMEOUT,
+    http2: bool | None = None,
+    transport: httpx.AsyncBaseTransport | None = None,
+) -> httpx.AsyncClient:
+    """接続プール付きのAsyncClientを作る（http2=Noneならh2があるときだけHTTP/2）"""
+    return httpx.AsyncClient(
+        base_url=base_url,
+        headers={"Accept-Encoding": "gzip", **(headers or {})},
+        timeout=timeout,
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+            keepalive_expiry=KEEPALIVE_EXPIRY,
+        ),
+        http2=HTTP2_AVAILABLE if http2 is None else http2,
+        transport=transport,
+    )
+
+
+async def read_json_array(response: httpx.Response) -> list:
+    """ストリーミング中のレスポンス本文（JSON配列）を逐次デコードしてリストにする
+
+    client.stream(...)で開いたレスポンスに使う。本文全体をバイト列として持たない。
+    """
+    return [item async for item in iter_json_array(response.aiter_bytes())]
@@ -0,0 +1,96 @@
+"""JSON配列の逐次デコード
+
+レスポンスやファイルを全部読んでからjson.loadsするのではなく、届いたテキストを
+少しずつ渡して、完成した要素から順に取り出す（生のバイト列と解析結果を
+同時に丸ごと持たずに済む）。要素はオブジェクトか配列であること
+（PostgRESTの行・Notionエクスポートのレコード）。
+"""
+
+import codecs
+import json
+import re
+import time
+from collections.abc import AsyncIterable, AsyncIterator
+
+from management_dashboard.metrics import observe_span, registry
+
+_SEPARATOR = re.compile(r"[\s,]*")
+_ARRAY_START = re.compile(r"\s*\[")
+
+
+class JsonArrayDecoder:
+    """JSON配列のテキストをfeedで少しずつ受け取り、完成した要素を返す
+
+    started=Trueなら先頭の "[" は読み終えている（配列の途中から渡す）ものとして扱う。
+    """
+
+    def __init__(self, started: bool = False):
+        self._decoder = json.JSONDecoder()
+        self._buf = ""
+        self._started = started
+        self.done = False
+
+    def feed(self, text: str) -> list:
+        """テキストを追加し、新たに完成した要素を返す"""
+        buf = self._buf + text if self._buf else text
+        pos = 0
+        items = []
+        if not self._started:
+            match = _ARRAY_START.match(buf)
+            if match is None:
+                if buf.strip():
+                    raise ValueError("JSON array expected")
+                self._buf = buf
+                return items
+            self._started = True
+            pos = match.end()
+
+        end = len(buf)
+        while not self.done:
+            pos = _SEPARATOR.match(buf, pos).end()
+            if pos == end:
+                break
+            if buf[pos] == "]":
+                self.done = True
+                pos += 1
+                break
+            try:
+                item, next_pos = self._decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                # 要素の途中でテキストが切れている
+                break
+            if next_pos == end and not isinstance(item, dict | list):
+                # 数値などはまだ続きがあるかもしれない
+                break
+            items.append(item)
+            pos = next_pos
+        self._buf = buf[pos:]
+        return items
+
+    def close(self) -> None:
+        """入力の終わり（配列が閉じていなければエラー）"""
+        if not self.done:
+            raise ValueError("truncated JSON array")
+
+
+async def iter_json_array(chunks: AsyncIterable[bytes]) -> AsyncIterator:
+    """UTF-8のバイト列のチャンクからJSON配列の要素を順に返す
+
+    計測が有効なら、受信待ちを除いたデコードの時間を合計してspan=decodeに記録する。
+    """
+    text_decoder = codecs.getincrementaldecoder("utf-8")()
+    decoder = JsonArrayDecoder()
+    timed = registry.enabled
+    elapsed = 0.0
+    async for chunk in chunks:
+        start = time.perf_counter() if timed else 0.0
+        items = decoder.feed(text_decoder.decode(chunk))
+        if timed:
+            elapsed += time.perf_counter() - start
+        for item in items:
+            yield item
+    for item in decoder.feed(text_decoder.decode(b"", final=True)):
+        yield item
+    decoder.close()
+    if timed:
+        observe_span("decode", elapsed)
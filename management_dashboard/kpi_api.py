@@ -0,0 +1,136 @@
+"""KPIスナップショットのJSON API
+
+画面のKPIカード（総支給額・平均単価・件数）と期間別集計を、発注一覧を読み込まずに
+取得できるようにする。Reflexのバックエンドにapi_transformerでマウントし、
+next-appなど他の社内ツールからも読めるようにする。
+
+- 中身は共有キャッシュ（OrderCache）が保持しているデータセットから作る（Supabaseには行かない）
+- JSONはデータバージョンが変わったときに1回だけ作り、以降はそのバイト列を返す
+- ETag・Cache-Controlを付け、If-None-Matchが一致すれば304を返す
+
+同じアプリに計測用の/metrics（Prometheus形式、METRICS_ENABLED=1のときだけ）も載せる。
+"""
+
+import hashlib
+import json
+import os
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse, Response
+from starlette.routing import Route
+
+from management_dashboard.aggregation import PERIOD_LIMITS
+from management_dashboard.dataset import OrderDataset
+from management_dashboard.metrics import METRICS_PATH, registry
+
+KPI_PATH = "/api/kpi"
+# ブラウザ・CDNにキャッシュさせる秒数（期限後もこの秒数の間は古い値を返しつつ再検証させる）
+KPI_MAX_AGE = int(os.getenv("KPI_CACHE_MAX_AGE", "10"))
+KPI_STALE_WHILE_REVALIDATE = int(os.getenv("KPI_STALE_WHILE_REVALIDATE", "60"))
+
+DatasetSource = Callable[[], OrderDataset | None]
+
+
+@dataclass(frozen=True)
+class KpiSnapshot:
+    """作成済みのレスポンス本文とETag"""
+
+    version: str
+    body: bytes
+    etag: str
+
+
+def kpi_payload(dataset: OrderDataset) -> dict:
+    """KPIと表示する期間別集計"""
+    return {
+        "version": dataset.version,
+        "total_count": dataset.total_count,
+        "total_amount": dataset.total_amount,
+        "avg_amount": dataset.avg_amount,
+        "total_amount_formatted": f"¥{dataset.total_amount:,}",
+        "avg_amount_formatted": f"¥{dataset.avg_amount:,}",
+        **{
+            f"{granularity}_agg": [
+                item.model_dump() for item in getattr(dataset, f"{granularity}_agg")[:limit]
+            ]
+            for granularity, limit in PERIOD_LIMITS.items()
+        },
+    }
+
+
+def render_snapshot(dataset: OrderDataset) -> KpiSnapshot:
+    body = json.dumps(kpi_payload(dataset), ensure_ascii=False, separators=(",", ":")).encode()
+    return KpiSnapshot(
+        version=dataset.version,
+        body=body,
+        etag=f'"{hashlib.sha256(body).hexdigest()[:32]}"',
+    )
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """If-None-Matchに指定されたETagのどれかが一致するか（弱いETagも比較する）"""
+    if not if_none_match:
+        return False
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+class KpiEndpoint:
+    """GET /api/kpi（データバージョンごとに作ったJSONを返す）"""
+
+    def __init__(self, source: DatasetSource):
+        self._source = source
+        self._snapshot: KpiSnapshot | None = None
+
+    def snapshot(self) -> KpiSnapshot | None:
+        dataset = self._source()
+        if dataset is None:
+            return None
+        if self._snapshot is None or self._snapshot.version != dataset.version:
+            self._snapshot = render_snapshot(dataset)
+        return self._snapshot
+
+    async def get(self, request: Request) -> Response:
+        snapshot = self.snapshot()
+        if snapshot is None:
+            # 起動直後でまだデータセットが無い
+            return JSONResponse(
+                {"error": "dataset not loaded yet"},
+                status_code=503,
+                headers={"Retry-After": "1", "Cache-Control": "no-store"},
+            )
+
+        headers = {
+            "ETag": snapshot.etag,
+            "Cache-Control": (
+                f"public, max-age={KPI_MAX_AGE}, "
+                f"stale-while-revalidate={KPI_STALE_WHILE_REVALIDATE}"
+            ),
+        }
+        if etag_matches(request.headers.get("if-none-match"), snapshot.etag):
+            return Response(status_code=304, headers=headers)
+        return Response(snapshot.body, media_type="application/json", headers=headers)
+
+
+async def metrics(request: Request) -> Response:
+    """GET /metrics（計測が無効なら404）"""
+    if not registry.enabled:
+        return PlainTextResponse("metrics disabled", status_code=404)
+    return PlainTextResponse(
+        registry.render(),
+        media_type="text/plain; version=0.0.4",
+        headers={"Cache-Control": "no-store"},
+    )
+
+
+def create_kpi_api(source: DatasetSource) -> Starlette:
+    """KPI APIと/metricsのStarletteアプリ（rx.Appのapi_transformerに渡す）"""
+    return Starlette(
+        routes=[
+            Route(KPI_PATH, KpiEndpoint(source).get, methods=["GET"]),
+            Route(METRICS_PATH, metrics, methods=["GET"]),
+        ]
+    )
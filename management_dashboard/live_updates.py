@@ -0,0 +1,100 @@
+"""発注データの更新を全セッションに配信する（上流への問い合わせはプロセスで1本）
+
+OrderFeed.runがlifespanタスクとして共有キャッシュ（OrderCache）を一定間隔で
+突き合わせる。キャッシュはまずデータバージョン（件数とsynced_atの最大値）だけを
+問い合わせ、変わっていればsynced_atのウォーターマーク以降だけを取得する。
+キャッシュのデータセットが変わると（ポーリング以外のfetch・refreshによる更新でも）、
+wait_for_changeで待っている全セッションにキャッシュが持つ最新のデータセットを渡す。
+
+開いているダッシュボードが何千あっても、Supabaseへのポーリングは1本だけで、
+待っているセッションが1つも無いときはポーリングしない。
+"""
+
+import asyncio
+import logging
+import os
+
+from management_dashboard.dataset import OrderDataset
+from management_dashboard.order_cache import OrderCache
+
+logger = logging.getLogger(__name__)
+
+# 上流（Supabase）へのポーリング間隔（秒）
+LIVE_POLL_SECONDS = float(os.getenv("LIVE_UPDATE_POLL_SECONDS", "10"))
+# セッション側の1回の待機の上限（秒）。切断されたセッションの待機はこの間隔で終わる
+LIVE_WAIT_SECONDS = float(os.getenv("LIVE_UPDATE_WAIT_SECONDS", "30"))
+
+
+class OrderFeed:
+    """共有キャッシュの更新を1本のポーリングで検出し、待っている全員に配る"""
+
+    def __init__(self, cache: OrderCache, interval: float = LIVE_POLL_SECONDS):
+        self._cache = cache
+        self._interval = interval
+        self._version = ""
+        # 次の配信で完了するFuture（待っている全セッションで共有）
+        self._changed: asyncio.Future[OrderDataset] | None = None
+        self._waiters = 0
+        self._has_waiters = asyncio.Event()
+        cache.add_listener(self.publish)
+
+    @property
+    def dataset(self) -> OrderDataset | None:
+        """配信中のデータセット（共有キャッシュが持つ最新のもの）"""
+        return self._cache.dataset
+
+    @property
+    def waiters(self) -> int:
+        """更新を待っているセッション数"""
+        return self._waiters
+
+    def publish(self, dataset: OrderDataset) -> bool:
+        """待っているセッションを起こす（前回と同じバージョンなら何もしない）
+
+        待っている側には常にキャッシュの最新のデータセットを返すので、
+        ここで受け取ったデータセットがそれより古くても巻き戻らない。
+        """
+        if dataset.version == self._version:
+            return False
+        self._version = dataset.version
+        changed, self._changed = self._changed, None
+        if changed is not None and not changed.done():
+            changed.set_result(dataset)
+        return True
+
+    async def wait_for_change(
+        self, version: str, timeout: float | None = LIVE_WAIT_SECONDS
+    ) -> OrderDataset | None:
+        """キャッシュの最新がversionと違うものになるまで待つ（timeoutまでに無ければNone）"""
+        self._waiters += 1
+        self._has_waiters.set()
+        try:
+            async with asyncio.timeout(timeout):
+                while (dataset := self._cache.dataset) is None or dataset.version == version:
+                    if self._changed is None:
+                        self._changed = asyncio.get_running_loop().create_future()
+                    # 待機側がキャンセルされても共有のFutureは残す
+                    await asyncio.shield(self._changed)
+            return dataset
+        except TimeoutError:
+            return None
+        finally:
+            self._waiters -= 1
+            if not self._waiters:
+                self._has_waiters.clear()
+
+    async def poll_once(self) -> bool:
+        """キャッシュをSupabaseと突き合わせる（変わっていればキャッシュ経由で配信される）"""
+        version = self._version
+        await self._cache.get(force=True)
+        return self._version != version
+
+    async def run(self) -> None:
+        """待っているセッションがある間だけ更新を監視し続ける（lifespanタスク）"""
+        while True:
+            await self._has_waiters.wait()
+            try:
+                await self.poll_once()
+            except Exception as e:
+                logger.warning("live update poll failed", extra={"error": str(e)})
+            await asyncio.sleep(self._interval)
@@ -0,0 +1,68 @@
+"""ダッシュボードのログ設定
+
+management_dashboardのロガーにハンドラを1つ付ける。メッセージとは別に
+extra={...}で渡した値を項目として出力する（ログ基盤で検索・集計できるように）。
+
+- LOG_LEVEL: DEBUG / INFO / WARNING / ERROR（既定はINFO）
+- LOG_FORMAT: text（「メッセージ key=value ...」）/ json（1行1オブジェクト）
+"""
+
+import json
+import logging
+import os
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text")
+
+# LogRecordが元から持つ属性（これ以外がextraで渡された項目）
+_RECORD_ATTRS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {
+    "message",
+    "asctime",
+    "taskName",
+}
+
+
+def record_fields(record: logging.LogRecord) -> dict:
+    """extraで渡された項目"""
+    return {key: value for key, value in vars(record).items() if key not in _RECORD_ATTRS}
+
+
+class KeyValueFormatter(logging.Formatter):
+    """「時刻 レベル ロガー名 メッセージ key=value ...」"""
+
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s %(name)s %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        fields = " ".join(f"{key}={value}" for key, value in record_fields(record).items())
+        return f"{line} {fields}" if fields else line
+
+
+class JsonFormatter(logging.Formatter):
+    """1行1オブジェクトのJSON"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            **record_fields(record),
+        }
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+def configure_logging(level: str = LOG_LEVEL, fmt: str = LOG_FORMAT) -> logging.Logger:
+    """management_dashboardのロガーを設定する（何度呼んでもハンドラは1つ）"""
+    logger = logging.getLogger("management_dashboard")
+    logger.setLevel(level)
+    handler = next((h for h in logger.handlers if getattr(h, "_dashboard", False)), None)
+    if handler is None:
+        handler = logging.StreamHandler()
+        handler._dashboard = True  # type: ignore[attr-defined]
+        logger.addHandler(handler)
+    handler.setFormatter(JsonFormatter() if fmt == "json" else KeyValueFormatter())
+    return logger
@@ -0,0 +1,219 @@
+"""バックエンドの計測（処理時間のスパンとPrometheus形式のメトリクス）
+
+遅い画面の原因がSupabaseの応答・JSONのデコード・発注のパース・集計・
+画面に送る差分のどれなのかを見分けるため、主要な処理の時間と量を数える。
+
+- span: withで囲んだ処理の時間をdashboard_span_seconds{span=...}に記録する
+- observe_span: まとめて測った時間を記録する（細切れの処理を合計して1回で記録する場合）
+- registry.render: Prometheusのテキスト形式で出力する（/metricsで公開する）
+
+METRICS_ENABLED=1のときだけ有効。無効の間はspanは共有の空のコンテキストを返すだけで、
+時刻の取得もロックも行わない。
+"""
+
+import bisect
+import contextlib
+import logging
+import os
+import threading
+import time
+from collections.abc import Sequence
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "0") == "1"
+METRICS_PATH = "/metrics"
+
+# 処理時間（秒）とバイト数のヒストグラムの境界
+SECONDS_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BYTES_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+logger = logging.getLogger(__name__)
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values, strict=True)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """単調増加のカウンタ（ラベルごと）"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values: dict[tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0)
+
+    def samples(self) -> list[str]:
+        return [
+            f"{self.name}{_format_labels(self.labels, key)} {_format_value(value)}"
+            for key, value in sorted(self._values.items())
+        ]
+
+
+class Histogram:
+    """累積バケット・合計・件数を持つヒストグラム（ラベルごと）"""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = SECONDS_BUCKETS,
+    ):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        # ラベルごとに[各バケットの件数..., 範囲外の件数], 合計
+        self._counts: dict[tuple[str, ...], list[int]] = {}
+        self._sums: dict[tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._counts.get(labels)
+            if counts is None:
+                counts = self._counts[labels] = [0] * (len(self.buckets) + 1)
+                self._sums[labels] = 0.0
+            counts[index] += 1
+            self._sums[labels] += value
+
+    def count(self, *labels: str) -> int:
+        return sum(self._counts.get(labels, ()))
+
+    def sum(self, *labels: str) -> float:
+        return self._sums.get(labels, 0.0)
+
+    def samples(self) -> list[str]:
+        lines = []
+        for key in sorted(self._counts):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), self._counts[key], strict=True):
+                cumulative += count
+                le = f'le="{_format_value(float(bound))}"'
+                lines.append(
+                    f"{self.name}_bucket{_format_labels(self.labels, key, le)} {cumulative}"
+                )
+            labels = _format_labels(self.labels, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(self._sums[key])}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Registry:
+    """メトリクスの登録先（enabledがFalseの間は記録しない）"""
+
+    def __init__(self, enabled: bool = METRICS_ENABLED):
+        self.enabled = enabled
+        self._metrics: dict[str, Counter | Histogram] = {}
+
+    def counter(self, name: str, help: str, labels: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help, labels))
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = SECONDS_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, help, labels, buckets))
+
+    def _register(self, metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"metric already registered: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        """Prometheusのテキスト形式（version 0.0.4）"""
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+SPAN_SECONDS = registry.histogram(
+    "dashboard_span_seconds", "Time spent in instrumented backend steps.", ["span"]
+)
+SPAN_ERRORS = registry.counter(
+    "dashboard_span_errors_total", "Instrumented backend steps that raised.", ["span"]
+)
+STATE_DELTA_BYTES = registry.histogram(
+    "dashboard_state_delta_bytes",
+    "Serialized size of state deltas sent to the browser.",
+    buckets=BYTES_BUCKETS,
+)
+STATE_RECOMPUTES = registry.counter(
+    "dashboard_computed_var_recomputes_total", "Computed var recomputations.", ["var"]
+)
+
+
+class _Span:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self) -> "_Span":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        elapsed = time.perf_counter() - self.start
+        SPAN_SECONDS.observe(elapsed, self.name)
+        if exc_type is not None:
+            SPAN_ERRORS.inc(self.name)
+        logger.debug("span finished", extra={"span": self.name, "seconds": round(elapsed, 6)})
+
+    # async withでも使えるようにする（awaitを挟む処理もまとめて測る）
+    async def __aenter__(self) -> "_Span":
+        return self.__enter__()
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        self.__exit__(exc_type, exc, tb)
+
+
+_DISABLED = contextlib.nullcontext()
+
+
+def span(name: str) -> contextlib.nullcontext | _Span:
+    """with・async withで囲んだ処理の時間を記録する（無効なら何もしない）"""
+    if not registry.enabled:
+        return _DISABLED
+    return _Span(name)
+
+
+def observe_span(name: str, seconds: float) -> None:
+    """まとめて測った処理時間を記録する"""
+    if registry.enabled:
+        SPAN_SECONDS.observe(seconds, name)
@@ -0,0 +1,23 @@
+"""データモデル"""
+
+from pydantic import BaseModel
+
+
+class OrderItem(BaseModel):
+    """発注アイテム"""
+
+    notion_id: str = ""
+    name: str = ""
+    scope: str = ""
+    amount: int = 0
+    date: str = ""
+    status: str = ""
+    platform: str = ""
+
+
+class AggregateItem(BaseModel):
+    """集計アイテム"""
+
+    period: str = ""
+    count: int = 0
+    total: int = 0
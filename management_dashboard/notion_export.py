@@ -0,0 +1,217 @@
+"""NotionのJSONエクスポートからの一括インポート（オフラインのバックフィル用）
+
+data/notion_cost_records_sample.json と同じ形式のエクスポート
+（{"records": [{"id": ..., "プロパティ名": 値, ...}, ...]}）を対象にする。
+
+- iter_export_records: ファイル全体を読み込まず、records配列を1件ずつ読み出す
+- convert_export: レコードをチャンクに分けてProcessPoolExecutorで変換する
+  （チャンクの変換・シリアライズはすべて子プロセスで行い、親は読み出しと書き出しだけ）
+- 出力はSupabaseへのupsert用のレコード、NDJSON、PostgresのCOPY（text形式）のいずれか
+
+エクスポートの値はいったんNotion APIのプロパティ形式に戻してから抽出テーブルを通すので、
+APIからの同期と同じレコード（同じcontent_hash）になる。
+"""
+
+import ast
+import json
+import logging
+import os
+import re
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+from management_dashboard.json_stream import JsonArrayDecoder
+from management_dashboard.notion_properties import (
+    DEFAULT_SCHEMA_PATH,
+    compile_extractor,
+    load_schema,
+    page_to_record,
+)
+
+logger = logging.getLogger(__name__)
+
+OUTPUT_FORMATS = ("records", "ndjson", "copy")
+# COPYファイルの列順（COPY notion_orders (...) FROM STDIN で指定する列）
+COPY_COLUMNS = (
+    "notion_id",
+    "properties",
+    "content_hash",
+    "notion_created_at",
+    "notion_updated_at",
+    "synced_at",
+)
+
+_RECORDS_START = re.compile(r'"records"\s*:\s*\[')
+_COPY_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+# 子プロセスごとに1回だけスキーマを読んで抽出テーブルを作る {スキーマのパス: (スキーマ, 抽出関数)}
+_compiled: dict[str, tuple[dict, Callable[[dict], dict]]] = {}
+
+
+def iter_export_records(path: str | os.PathLike, read_size: int = 1 << 20) -> Iterator[dict]:
+    """エクスポートのrecords配列を先頭から1件ずつ返す（メモリはread_size程度しか使わない）"""
+    with open(path, encoding="utf-8") as f:
+        buf = ""
+        while (match := _RECORDS_START.search(buf)) is None:
+            chunk = f.read(read_size)
+            if not chunk:
+                raise ValueError(f"records array not found in {path}")
+            # キーがread_sizeの境目をまたいでも見つかるよう末尾を残す
+            buf = buf[-32:] + chunk
+
+        decoder = JsonArrayDecoder(started=True)
+        chunk = buf[match.end() :]
+        while True:
+            yield from decoder.feed(chunk)
+            if decoder.done:
+                return
+            chunk = f.read(read_size)
+            if not chunk:
+                decoder.close()
+
+
+def iter_chunks(items: Iterable, size: int) -> Iterator[list]:
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def export_property(prop_type: str, value: Any) -> dict:
+    """エクスポートの値をNotion APIのプロパティ形式に戻す"""
+    if prop_type in ("title", "rich_text"):
+        payload: Any = [{"type": "text", "plain_text": value}] if value else []
+    elif prop_type in ("select", "status"):
+        payload = {"name": value} if value else None
+    elif prop_type == "multi_select":
+        payload = [{"name": v} for v in value or []]
+    elif prop_type == "people":
+        payload = [{"object": "user", "name": v} for v in value or []]
+    elif prop_type == "relation":
+        payload = [{"id": v} for v in value or []]
+    elif prop_type == "date":
+        payload = {"start": value, "end": None} if value else None
+    elif prop_type == "formula":
+        if isinstance(value, bool):
+            result_type = "boolean"
+        elif isinstance(value, str):
+            result_type = "string"
+        else:
+            result_type = "number"
+        payload = {"type": result_type, result_type: value}
+    elif prop_type == "rollup":
+        if isinstance(value, int | float):
+            payload = {"type": "number", "number": value}
+        else:
+            # エクスポートでは配列がPythonのreprになっている
+            items = ast.literal_eval(value) if isinstance(value, str) and value else value or []
+            payload = {"type": "array", "function": "show_original", "array": items}
+    else:
+        payload = value
+    return {"type": prop_type, prop_type: payload}
+
+
+def export_record_to_page(record: dict, schema: dict) -> dict:
+    """エクスポートの1レコードをNotion APIのページ形式にする"""
+    return {
+        "id": record.get("id"),
+        "created_time": record.get("created_time"),
+        "last_edited_time": record.get("last_edited_time"),
+        "properties": {
+            name: export_property(spec["type"], record[name])
+            for name, spec in schema.items()
+            if name in record
+        },
+    }
+
+
+def to_copy_line(record: dict) -> str:
+    """レコードをCOPYのtext形式の1行にする（NULLは\\N）"""
+    fields = []
+    for column in COPY_COLUMNS:
+        value = record.get(column)
+        if value is None:
+            fields.append("\\N")
+            continue
+        if not isinstance(value, str):
+            value = json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+        fields.append(value.translate(_COPY_ESCAPES))
+    return "\t".join(fields) + "\n"
+
+
+def convert_export_chunk(
+    records: list[dict], output: str, schema_path: str, synced_at: str
+) -> tuple[Any, int, int]:
+    """1チャンクを変換する（子プロセスで実行）。戻り値は(出力, 変換件数, エラー件数)
+
+    outputが"records"ならレコードのリスト、"ndjson"・"copy"ならファイルに書く文字列を返す。
+    """
+    if schema_path not in _compiled:
+        schema = load_schema(schema_path)
+        _compiled[schema_path] = (schema, compile_extractor(schema))
+    schema, extract = _compiled[schema_path]
+
+    converted = []
+    errors = 0
+    for record in records:
+        try:
+            converted.append(
+                page_to_record(export_record_to_page(record, schema), extract, synced_at)
+            )
+        except Exception as e:
+            errors += 1
+            logger.warning(
+                "export record conversion failed",
+                extra={"record": record.get("id"), "error": str(e)},
+            )
+
+    if output == "ndjson":
+        payload: Any = "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in converted)
+    elif output == "copy":
+        payload = "".join(to_copy_line(r) for r in converted)
+    else:
+        payload = converted
+    return payload, len(converted), errors
+
+
+def convert_export(
+    path: str | os.PathLike,
+    output: str = "records",
+    *,
+    workers: int | None = None,
+    chunk_size: int = 1000,
+    schema_path: str | os.PathLike = DEFAULT_SCHEMA_PATH,
+) -> Iterator[tuple[Any, int, int]]:
+    """エクスポートをチャンクごとに並列に変換し、読み出し順に結果を返す
+
+    workers個のプロセスで変換する（省略時はCPU数、1ならこのプロセスで変換）。
+    先読みするチャンクはworkersの2倍までなので、件数が多くてもメモリは一定。
+    """
+    if output not in OUTPUT_FORMATS:
+        raise ValueError(f"unknown output format: {output}")
+    workers = workers or os.cpu_count() or 1
+    synced_at = datetime.now(UTC).isoformat()
+    args = (output, str(Path(schema_path)), synced_at)
+    chunks = iter_chunks(iter_export_records(path), chunk_size)
+
+    if workers == 1:
+        for chunk in chunks:
+            yield convert_export_chunk(chunk, *args)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending: deque[Future] = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(convert_export_chunk, chunk, *args))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
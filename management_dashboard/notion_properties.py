@@ -0,0 +1,169 @@
+"""Notionプロパティの値の取り出し（スキーマから作る抽出テーブル）
+
+data/notion_cost_schema.json のプロパティ定義から {プロパティ名: 抽出関数} の表を
+1回だけ作り、ページごとにはその表を引くだけにする。
+型ごとの出力は固定（例: people・relation・multi_select・配列のrollupは常にリスト）。
+"""
+
+import hashlib
+import json
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+DEFAULT_SCHEMA_PATH = Path(__file__).resolve().parent.parent / "data" / "notion_cost_schema.json"
+
+ValueExtractor = Callable[[Any], Any]
+
+
+def _plain_text(items: list | None) -> str:
+    if not items:
+        return ""
+    if len(items) == 1:
+        return items[0].get("plain_text", "")
+    return "".join([item.get("plain_text", "") for item in items])
+
+
+def _name(value: dict | None) -> str | None:
+    return value.get("name") if value else None
+
+
+def _names(values: list | None) -> list:
+    return [name for v in values if (name := v.get("name"))] if values else []
+
+
+def _date_start(value: dict | None) -> str | None:
+    return value.get("start") if value else None
+
+
+def _relation_ids(values: list | None) -> list:
+    return [rid for v in values if (rid := v.get("id"))] if values else []
+
+
+def _unique_id(value: dict | None) -> str | int | None:
+    if not value or value.get("number") is None:
+        return None
+    prefix = value.get("prefix")
+    return f"{prefix}-{value['number']}" if prefix else value["number"]
+
+
+def _formula(value: dict | None) -> Any:
+    """formulaの結果（number/string/boolean/date）"""
+    if not value:
+        return None
+    result_type = value.get("type")
+    if result_type == "date":
+        return _date_start(value.get("date"))
+    return value.get(result_type)
+
+
+def _rollup(value: dict | None) -> Any:
+    """rollupの結果（number/dateはそのまま、arrayは各要素を取り出したリスト）"""
+    if not value:
+        return None
+    result_type = value.get("type")
+    if result_type == "number":
+        return value.get("number")
+    if result_type == "date":
+        return _date_start(value.get("date"))
+    if result_type != "array":
+        return None
+
+    values: list = []
+    for item in value.get("array") or []:
+        extracted = extract_value(item)
+        if isinstance(extracted, list):
+            values.extend(extracted)
+        elif extracted is not None and extracted != "":
+            values.append(extracted)
+    return values
+
+
+# 型ごとの抽出関数（引数はプロパティの info[型名]。Noneはその値をそのまま使う型）
+VALUE_EXTRACTORS: dict[str, ValueExtractor | None] = {
+    "title": _plain_text,
+    "rich_text": _plain_text,
+    "number": None,
+    "checkbox": None,
+    "url": None,
+    "email": None,
+    "phone_number": None,
+    "created_time": None,
+    "last_edited_time": None,
+    "select": _name,
+    "status": _name,
+    "created_by": _name,
+    "last_edited_by": _name,
+    "multi_select": _names,
+    "people": _names,
+    "relation": _relation_ids,
+    "files": _names,
+    "date": _date_start,
+    "formula": _formula,
+    "rollup": _rollup,
+    "unique_id": _unique_id,
+}
+
+
+def extract_value(info: dict) -> Any:
+    """型を見て1つのプロパティ値を取り出す（未対応の型はNone）"""
+    prop_type = info.get("type")
+    if prop_type not in VALUE_EXTRACTORS:
+        return None
+    extractor = VALUE_EXTRACTORS[prop_type]
+    value = info.get(prop_type)
+    return extractor(value) if extractor is not None else value
+
+
+def load_schema(path: str | Path = DEFAULT_SCHEMA_PATH) -> dict:
+    """スキーマファイルのプロパティ定義 {プロパティ名: {"type": ...}} を読む"""
+    return json.loads(Path(path).read_text(encoding="utf-8"))["properties"]
+
+
+def compile_extractor(schema: dict) -> Callable[[dict], dict]:
+    """スキーマからページのproperties → {プロパティ名: 値} の変換関数を作る
+
+    空の値（None・空文字・空リスト）は出力しない。スキーマに無いプロパティは型から判断する。
+    """
+    # {プロパティ名: (型名, 抽出関数)}
+    table: dict[str, tuple[str, ValueExtractor | None]] = {
+        name: (spec["type"], VALUE_EXTRACTORS[spec["type"]])
+        for name, spec in schema.items()
+        if spec.get("type") in VALUE_EXTRACTORS
+    }
+    missing = object()
+
+    def extract_properties(properties: dict) -> dict:
+        result = {}
+        for name, info in properties.items():
+            entry = table.get(name)
+            # スキーマに無い、またはスキーマ作成後に型が変わったプロパティは型から判断する
+            value = missing if entry is None else info.get(entry[0], missing)
+            if value is missing:
+                value = extract_value(info)
+            elif entry[1] is not None:
+                value = entry[1](value)
+            if value or (value is not None and value != "" and value != []):
+                result[name] = value
+        return result
+
+    return extract_properties
+
+
+def content_hash(properties: dict) -> str:
+    """propertiesの安定したハッシュ（キー順・空白に依存しないJSONのSHA-256）"""
+    canonical = json.dumps(properties, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def page_to_record(page: dict, extract: Callable[[dict], dict], synced_at: str) -> dict:
+    """Notionページをnotion_ordersのレコードにする"""
+    properties = extract(page.get("properties", {}))
+    return {
+        "notion_id": page.get("id"),
+        "properties": properties,  # JSONBとして保存
+        "content_hash": content_hash(properties),
+        "notion_created_at": page.get("created_time"),
+        "notion_updated_at": page.get("last_edited_time"),
+        "synced_at": synced_at,
+    }
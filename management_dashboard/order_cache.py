@@ -0,0 +1,220 @@
+"""発注データの共有キャッシュ（プロセス内の全Stateで共有）"""
+
+import asyncio
+import dataclasses
+import logging
+import os
+import time
+from collections.abc import Awaitable, Callable
+
+from management_dashboard.dataset import DatasetBuilder, OrderDataset
+from management_dashboard.models import AggregateItem
+from management_dashboard.snapshot import SnapshotStore
+
+# キャッシュの有効期間（秒）
+DEFAULT_TTL_SECONDS = float(os.getenv("ORDER_CACHE_TTL_SECONDS", "60"))
+# 差分更新だけで済ませる最大期間（秒）。超えたら全件を取り直して整合させる
+FULL_RELOAD_SECONDS = float(os.getenv("ORDER_CACHE_FULL_RELOAD_SECONDS", "3600"))
+
+FullLoader = Callable[[DatasetBuilder], Awaitable[None]]
+DeltaLoader = Callable[[str], Awaitable[list[dict]]]
+VersionProbe = Callable[[], Awaitable[str]]
+PeriodLoader = Callable[[], Awaitable[dict[str, list[AggregateItem]]]]
+Listener = Callable[[OrderDataset], object]
+
+logger = logging.getLogger(__name__)
+
+
+class OrderCache:
+    """TTL・データバージョン付きキャッシュ
+
+    - TTL内はSupabaseにアクセスせずキャッシュを返す
+    - 同時に来た取得要求は1本のfetchを待ち合わせる（single-flight）
+    - version_probeの結果が保持中のバージョンと同じなら何も取得しない
+    - バージョンが変わっていればsynced_atのウォーターマーク以降だけを取得してマージ
+      （件数が合わない＝削除がある場合は全件を取り直す）
+    - period_loaderを指定すると期間別集計はそちら（Postgres RPC）に任せる
+    - add_listenerで登録した関数は、保持するデータセットが変わるたびに呼ばれる
+      （経路がfetch・refresh・TTL切れ・ポーリングのどれでも）
+    - snapshotを指定すると取得のたびにデータセットを保存し、起動時にrestoreで復元する
+      （復元したデータセットはSupabaseとの突き合わせが終わるまで待たずに返す。
+      突き合わせに失敗している間はreconcile_errorにその理由が入る）
+    """
+
+    def __init__(
+        self,
+        loader: FullLoader,
+        delta_loader: DeltaLoader | None = None,
+        version_probe: VersionProbe | None = None,
+        period_loader: PeriodLoader | None = None,
+        ttl: float = DEFAULT_TTL_SECONDS,
+        full_reload_interval: float = FULL_RELOAD_SECONDS,
+        snapshot: SnapshotStore | None = None,
+    ):
+        self._loader = loader
+        self._delta_loader = delta_loader
+        self._version_probe = version_probe
+        self._period_loader = period_loader
+        self._ttl = ttl
+        self._full_reload_interval = full_reload_interval
+        self._builder: DatasetBuilder | None = None
+        self._dataset: OrderDataset | None = None
+        self._expires_at = 0.0
+        self._full_loaded_at = 0.0
+        self._inflight: asyncio.Future[OrderDataset] | None = None
+        self._snapshot = snapshot
+        self._snapshot_version = ""
+        self._snapshot_task: asyncio.Future[None] | None = None
+        # スナップショットから復元しただけで、まだSupabaseと突き合わせていない
+        self._restored = False
+        self._reconcile_error = ""
+        self._listeners: list[Listener] = []
+
+    @property
+    def dataset(self) -> OrderDataset | None:
+        """現在保持しているデータセット（期限切れでも返す）"""
+        return self._dataset
+
+    @property
+    def reconcile_error(self) -> str:
+        """復元したスナップショットをSupabaseと突き合わせられなかった理由（成功するまで残る）"""
+        return self._reconcile_error
+
+    def is_fresh(self) -> bool:
+        return self._dataset is not None and time.monotonic() < self._expires_at
+
+    def add_listener(self, listener: Listener) -> None:
+        """データセットが変わるたびに呼ぶ関数を登録する"""
+        self._listeners.append(listener)
+
+    def _set_dataset(self, dataset: OrderDataset) -> None:
+        changed = self._dataset is None or dataset.version != self._dataset.version
+        self._dataset = dataset
+        if changed:
+            for listener in self._listeners:
+                listener(dataset)
+
+    def invalidate(self) -> None:
+        """次回の取得で必ずSupabaseに問い合わせさせる"""
+        self._expires_at = 0.0
+
+    def restore(self) -> bool:
+        """スナップショットからデータセットを復元（起動時に1回。復元できたらTrue）"""
+        if self._snapshot is None or self._dataset is not None:
+            return False
+        restored = self._snapshot.load()
+        if restored is None:
+            return False
+
+        dataset, watermark = restored
+        self._builder = DatasetBuilder.from_columns(
+            dataset.columns, watermark, aggregate_periods=self._period_loader is None
+        )
+        self._set_dataset(dataset)
+        self._snapshot_version = dataset.version
+        # 突き合わせは差分で行う（件数が合わなければ全件を取り直す）
+        self._full_loaded_at = time.monotonic()
+        self._restored = True
+        return True
+
+    async def get(self, force: bool = False) -> OrderDataset:
+        """データセットを取得（force=TrueでTTLを無視して問い合わせる）"""
+        if not force and self.is_fresh():
+            return self._dataset  # type: ignore[return-value]
+
+        if self._inflight is None or self._inflight.done():
+            self._inflight = asyncio.ensure_future(self._refresh())
+            self._inflight.add_done_callback(self._on_refresh_done)
+
+        if self._restored and not force:
+            # 復元直後はスナップショットを返し、突き合わせは裏で進める
+            return self._dataset  # type: ignore[return-value]
+
+        # 待機側がキャンセルされても共有中のfetchは止めない
+        return await asyncio.shield(self._inflight)
+
+    async def _refresh(self) -> OrderDataset:
+        dataset = await self._load()
+        self._restored = False
+        self._reconcile_error = ""
+        self._save_snapshot()
+        return dataset
+
+    def _on_refresh_done(self, task: asyncio.Future[OrderDataset]) -> None:
+        """誰も待っていない突き合わせ（復元直後）の失敗を記録する"""
+        if task.cancelled():
+            return
+        error = task.exception()
+        if error is None or not self._restored:
+            return
+        self._reconcile_error = str(error) or type(error).__name__
+        logger.warning("snapshot reconcile failed", extra={"error": self._reconcile_error})
+
+    def _save_snapshot(self) -> None:
+        """データセットが変わっていればスナップショットを裏で保存"""
+        if self._snapshot is None or self._builder is None or self._dataset is None:
+            return
+        if self._dataset.version == self._snapshot_version:
+            return
+        if self._snapshot_task is not None and not self._snapshot_task.done():
+            return  # 保存中なら次の更新時に保存する
+
+        self._snapshot_version = self._dataset.version
+        self._snapshot_task = asyncio.ensure_future(
+            asyncio.to_thread(self._snapshot.save, self._dataset, self._builder.watermark)
+        )
+
+    async def _load(self) -> OrderDataset:
+        if self._can_refresh_incrementally():
+            dataset = await self._refresh_delta()
+            if dataset is not None:
+                self._expires_at = time.monotonic() + self._ttl
+                return dataset
+
+        builder = DatasetBuilder(aggregate_periods=self._period_loader is None)
+        if self._period_loader is None:
+            await self._loader(builder)
+            periods = None
+        else:
+            _, periods = await asyncio.gather(self._loader(builder), self._period_loader())
+        self._builder = builder
+        dataset = self._with_periods(builder.build(), periods)
+        self._set_dataset(dataset)
+        self._full_loaded_at = time.monotonic()
+        self._expires_at = self._full_loaded_at + self._ttl
+        return dataset
+
+    def _can_refresh_incrementally(self) -> bool:
+        return (
+            self._builder is not None
+            and self._version_probe is not None
+            and time.monotonic() - self._full_loaded_at < self._full_reload_interval
+        )
+
+    async def _refresh_delta(self) -> OrderDataset | None:
+        """差分だけで更新できればデータセットを返し、できなければNoneを返す"""
+        assert self._builder is not None and self._dataset is not None
+        assert self._version_probe is not None
+
+        version = await self._version_probe()
+        if version == self._dataset.version:
+            return self._dataset
+        if self._delta_loader is None:
+            return None
+
+        rows = await self._delta_loader(self._builder.watermark)
+        self._builder.merge_rows(rows)
+        if self._builder.version != version:
+            self._builder = None
+            return None
+
+        periods = await self._period_loader() if self._period_loader is not None else None
+        dataset = self._with_periods(self._builder.build(), periods)
+        self._set_dataset(dataset)
+        return dataset
+
+    @staticmethod
+    def _with_periods(
+        dataset: OrderDataset, periods: dict[str, list[AggregateItem]] | None
+    ) -> OrderDataset:
+        return dataclasses.replace(dataset, **periods) if periods else dataset
@@ -0,0 +1,118 @@
+"""期間別集計（NumPyによるベクトル化）
+
+申請日は列データで辞書エンコード済みなので、行ごとの処理は申請日コードでの
+bincountだけにし、日付のパースは異なる申請日ごとに1回だけ行う。
+日次・週次（月曜始まり）・月次のキーは日数の配列演算で求め、np.uniqueで集約する。
+
+申請日として扱うのはゼロ埋めのYYYY-MM-DDで実在する日付だけ（parse_date）。
+RPC集計のtry_cast_date（supabase/migrations）と同じ規則なので、
+どちらで集計しても同じ発注が同じ期間に入る。
+"""
+
+import re
+from datetime import date, datetime
+
+import numpy as np
+
+from management_dashboard.columns import OrderColumns
+from management_dashboard.models import AggregateItem
+
+# datetime64[D]の0日目（1970-01-01）のグレゴリオ序数
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+# try_cast_dateの正規表現と同じ（strptimeだけだと 2024-1-5 や 2024-01- 5 も通ってしまう）
+_DATE_PATTERN = re.compile(r"[0-9]{4}-[0-9]{2}-[0-9]{2}")
+
+
+def parse_date(value: str | None) -> date | None:
+    """申請日をdateにする（ゼロ埋めのYYYY-MM-DDで実在する日付でなければNone）"""
+    if not value or not _DATE_PATTERN.fullmatch(value):
+        return None
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except ValueError:
+        return None
+
+
+def label_ordinals(labels: list[str]) -> np.ndarray:
+    """申請日ラベルをグレゴリオ序数に変換（日付でなければ0）"""
+    ordinals = np.zeros(len(labels), dtype=np.int64)
+    for i, label in enumerate(labels):
+        if (day := parse_date(label)) is not None:
+            ordinals[i] = day.toordinal()
+    return ordinals
+
+
+def _group(
+    keys: np.ndarray, counts: np.ndarray, totals: np.ndarray
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """同じキーの件数・合計をまとめる（キーの昇順で返す）"""
+    uniq, inverse = np.unique(keys, return_inverse=True)
+    return (
+        uniq,
+        np.bincount(inverse, weights=counts, minlength=len(uniq)),
+        np.bincount(inverse, weights=totals, minlength=len(uniq)),
+    )
+
+
+def _items(
+    periods: list[str], counts: np.ndarray, totals: np.ndarray, suffix: str = ""
+) -> list[AggregateItem]:
+    """期間の新しい順のAggregateItemにする"""
+    rows = sorted(
+        zip(periods, counts.tolist(), totals.tolist(), strict=True),
+        key=lambda row: row[0],
+        reverse=True,
+    )
+    return [
+        AggregateItem(period=f"{period}{suffix}", count=round(count), total=round(total))
+        for period, count, total in rows
+    ]
+
+
+def date_totals(
+    date_codes: np.ndarray, amounts: np.ndarray, n_labels: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """申請日ラベルごとの(件数, 合計)（申請日コードを添字とするint64配列）
+
+    合計はfloat64で集計するため、2**53円未満であれば正確。
+    """
+    counts = np.bincount(date_codes, minlength=n_labels).astype(np.int64)
+    totals = np.bincount(date_codes, weights=amounts, minlength=n_labels)
+    return counts, np.rint(totals).astype(np.int64)
+
+
+def period_aggregates(
+    columns: OrderColumns,
+) -> tuple[list[AggregateItem], list[AggregateItem], list[AggregateItem]]:
+    """日次・週次・月次の集計を求める（申請日が日付でない発注は含めない）"""
+    counts, totals = date_totals(columns.date_codes, columns.amounts, len(columns.date_labels))
+    return label_aggregates(columns.date_labels, counts, totals)
+
+
+def label_aggregates(
+    date_labels: list[str], counts: np.ndarray, totals: np.ndarray
+) -> tuple[list[AggregateItem], list[AggregateItem], list[AggregateItem]]:
+    """申請日ラベルごとの件数・合計から日次・週次・月次の集計を求める
+
+    行数ではなく申請日ラベルの数に比例する処理なので、差分マージのたびに呼べる。
+    週・月をまたぐ合計はfloat64で集約するため、2**53円未満であれば正確。
+    """
+    ordinals = label_ordinals(date_labels)
+    valid = (ordinals > 0) & (counts > 0)
+    ordinals, counts, totals = ordinals[valid], counts[valid], totals[valid]
+    labels = [label for label, ok in zip(date_labels, valid.tolist(), strict=True) if ok]
+
+    # 日次: 申請日ラベルそのものが期間（ラベルは一意なので集約不要）
+    daily = _items(labels, counts, totals)
+
+    # 週次: 序数1（0001-01-01）が月曜日なので (序数-1) % 7 が曜日
+    days = (ordinals - _EPOCH_ORDINAL).astype("datetime64[D]")
+    weeks, week_counts, week_totals = _group(days - (ordinals - 1) % 7, counts, totals)
+    weekly = _items(np.datetime_as_string(weeks).tolist(), week_counts, week_totals, "週")
+
+    months, month_counts, month_totals = _group(days.astype("datetime64[M]"), counts, totals)
+    monthly = _items(np.datetime_as_string(months).tolist(), month_counts, month_totals)
+
+    return daily, weekly, monthly
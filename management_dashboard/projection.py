@@ -0,0 +1,81 @@
+"""notion_ordersの射影（ダッシュボードが使うpropertiesのキーだけを取得する）
+
+propertiesのJSONBを丸ごと受け取ると、長いリッチテキストやToDoDB・MBDBの
+リレーションIDの配列など、使わないプロパティまで転送・デコードすることになる。
+PostgRESTのselectでJSONのパス（properties->>申請日 など）を指定し、
+OrderItemのフィールド名を別名にして必要な値だけを平らな行として受け取る。
+
+- ORDER_PROJECTION_SELECT: 射影のselect（notion_id・synced_at＋各フィールド）
+- parse_projected_order: 射影した行をOrderItemにする（型はここで確定する）
+- project_row: propertiesを丸ごと持つ行を射影した行の形にする（スタブ・テスト用）
+"""
+
+import json
+import re
+
+from management_dashboard.models import OrderItem
+
+# OrderItemのフィールド → propertiesのキー
+ORDER_FIELDS = {
+    "name": "発注決裁名",
+    "scope": "職務範囲",
+    "amount": "総支給額",
+    "date": "申請日",
+    "status": "発注ステータス",
+    "platform": "発注/依頼媒体",
+}
+# JSONの数値のまま受け取るフィールド（それ以外は->>でテキストにする）
+NUMERIC_FIELDS = frozenset({"amount"})
+
+# PostgRESTのselectでそのまま書けるキー（それ以外はダブルクォートで囲む）
+_BARE_KEY = re.compile(r"\w+")
+
+
+def json_path(key: str, as_text: bool = True) -> str:
+    """propertiesのキーを指すPostgRESTのJSONパス"""
+    quoted = key if _BARE_KEY.fullmatch(key) else f'"{key}"'
+    return f"properties{'->>' if as_text else '->'}{quoted}"
+
+
+ORDER_PROJECTION_SELECT = ",".join(
+    [
+        "notion_id",
+        "synced_at",
+        *(
+            f"{field}:{json_path(key, as_text=field not in NUMERIC_FIELDS)}"
+            for field, key in ORDER_FIELDS.items()
+        ),
+    ]
+)
+
+
+def _amount(value) -> int:
+    try:
+        return int(float(value or 0))
+    except (ValueError, TypeError):
+        return 0
+
+
+def parse_projected_order(row: dict) -> OrderItem:
+    """射影した行をOrderItemに変換"""
+    return OrderItem(
+        notion_id=row.get("notion_id") or "",
+        name=str(row.get("name") or "-"),
+        scope=str(row.get("scope") or "-"),
+        amount=_amount(row.get("amount")),
+        date=str(row.get("date") or "-"),
+        status=str(row.get("status") or "-"),
+        platform=str(row.get("platform") or "-"),
+    )
+
+
+def project_row(row: dict) -> dict:
+    """propertiesを丸ごと持つ行を射影した行の形にする（PostgRESTと同じく->>は文字列）"""
+    properties = row.get("properties") or {}
+    projected = {"notion_id": row.get("notion_id"), "synced_at": row.get("synced_at")}
+    for field, key in ORDER_FIELDS.items():
+        value = properties.get(key)
+        if field not in NUMERIC_FIELDS and value is not None and not isinstance(value, str):
+            value = json.dumps(value, ensure_ascii=False)
+        projected[field] = value
+    return projected
@@ -0,0 +1,136 @@
+"""HTTPリクエストのレート制限とリトライ（Notion・Supabase共通）
+
+- TokenBucket: 1秒あたりのリクエスト数を制限（Notionは平均3req/s）
+- request_with_retry: 429・5xx・通信エラーをRetry-Afterまたは
+  ジッター付き指数バックオフで待って再試行する
+"""
+
+import asyncio
+import logging
+import random
+import time
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from email.utils import parsedate_to_datetime
+
+import httpx
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """トークンバケット方式のレートリミッタ
+
+    rate個/秒でトークンが補充され、最大capacity個まで貯まる。
+    429を受けたらpauseで全呼び出し元をまとめて待たせる。
+    """
+
+    def __init__(self, rate: float, capacity: float | None = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    async def acquire(self) -> None:
+        """トークンを1つ取る（無ければ補充されるまで待つ）"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    def pause(self, seconds: float) -> None:
+        """seconds秒間トークンを出さない（貯まっていたトークンも捨てる）"""
+        now = time.monotonic()
+        self._paused_until = max(self._paused_until, now + seconds)
+        self._tokens = 0
+        self._updated_at = self._paused_until
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """リトライ設定（max_attemptsは初回を含む試行回数）"""
+
+    max_attempts: int = 6
+    base_delay: float = 0.5
+    max_delay: float = 30.0
+
+    def backoff(self, attempt: int, rng: random.Random | None = None) -> float:
+        """attempt回目（0始まり）の失敗後の待ち時間（full jitter）"""
+        cap = min(self.max_delay, self.base_delay * 2**attempt)
+        return (rng or random).uniform(0, cap)
+
+
+DEFAULT_POLICY = RetryPolicy()
+
+
+def retry_after_seconds(response: httpx.Response) -> float | None:
+    """Retry-Afterヘッダ（秒数またはHTTP日付）を秒数にする"""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (retry_at - datetime.now(UTC)).total_seconds())
+
+
+async def request_with_retry(
+    client: httpx.AsyncClient,
+    method: str,
+    url: str,
+    *,
+    limiter: TokenBucket | None = None,
+    policy: RetryPolicy = DEFAULT_POLICY,
+    **kwargs,
+) -> httpx.Response:
+    """リクエストを送り、429・5xx・通信エラーなら待って再試行する
+
+    再試行しきれなかった場合は最後のレスポンスを返す（通信エラーはそのまま送出）。
+    """
+    for attempt in range(policy.max_attempts):
+        if limiter is not None:
+            await limiter.acquire()
+        last_attempt = attempt == policy.max_attempts - 1
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.TransportError:
+            if last_attempt:
+                raise
+            await asyncio.sleep(policy.backoff(attempt))
+            continue
+
+        if response.status_code not in RETRY_STATUSES or last_attempt:
+            return response
+
+        delay = retry_after_seconds(response)
+        if delay is None:
+            delay = policy.backoff(attempt)
+        elif limiter is not None and response.status_code == 429:
+            limiter.pause(delay)
+        logger.warning(
+            "request retrying",
+            extra={"status": response.status_code, "url": str(url), "delay": round(delay, 1)},
+        )
+        await asyncio.sleep(delay)
+
+    raise AssertionError("unreachable")
@@ -0,0 +1,183 @@
+"""集計キューブ（申請日 × 職務範囲 × ステータス × 媒体）
+
+データバージョンごとに1回だけ、全発注を (日, 職務範囲, ステータス, 媒体) のセルに
+まとめた件数・合計を作り、日の軸に沿った累積和（prefix sum）を持っておく。
+フィルタ・期間を変えたときは累積和の差を取るだけなので、行数ではなく
+バケット数（×次元の大きさ）に比例した計算で済む。
+
+日の軸は発注のある日付だけを昇順に並べたもの（最小〜最大の全日ではない）。
+1925年のような誤入力の日付が1件あっても、軸が1日伸びるだけで済む。
+期間・バケットの境界は日付の並びを二分探索して軸の位置にする。
+
+申請日が日付でない発注は日の軸に載らないので、期間を指定しない集計のために
+(職務範囲, ステータス, 媒体) ごとの件数・合計を別に持つ。
+"""
+
+from datetime import date
+
+import numpy as np
+
+from management_dashboard.columns import OrderColumns
+from management_dashboard.models import AggregateItem
+from management_dashboard.periods import label_ordinals, parse_date
+
+GRANULARITIES = ("daily", "weekly", "monthly")
+
+
+def _to_ordinal(value: str) -> int | None:
+    """YYYY-MM-DDをグレゴリオ序数にする（空・不正ならNone）"""
+    day = parse_date(value)
+    return None if day is None else day.toordinal()
+
+
+class RollupCube:
+    """日×職務範囲×ステータス×媒体の件数・合計と、その日方向の累積和（作成後は変更しない）"""
+
+    def __init__(self, columns: OrderColumns):
+        self.scope_labels = columns.scope_labels
+        self.status_labels = columns.status_labels
+        self.platform_labels = columns.platform_labels
+        dims = (len(self.scope_labels), len(self.status_labels), len(self.platform_labels))
+        cells = int(np.prod(dims))
+
+        ordinals = label_ordinals(columns.date_labels)
+        row_ordinals = ordinals[columns.date_codes]
+        # (職務範囲, ステータス, 媒体) のセル番号
+        _, n_status, n_platform = dims
+        cell = columns.scope_codes.astype(np.int64) * n_status + columns.status_codes
+        cell = cell * n_platform + columns.platform_codes
+        dated = row_ordinals > 0
+
+        undated = ~dated
+        self._undated_counts = np.bincount(cell[undated], minlength=cells).reshape(dims)
+        self._undated_totals = _int_bincount(
+            cell[undated], columns.amounts[undated], cells
+        ).reshape(dims)
+
+        # 日の軸: 発注のある日付（昇順）。軸上の位置は申請日ラベルごとに二分探索で求める
+        used = np.bincount(columns.date_codes, minlength=len(ordinals)) > 0
+        self._ordinals = np.unique(ordinals[used & (ordinals > 0)])
+        n_days = len(self._ordinals)
+        day_index = np.searchsorted(self._ordinals, ordinals)[columns.date_codes[dated]]
+        flat = day_index * cells + cell[dated]
+        counts = np.bincount(flat, minlength=n_days * cells).reshape(n_days, *dims)
+        totals = _int_bincount(flat, columns.amounts[dated], n_days * cells).reshape(n_days, *dims)
+        # 累積和: _cum[i] は軸の先頭からi日分（i=0は0）
+        self._cum_counts = np.zeros((n_days + 1, *dims), dtype=np.int64)
+        self._cum_totals = np.zeros((n_days + 1, *dims), dtype=np.int64)
+        np.cumsum(counts, axis=0, out=self._cum_counts[1:])
+        np.cumsum(totals, axis=0, out=self._cum_totals[1:])
+
+    @property
+    def n_days(self) -> int:
+        """日の軸の長さ（発注のある日付の数）"""
+        return len(self._ordinals)
+
+    def _select(self, array: np.ndarray, scope: str, status: str, platform: str) -> np.ndarray:
+        """指定した職務範囲・ステータス・媒体（空文字はすべて）のセルを合計する
+
+        arrayの末尾3軸が(職務範囲, ステータス, 媒体)。先頭の軸はそのまま残す。
+        """
+        first = array.ndim - 3
+        filters = (
+            (scope, self.scope_labels),
+            (status, self.status_labels),
+            (platform, self.platform_labels),
+        )
+        for offset, (value, labels) in enumerate(filters):
+            array = _take_label(array, first + offset, value, labels)
+        return array.sum(axis=(first, first + 1, first + 2))
+
+    def _day_range(self, date_from: str, date_to: str) -> tuple[int, int]:
+        """期間（両端を含む）を日の軸の半開区間[lo, hi)にする"""
+        lo, hi = 0, self.n_days
+        if (start := _to_ordinal(date_from)) is not None:
+            lo = int(np.searchsorted(self._ordinals, start, side="left"))
+        if (end := _to_ordinal(date_to)) is not None:
+            hi = int(np.searchsorted(self._ordinals, end, side="right"))
+        return lo, max(lo, hi)
+
+    def totals(
+        self,
+        date_from: str = "",
+        date_to: str = "",
+        scope: str = "",
+        status: str = "",
+        platform: str = "",
+    ) -> tuple[int, int]:
+        """条件に合う発注の(件数, 合計)（期間を指定しなければ申請日の無い発注も含む）"""
+        lo, hi = self._day_range(date_from, date_to)
+        bounds = np.array([lo, hi])
+        count = int(np.diff(self._select(self._cum_counts[bounds], scope, status, platform))[0])
+        total = int(np.diff(self._select(self._cum_totals[bounds], scope, status, platform))[0])
+        if not date_from and not date_to:
+            count += int(self._select(self._undated_counts[None], scope, status, platform)[0])
+            total += int(self._select(self._undated_totals[None], scope, status, platform)[0])
+        return count, total
+
+    def series(
+        self,
+        granularity: str,
+        date_from: str = "",
+        date_to: str = "",
+        scope: str = "",
+        status: str = "",
+        platform: str = "",
+    ) -> list[AggregateItem]:
+        """日次・週次（月曜始まり）・月次の集計（期間の新しい順、発注の無い期間は含めない）"""
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"unknown granularity: {granularity}")
+        lo, hi = self._day_range(date_from, date_to)
+        if lo >= hi:
+            return []
+
+        starts = self._bucket_starts(granularity, lo, hi)
+        bounds = np.append(starts, hi)
+        counts = np.diff(self._select(self._cum_counts[bounds], scope, status, platform))
+        totals = np.diff(self._select(self._cum_totals[bounds], scope, status, platform))
+
+        items = []
+        for i in np.flatnonzero(counts)[::-1].tolist():
+            day = date.fromordinal(int(self._ordinals[starts[i]]))
+            if granularity == "daily":
+                period = day.isoformat()
+            elif granularity == "weekly":
+                # 期間の途中から始まる週も週初め（月曜）で表す
+                period = f"{date.fromordinal(day.toordinal() - day.weekday()).isoformat()}週"
+            else:
+                period = day.isoformat()[:7]
+            items.append(AggregateItem(period=period, count=int(counts[i]), total=int(totals[i])))
+        return items
+
+    def _bucket_starts(self, granularity: str, lo: int, hi: int) -> np.ndarray:
+        """[lo, hi)の各バケットの先頭（日の軸の位置）"""
+        days = np.arange(lo, hi)
+        if granularity == "daily":
+            return days
+        ordinals = self._ordinals[lo:hi]
+        if granularity == "weekly":
+            # 序数1（0001-01-01）が月曜日なので、週初めの序数は 序数 - (序数-1) % 7
+            keys = ordinals - (ordinals - 1) % 7
+        else:
+            epoch = date(1970, 1, 1).toordinal()
+            keys = (ordinals - epoch).astype("datetime64[D]").astype("datetime64[M]")
+        # 週・月が前の日付と変わる位置がバケットの先頭
+        is_start = np.ones(len(keys), dtype=bool)
+        is_start[1:] = keys[1:] != keys[:-1]
+        return days[is_start]
+
+
+def _take_label(array: np.ndarray, axis: int, value: str, labels: list[str]) -> np.ndarray:
+    """axisをvalueのラベルの1列だけに絞る（空文字なら絞らない、無いラベルなら0件）"""
+    if not value:
+        return array
+    try:
+        index = labels.index(value)
+    except ValueError:
+        return np.zeros_like(np.take(array, [0], axis=axis)) if array.shape[axis] else array
+    return np.take(array, [index], axis=axis)
+
+
+def _int_bincount(indices: np.ndarray, weights: np.ndarray, length: int) -> np.ndarray:
+    """重み付きbincountを整数で（合計は2**53円未満であれば正確）"""
+    return np.rint(np.bincount(indices, weights=weights, minlength=length)).astype(np.int64)
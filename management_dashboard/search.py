@@ -0,0 +1,79 @@
+"""発注名検索（bigram転置インデックス）
+
+日本語の発注決裁名は単語区切りがないため、文字bigramで転置インデックスを作る。
+インデックスはデータバージョンごとに1回だけ作成し、全セッションで共有する。
+"""
+
+import os
+import unicodedata
+from collections import defaultdict
+from collections.abc import Iterable
+
+# "local": 読み込み済みデータをインデックスで検索
+# "remote": Postgres（pg_trgm + ilike）で全件を検索
+SEARCH_BACKEND = os.getenv("DASHBOARD_SEARCH", "local")
+# 検索ボックスの入力をまとめて送るまでの待ち時間（ミリ秒）
+SEARCH_DEBOUNCE_MS = int(os.getenv("DASHBOARD_SEARCH_DEBOUNCE_MS", "250"))
+
+_EMPTY: frozenset[int] = frozenset()
+
+
+def normalize(text: str) -> str:
+    """検索用の正規化（NFKCで全角・半角を揃えて小文字化）"""
+    return unicodedata.normalize("NFKC", text).lower()
+
+
+def bigrams(text: str) -> set[str]:
+    return {text[i : i + 2] for i in range(len(text) - 1)}
+
+
+class SearchIndex:
+    """部分一致検索用のbigram転置インデックス
+
+    searchは行番号（作成時に渡したtextsの並び順）を昇順で返す。
+    """
+
+    def __init__(self, texts: Iterable[str]):
+        self._texts = [normalize(text) for text in texts]
+
+        unigrams: dict[str, list[int]] = defaultdict(list)
+        grams: dict[str, list[int]] = defaultdict(list)
+        for row, text in enumerate(self._texts):
+            for char in set(text):
+                unigrams[char].append(row)
+            for gram in bigrams(text):
+                grams[gram].append(row)
+
+        self._unigrams = {k: frozenset(v) for k, v in unigrams.items()}
+        self._bigrams = {k: frozenset(v) for k, v in grams.items()}
+
+    def __len__(self) -> int:
+        return len(self._texts)
+
+    def search(self, query: str, limit: int | None = None) -> list[int]:
+        """queryを部分文字列として含む行番号を返す"""
+        needle = normalize(query)
+        if not needle:
+            return list(range(len(self._texts)))[:limit]
+
+        if len(needle) == 1:
+            postings = [self._unigrams.get(needle, _EMPTY)]
+        else:
+            postings = sorted(
+                (self._bigrams.get(gram, _EMPTY) for gram in bigrams(needle)), key=len
+            )
+
+        candidates = postings[0]
+        for posting in postings[1:]:
+            if not candidates:
+                break
+            candidates = candidates & posting
+
+        # bigramがすべて含まれていても連続しているとは限らないので最後に確認する
+        hits: list[int] = []
+        for row in sorted(candidates):
+            if needle in self._texts[row]:
+                hits.append(row)
+                if len(hits) == limit:
+                    break
+        return hits
@@ -0,0 +1,113 @@
+"""発注データセットのローカルスナップショット
+
+再起動・デプロイ直後に最初の利用者がSupabaseの全件取得を待たなくて済むよう、
+最後に取得できたデータセット（列データと期間別集計）をファイルに保存しておき、
+起動時にそれを読み込んで返す。Supabaseとの突き合わせはその後に差分で行う。
+
+形式は非圧縮のnpz（pickleを使わない）:
+- 数値列・コード列はそのままのNumPy配列
+- 文字列列はUTF-8を連結したバイト列と終端位置の配列
+- データバージョン・ウォーターマーク・期間別集計などはJSONでmetaに入れる
+"""
+
+import json
+import os
+import tempfile
+import zipfile
+from pathlib import Path
+
+import numpy as np
+
+from management_dashboard.columns import OrderColumns
+from management_dashboard.dataset import OrderDataset
+from management_dashboard.models import AggregateItem
+
+# スナップショットの保存先（空文字にすると無効）
+SNAPSHOT_PATH = os.getenv("ORDER_SNAPSHOT_PATH", ".snapshots/orders.npz")
+# 形式を変えたら上げる（古い形式のファイルは読まずに捨てる）
+SNAPSHOT_FORMAT = 1
+
+_STRING_COLUMNS = (
+    "notion_ids",
+    "names",
+    "date_labels",
+    "scope_labels",
+    "status_labels",
+    "platform_labels",
+)
+_CODE_COLUMNS = ("amounts", "date_codes", "scope_codes", "status_codes", "platform_codes")
+_AGG_FIELDS = ("daily_agg", "weekly_agg", "monthly_agg")
+
+
+def pack_strings(values: list[str]) -> tuple[np.ndarray, np.ndarray]:
+    """文字列のリストを(UTF-8バイト列, 各文字列の終端位置)にする"""
+    encoded = [value.encode() for value in values]
+    ends = np.cumsum(
+        np.fromiter((len(b) for b in encoded), dtype=np.int64, count=len(encoded)), dtype=np.int64
+    )
+    return np.frombuffer(b"".join(encoded), dtype=np.uint8), ends
+
+
+def unpack_strings(data: np.ndarray, ends: np.ndarray) -> list[str]:
+    raw = data.tobytes()
+    starts = [0, *ends[:-1].tolist()]
+    return [raw[s:e].decode() for s, e in zip(starts, ends.tolist(), strict=True)]
+
+
+class SnapshotStore:
+    """データセットを1ファイルに保存・復元する"""
+
+    def __init__(self, path: str | os.PathLike = SNAPSHOT_PATH):
+        self.path = Path(path)
+
+    def save(self, dataset: OrderDataset, watermark: str) -> None:
+        """データセットを保存（一時ファイルに書いてから置き換える）"""
+        columns = dataset.columns
+        arrays: dict[str, np.ndarray] = {name: getattr(columns, name) for name in _CODE_COLUMNS}
+        for name in _STRING_COLUMNS:
+            arrays[f"{name}_data"], arrays[f"{name}_ends"] = pack_strings(getattr(columns, name))
+
+        meta = {
+            "format": SNAPSHOT_FORMAT,
+            "version": dataset.version,
+            "watermark": watermark,
+            "total_amount": dataset.total_amount,
+            **{
+                field: [item.model_dump() for item in getattr(dataset, field)]
+                for field in _AGG_FIELDS
+            },
+        }
+        arrays["meta"] = np.frombuffer(json.dumps(meta, ensure_ascii=False).encode(), np.uint8)
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, **arrays)
+            os.replace(tmp, self.path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+
+    def load(self) -> tuple[OrderDataset, str] | None:
+        """保存済みの(データセット, ウォーターマーク)を読む（無い・壊れている・形式違いはNone）"""
+        if not self.path.is_file():
+            return None
+        try:
+            with np.load(self.path, allow_pickle=False) as npz:
+                meta = json.loads(npz["meta"].tobytes())
+                if meta.get("format") != SNAPSHOT_FORMAT:
+                    return None
+                fields = {name: npz[name] for name in _CODE_COLUMNS}
+                for name in _STRING_COLUMNS:
+                    fields[name] = unpack_strings(npz[f"{name}_data"], npz[f"{name}_ends"])
+        except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+            return None
+
+        dataset = OrderDataset(
+            columns=OrderColumns(**fields),
+            total_amount=meta["total_amount"],
+            version=meta["version"],
+            **{field: [AggregateItem(**item) for item in meta[field]] for field in _AGG_FIELDS},
+        )
+        return dataset, meta["watermark"]
@@ -0,0 +1,80 @@
+"""Stateの計測（computed varの再計算回数と、画面に送った差分のバイト数）
+
+イベントごとにどのcomputed varが再計算され、どれだけの差分が送られたかを数え、
+関係の無い操作（loadingの切り替えなど）で集計や一覧を作り直していないかを確かめる。
+
+- counted: computed varの関数に付けて再計算の回数を数える
+- StateMetrics.record_delta: State.get_deltaの結果をJSONにしたときのバイト数を数える
+
+差分のJSON化は計測のためだけにもう1回行うので、STATE_METRICS=1のときだけ有効にする。
+METRICS_ENABLED=1のときも有効になり、/metricsのカウンタ・ヒストグラムにも記録する。
+"""
+
+import functools
+import os
+from collections import Counter
+from collections.abc import Callable
+
+from reflex.utils.format import json_dumps
+
+from management_dashboard.metrics import STATE_DELTA_BYTES, STATE_RECOMPUTES, registry
+
+STATE_METRICS_ENABLED = os.getenv("STATE_METRICS", "0") == "1" or registry.enabled
+
+
+class StateMetrics:
+    """再計算回数と差分の送信量（プロセス全体の累計と直近の差分）"""
+
+    def __init__(self, enabled: bool = STATE_METRICS_ENABLED):
+        self.enabled = enabled
+        self.recomputes: Counter[str] = Counter()
+        self.deltas = 0
+        self.delta_bytes = 0
+        self.last_delta_bytes = 0
+        self.last_delta_vars: list[str] = []
+
+    def reset(self) -> None:
+        self.recomputes.clear()
+        self.deltas = self.delta_bytes = self.last_delta_bytes = 0
+        self.last_delta_vars = []
+
+    def record_recompute(self, name: str) -> None:
+        if self.enabled:
+            self.recomputes[name] += 1
+            if registry.enabled:
+                STATE_RECOMPUTES.inc(name)
+
+    def record_delta(self, delta: dict) -> None:
+        """1回分の差分（{state名: {var名: 値}}）の送信量を記録"""
+        if not self.enabled or not delta:
+            return
+        size = len(json_dumps(delta).encode())
+        self.deltas += 1
+        self.delta_bytes += size
+        self.last_delta_bytes = size
+        self.last_delta_vars = sorted(name for values in delta.values() for name in values)
+        if registry.enabled:
+            STATE_DELTA_BYTES.observe(size)
+
+    def snapshot(self) -> dict:
+        return {
+            "recomputes": dict(self.recomputes),
+            "deltas": self.deltas,
+            "delta_bytes": self.delta_bytes,
+            "last_delta_bytes": self.last_delta_bytes,
+            "last_delta_vars": self.last_delta_vars,
+        }
+
+
+state_metrics = StateMetrics()
+
+
+def counted(fn: Callable) -> Callable:
+    """computed varの関数を包み、呼ばれる（＝再計算される）たびに数える"""
+
+    @functools.wraps(fn)
+    def wrapper(self):
+        state_metrics.record_recompute(fn.__name__)
+        return fn(self)
+
+    return wrapper
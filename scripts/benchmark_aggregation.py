@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+期間別集計のベンチマーク
+data/notion_cost_records_sample.json から合成した行で、
+従来の1件ずつの集計ループとNumPyによるベクトル化集計を比較する
+
+使い方:
+    python scripts/benchmark_aggregation.py [件数 ...]   # 省略時は 10000 100000 1000000
+"""
+
+import gc
+import json
+import random
+import sys
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from management_dashboard.columns import OrderColumns  # noqa: E402
+from management_dashboard.dataset import build_dataset, parse_order, period_keys  # noqa: E402
+from management_dashboard.models import AggregateItem  # noqa: E402
+from management_dashboard.periods import period_aggregates  # noqa: E402
+
+SAMPLE_PATH = Path(__file__).resolve().parent.parent / "data" / "notion_cost_records_sample.json"
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+# 行の読み込みで使うプロパティだけを残す（1M件でもメモリに載るように）
+FIELDS = ["発注決裁名", "職務範囲", "総支給額", "申請日", "発注ステータス", "発注/依頼媒体"]
+
+
+def synthetic_rows(n: int, seed: int = 0) -> list[dict]:
+    """サンプルのレコードを元に、申請日（過去2年）と総支給額をばらした行を作る"""
+    records = json.loads(SAMPLE_PATH.read_text(encoding="utf-8"))["records"]
+    rng = random.Random(seed)
+    start = date(2024, 1, 1)
+    dates = [(start + timedelta(days=d)).isoformat() for d in range(730)]
+    rows = []
+    for i in range(n):
+        record = records[i % len(records)]
+        properties = {key: record.get(key) for key in FIELDS}
+        properties["申請日"] = rng.choice(dates) if i % 50 else None
+        properties["総支給額"] = rng.randint(1, 200) * 100
+        rows.append(
+            {
+                "notion_id": f"{record['id']}-{i}",
+                "properties": properties,
+                "synced_at": "2026-01-07T13:34:07+00:00",
+            }
+        )
+    return rows
+
+
+def loop_process(rows: list[dict]) -> tuple[list, list, list, int]:
+    """従来の_process_data相当（1件ずつパースしてdefaultdictで集計）"""
+    buckets = (
+        defaultdict(lambda: {"count": 0, "total": 0}),
+        defaultdict(lambda: {"count": 0, "total": 0}),
+        defaultdict(lambda: {"count": 0, "total": 0}),
+    )
+    total = 0
+    for row in rows:
+        item = parse_order(row)
+        total += item.amount
+        keys = period_keys(item.date)
+        if keys is None:
+            continue
+        for bucket, key in zip(buckets, keys, strict=True):
+            bucket[key]["count"] += 1
+            bucket[key]["total"] += item.amount
+    daily, weekly, monthly = (
+        [
+            AggregateItem(period=f"{k}{suffix}", count=v["count"], total=v["total"])
+            for k, v in sorted(bucket.items(), reverse=True)
+        ]
+        for bucket, suffix in zip(buckets, ["", "週", ""], strict=True)
+    )
+    return daily, weekly, monthly, total
+
+
+def loop_aggregate(orders: list) -> tuple[list, list, list]:
+    """従来の集計部分だけ（パース済みのOrderItemから）"""
+    buckets = (
+        defaultdict(lambda: {"count": 0, "total": 0}),
+        defaultdict(lambda: {"count": 0, "total": 0}),
+        defaultdict(lambda: {"count": 0, "total": 0}),
+    )
+    for item in orders:
+        keys = period_keys(item.date)
+        if keys is None:
+            continue
+        for bucket, key in zip(buckets, keys, strict=True):
+            bucket[key]["count"] += 1
+            bucket[key]["total"] += item.amount
+    return tuple(
+        [
+            AggregateItem(period=f"{k}{suffix}", count=v["count"], total=v["total"])
+            for k, v in sorted(bucket.items(), reverse=True)
+        ]
+        for bucket, suffix in zip(buckets, ["", "週", ""], strict=True)
+    )
+
+
+def best_of(func, repeat: int) -> tuple[float, object]:
+    """repeat回実行して最短時間（秒）と最後の結果を返す"""
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def run(n: int) -> None:
+    rows = synthetic_rows(n)
+    repeat = 3 if n <= 100_000 else 1
+
+    loop_time, (daily, weekly, monthly, total) = best_of(lambda: loop_process(rows), repeat)
+    vector_time, dataset = best_of(lambda: build_dataset(rows), repeat)
+    assert (dataset.daily_agg, dataset.weekly_agg, dataset.monthly_agg) == (daily, weekly, monthly)
+    assert dataset.total_amount == total
+
+    orders = dataset.orders
+    agg_loop_time, expected = best_of(lambda: loop_aggregate(orders), repeat)
+    columns = OrderColumns.from_orders(orders)
+    agg_vector_time, result = best_of(lambda: period_aggregates(columns), repeat)
+    assert result == expected
+
+    print(
+        f"{n:>9,} | {loop_time * 1000:>10.1f} | {vector_time * 1000:>10.1f} | "
+        f"{agg_loop_time * 1000:>10.1f} | {agg_vector_time * 1000:>10.2f} | "
+        f"x{agg_loop_time / agg_vector_time:>6.1f}"
+    )
+
+
+def main() -> None:
+    sizes = [int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES
+    # loop/build: 行からの処理全体（パース込み）、agg: 集計部分のみ。単位はミリ秒
+    print("     rows |       loop |      build |   agg loop |  agg numpy | agg speedup")
+    for n in sizes:
+        run(n)
+        gc.collect()
+
+
+if __name__ == "__main__":
+    main()
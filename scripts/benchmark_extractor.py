@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Notionプロパティ抽出のマイクロベンチマーク
+data/notion_cost_records_sample.json のレコードをスキーマに沿って
+Notion APIのproperties形式に戻し、従来のif/elif版と抽出テーブル版を比較する
+
+使い方:
+    python scripts/benchmark_extractor.py [繰り返し回数]   # 省略時は 20000
+"""
+
+import json
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from management_dashboard.notion_export import export_record_to_page  # noqa: E402
+from management_dashboard.notion_properties import (  # noqa: E402
+    compile_extractor,
+    load_schema,
+)
+
+SAMPLE_PATH = Path(__file__).resolve().parent.parent / "data" / "notion_cost_records_sample.json"
+
+
+def legacy_extract(properties: dict) -> dict:
+    """従来のextract_simple_properties（型ごとのif/elif）"""
+    result = {}
+    for name, info in properties.items():
+        prop_type = info.get("type")
+        value = None
+        if prop_type == "title":
+            texts = info.get("title", [])
+            value = texts[0].get("plain_text", "") if texts else ""
+        elif prop_type == "rich_text":
+            texts = info.get("rich_text", [])
+            value = texts[0].get("plain_text", "") if texts else ""
+        elif prop_type == "number":
+            value = info.get("number")
+        elif prop_type == "select":
+            sel = info.get("select")
+            value = sel.get("name") if sel else None
+        elif prop_type == "multi_select":
+            value = [s.get("name") for s in info.get("multi_select", [])]
+        elif prop_type == "date":
+            date_info = info.get("date")
+            value = date_info.get("start") if date_info else None
+        elif prop_type == "formula":
+            formula = info.get("formula", {})
+            value = formula.get("number") or formula.get("string")
+        elif prop_type == "status":
+            status = info.get("status")
+            value = status.get("name") if status else None
+        elif prop_type == "people":
+            value = [p.get("name", "") for p in info.get("people", [])]
+            if len(value) == 1:
+                value = value[0]
+            elif len(value) == 0:
+                value = None
+        elif prop_type == "url":
+            value = info.get("url")
+        elif prop_type == "rollup":
+            rollup = info.get("rollup", {})
+            if rollup.get("type") == "array":
+                arr = rollup.get("array", [])
+                if arr:
+                    first = arr[0]
+                    if first.get("type") == "rich_text":
+                        texts = first.get("rich_text", [])
+                        value = texts[0].get("plain_text", "") if texts else ""
+                    elif first.get("type") == "select":
+                        sel = first.get("select")
+                        value = sel.get("name") if sel else None
+        if value is not None and value != "" and value != []:
+            result[name] = value
+    return result
+
+
+def sample_pages() -> list[dict]:
+    schema = load_schema()
+    records = json.loads(SAMPLE_PATH.read_text(encoding="utf-8"))["records"]
+    return [export_record_to_page(record, schema)["properties"] for record in records]
+
+
+def per_page_us(func, pages: list[dict], runs: int) -> float:
+    seconds = min(timeit.repeat(lambda: [func(p) for p in pages], number=runs, repeat=5))
+    return seconds / (runs * len(pages)) * 1e6
+
+
+def main() -> None:
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    pages = sample_pages()
+    # 従来版が扱わない型（relation・checkbox・created_time）と、先頭要素しか見ていなかった
+    # rollupを除いたページ（同じ仕事量での比較用）
+    common_pages = [
+        {
+            name: info
+            for name, info in page.items()
+            if info["type"] not in ("relation", "checkbox", "created_time", "rollup")
+        }
+        for page in pages
+    ]
+
+    started = timeit.default_timer()
+    extract = compile_extractor(load_schema())
+    compile_ms = (timeit.default_timer() - started) * 1000
+
+    runs = max(1, repeat // len(pages))
+    print(f"pages: {len(pages)} x {runs} runs, compile: {compile_ms:.2f}ms")
+    for label, target in [("all properties", pages), ("legacy types only", common_pages)]:
+        legacy_us = per_page_us(legacy_extract, target, runs)
+        table_us = per_page_us(extract, target, runs)
+        print(
+            f"{label:>17}: if/elif {legacy_us:6.2f} µs/page, table {table_us:6.2f} µs/page "
+            f"(x{legacy_us / table_us:.2f})"
+        )
+
+
+if __name__ == "__main__":
+    main()
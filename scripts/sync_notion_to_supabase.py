@@ -2,33 +2,104 @@
 """
 Notion → Supabase 同期スクリプト（シンプル版）
 NotionのJSONデータをそのままSupabaseに保存
+
+取得・変換・upsertを別々のステージにし、上限付きキューでつないで並行に動かす
+（バッチNのupsert中にバッチN+1を取得する）。upsertは1本のワーカーがバッチ順に行う。
+synced_atは変換時に付けるので、並行に書き込むと古いsynced_atの行が後からコミットされ、
+ダッシュボードの差分取得（synced_at >= 前回の最大値）で取りこぼされるため。
+
+同期モード:
+- incremental: sync_stateのハイウォーターマーク以降に編集されたページだけを同期
+- full: 全ページを同期し、Notionから消えた（アーカイブ・削除された）行をSupabaseから削除
+- auto（既定）: ハイウォーターマークが無いか、前回の全件同期から
+  FULL_RECONCILE_DAYS 日以上経っていればfull、それ以外はincremental
+
+429・5xxはRetry-Afterまたはバックオフで待って再試行し、Notionへのリクエストは
+トークンバケットで平均NOTION_RATE_LIMIT req/sに抑える。それでも途中で失敗した場合は
+upsert済みのバッチまでのカーソルをsync_stateに保存し、次回はそこから再開する。
+
+propertiesのハッシュ（content_hash）がSupabase上の値と同じレコードはupsertしない
+（変更が無ければ行もsynced_atも書き換えない）。
+
+--import-export PATH でNotion APIの代わりにJSONエクスポートから一括インポートする
+（変換は複数プロセス、出力はSupabase・Postgres（COPY）・NDJSON・COPYファイル）。
+
+初回のバックフィルでは --mode bulk --dsn ... でPostgresに直接つなぎ、PostgRESTの
+upsertの代わりにCOPYでステージングテーブルに流し込んでからまとめてマージする。
 """
 
+import argparse
+import asyncio
 import os
 import sys
-from datetime import datetime, timezone
-from typing import Optional
-import requests
+import time
+from dataclasses import dataclass, field
+from datetime import UTC, datetime, timedelta
+
+import httpx
 from dotenv import load_dotenv
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from management_dashboard.bulk_load import LoadResult, bulk_load  # noqa: E402
+from management_dashboard.http_client import create_client  # noqa: E402
+from management_dashboard.logging_config import configure_logging  # noqa: E402
+from management_dashboard.notion_export import convert_export, to_copy_line  # noqa: E402
+from management_dashboard.notion_properties import (  # noqa: E402
+    DEFAULT_SCHEMA_PATH,
+    compile_extractor,
+    load_schema,
+    page_to_record,
+)
+from management_dashboard.retry import (  # noqa: E402
+    RetryPolicy,
+    TokenBucket,
+    request_with_retry,
+)
+
 load_dotenv()
 
 # Configuration
 NOTION_API_KEY = os.getenv("NOTION_API_KEY")
-if not NOTION_API_KEY:
-    print("Error: NOTION_API_KEY not set")
-    sys.exit(1)
 NOTION_DB_ID = "44768ed1b8494c059f3080bd51f6968b"
 
 SUPABASE_URL = os.getenv("SUPABASE_URL", "https://rvhoveymacotfyyignba.supabase.co")
 SUPABASE_SERVICE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
+# Postgresへの直接接続（--mode bulk / --output postgres のCOPY一括ロード用）
+SUPABASE_DB_URL = os.getenv("SUPABASE_DB_URL")
+
+# パイプライン設定
+NOTION_PAGE_SIZE = 100
+# ステージ間キューの上限（取得が先行しすぎてメモリを使わないように）
+QUEUE_SIZE = int(os.getenv("SYNC_QUEUE_SIZE", "4"))
+HTTP_TIMEOUT = httpx.Timeout(30.0, connect=10.0)
+# Notion APIのレート制限（平均3 req/s）
+NOTION_RATE_LIMIT = float(os.getenv("NOTION_RATE_LIMIT", "3"))
+# 429・5xx・通信エラー時の再試行（初回を含む試行回数）
+RETRY_POLICY = RetryPolicy(max_attempts=int(os.getenv("SYNC_MAX_ATTEMPTS", "6")))
+
+# 同期状態（sync_stateテーブルの行）
+SYNC_SOURCE = "notion_orders"
+# 全件突き合わせ（削除検出）の間隔
+FULL_RECONCILE_DAYS = float(os.getenv("SYNC_FULL_RECONCILE_DAYS", "7"))
+# レコードの内容による拒否（バッチを二分割して問題のあるレコードを特定する）
+RECORD_REJECT_STATUSES = frozenset({400, 409, 422})
+# 削除時に1リクエストで指定するnotion_idの数
+DELETE_CHUNK_SIZE = 100
+
+# プロパティ定義（起動時に1回だけ抽出テーブルにする）
+NOTION_SCHEMA_PATH = os.getenv("NOTION_SCHEMA_PATH", str(DEFAULT_SCHEMA_PATH))
+# エクスポートからの一括インポート: 変換プロセス数（0ならCPU数）と1チャンクの件数
+IMPORT_WORKERS = int(os.getenv("IMPORT_WORKERS", "0"))
+IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", "1000"))
+_extract_properties = compile_extractor(load_schema(NOTION_SCHEMA_PATH))
 
 
 def get_notion_headers():
     return {
         "Authorization": f"Bearer {NOTION_API_KEY}",
         "Notion-Version": "2022-06-28",
-        "Content-Type": "application/json"
+        "Content-Type": "application/json",
     }
 
 
@@ -37,176 +108,633 @@ def get_supabase_headers():
         "apikey": SUPABASE_SERVICE_KEY,
         "Authorization": f"Bearer {SUPABASE_SERVICE_KEY}",
         "Content-Type": "application/json",
-        "Prefer": "resolution=merge-duplicates"
+        "Prefer": "resolution=merge-duplicates,return=minimal",
     }
 
 
-def fetch_notion_pages(start_cursor: Optional[str] = None) -> dict:
-    """Fetch pages from Notion database"""
-    url = f"https://api.notion.com/v1/databases/{NOTION_DB_ID}/query"
-    payload = {"page_size": 100}
+def notion_client() -> httpx.AsyncClient:
+    """Notion API用クライアント（keep-aliveで接続を使い回す）"""
+    return create_client(
+        "https://api.notion.com/v1",
+        get_notion_headers(),
+        max_connections=2,
+        timeout=HTTP_TIMEOUT,
+    )
+
+
+def supabase_client() -> httpx.AsyncClient:
+    """Supabase REST API用クライアント（keep-aliveで接続を使い回す）"""
+    return create_client(
+        f"{SUPABASE_URL}/rest/v1",
+        get_supabase_headers(),
+        max_connections=1,
+        timeout=HTTP_TIMEOUT,
+    )
+
+
+async def fetch_notion_pages(
+    client: httpx.AsyncClient,
+    start_cursor: str | None = None,
+    edited_since: str | None = None,
+    limiter: TokenBucket | None = None,
+) -> dict:
+    """Fetch pages from Notion database（edited_since指定時はそれ以降に編集されたページだけ）"""
+    payload = {"page_size": NOTION_PAGE_SIZE}
     if start_cursor:
         payload["start_cursor"] = start_cursor
-
-    response = requests.post(url, headers=get_notion_headers(), json=payload)
+    if edited_since:
+        payload["filter"] = {
+            "timestamp": "last_edited_time",
+            "last_edited_time": {"on_or_after": edited_since},
+        }
+        payload["sorts"] = [{"timestamp": "last_edited_time", "direction": "ascending"}]
+
+    response = await request_with_retry(
+        client,
+        "POST",
+        f"/databases/{NOTION_DB_ID}/query",
+        json=payload,
+        limiter=limiter,
+        policy=RETRY_POLICY,
+    )
     response.raise_for_status()
     return response.json()
 
 
 def extract_simple_properties(properties: dict) -> dict:
     """NotionのpropertiesをシンプルなJSONに変換（日本語キーそのまま）"""
-    result = {}
-
-    for name, info in properties.items():
-        prop_type = info.get("type")
-        value = None
-
-        if prop_type == "title":
-            texts = info.get("title", [])
-            value = texts[0].get("plain_text", "") if texts else ""
-
-        elif prop_type == "rich_text":
-            texts = info.get("rich_text", [])
-            value = texts[0].get("plain_text", "") if texts else ""
-
-        elif prop_type == "number":
-            value = info.get("number")
-
-        elif prop_type == "select":
-            sel = info.get("select")
-            value = sel.get("name") if sel else None
-
-        elif prop_type == "multi_select":
-            value = [s.get("name") for s in info.get("multi_select", [])]
-
-        elif prop_type == "date":
-            date_info = info.get("date")
-            value = date_info.get("start") if date_info else None
-
-        elif prop_type == "formula":
-            formula = info.get("formula", {})
-            value = formula.get("number") or formula.get("string")
-
-        elif prop_type == "status":
-            status = info.get("status")
-            value = status.get("name") if status else None
-
-        elif prop_type == "people":
-            people = info.get("people", [])
-            value = [p.get("name", "") for p in people]
-            # リストを文字列に
-            if len(value) == 1:
-                value = value[0]
-            elif len(value) == 0:
-                value = None
-
-        elif prop_type == "url":
-            value = info.get("url")
-
-        elif prop_type == "rollup":
-            rollup = info.get("rollup", {})
-            if rollup.get("type") == "array":
-                arr = rollup.get("array", [])
-                if arr:
-                    first = arr[0]
-                    if first.get("type") == "rich_text":
-                        texts = first.get("rich_text", [])
-                        value = texts[0].get("plain_text", "") if texts else ""
-                    elif first.get("type") == "select":
-                        sel = first.get("select")
-                        value = sel.get("name") if sel else None
-
-        # 値があればセット
-        if value is not None and value != "" and value != []:
-            result[name] = value
-
-    return result
+    return _extract_properties(properties)
 
 
 def convert_page_to_record(page: dict) -> dict:
     """NotionページをSupabaseレコードに変換"""
-    properties = extract_simple_properties(page.get("properties", {}))
+    return page_to_record(page, extract_simple_properties, datetime.now(UTC).isoformat())
 
-    return {
-        "notion_id": page.get("id"),
-        "properties": properties,  # JSONBとして保存
-        "notion_created_at": page.get("created_time"),
-        "notion_updated_at": page.get("last_edited_time"),
-        "synced_at": datetime.now(timezone.utc).isoformat()
-    }
 
+async def upsert_to_supabase(client: httpx.AsyncClient, records: list) -> dict:
+    """Upsert records to Supabase (notion_idで重複時は更新)
 
-def upsert_to_supabase(records: list) -> dict:
-    """Upsert records to Supabase (notion_idで重複時は更新)"""
+    不正なレコードでバッチが拒否された場合（400・409・422）は二分割して再送し、
+    問題のあるレコードだけを失敗として数える。それ以外の失敗（認証・権限・
+    テーブルが無い・再試行しても復旧しない障害）はレコードによらないので同期を中断する。
+    """
     # on_conflict=notion_id でupsertを有効化
-    url = f"{SUPABASE_URL}/rest/v1/notion_orders?on_conflict=notion_id"
-
-    headers = {
-        "apikey": SUPABASE_SERVICE_KEY,
-        "Authorization": f"Bearer {SUPABASE_SERVICE_KEY}",
-        "Content-Type": "application/json",
-        "Prefer": "resolution=merge-duplicates,return=minimal"
-    }
-
     # バッチでupsert（1件ずつではなく一括で）
-    response = requests.post(url, headers=headers, json=records)
-
-    if response.status_code in [200, 201]:
+    response = await request_with_retry(
+        client,
+        "POST",
+        "/notion_orders",
+        params={"on_conflict": "notion_id"},
+        json=records,
+        policy=RETRY_POLICY,
+    )
+
+    if response.status_code in [200, 201, 204]:
         return {"success": True, "count": len(records), "errors": 0}
-    else:
-        print(f"   ⚠️ Batch upsert error: {response.text[:200]}")
-        return {"success": False, "count": 0, "errors": len(records)}
-
-
-def sync_all():
-    """Main sync function"""
-    print("🔄 Starting Notion → Supabase sync...")
-    print(f"   Notion DB: {NOTION_DB_ID}")
-    print(f"   Supabase: {SUPABASE_URL}")
-    print(f"   Table: notion_orders (JSONB形式)")
-
-    if not SUPABASE_SERVICE_KEY:
-        print("❌ Error: SUPABASE_SERVICE_ROLE_KEY not set")
-        sys.exit(1)
-
-    total_synced = 0
-    has_more = True
-    cursor = None
+    if response.status_code not in RECORD_REJECT_STATUSES:
+        response.raise_for_status()
+    if len(records) == 1:
+        print(f"   ⚠️ Upsert error for {records[0].get('notion_id')}: {response.text[:200]}")
+        return {"success": False, "count": 0, "errors": 1}
+
+    mid = len(records) // 2
+    left = await upsert_to_supabase(client, records[:mid])
+    right = await upsert_to_supabase(client, records[mid:])
+    errors = left["errors"] + right["errors"]
+    return {"success": errors == 0, "count": left["count"] + right["count"], "errors": errors}
+
+
+async def fetch_content_hashes(
+    client: httpx.AsyncClient, notion_ids: list | None = None, page_size: int = 1000
+) -> dict:
+    """Supabaseにある行の {notion_id: content_hash}（notion_ids省略時は全件）"""
+    params = {"select": "notion_id,content_hash", "order": "notion_id.asc"}
+    if notion_ids is not None:
+        if not notion_ids:
+            return {}
+        ids = ",".join(f'"{nid}"' for nid in notion_ids)
+        params["notion_id"] = f"in.({ids})"
+
+    hashes: dict = {}
+    start = 0
+    while True:
+        response = await request_with_retry(
+            client,
+            "GET",
+            "/notion_orders",
+            params=params,
+            headers={"Range-Unit": "items", "Range": f"{start}-{start + page_size - 1}"},
+            policy=RETRY_POLICY,
+        )
+        response.raise_for_status()
+        rows = response.json()
+        hashes.update((row["notion_id"], row.get("content_hash")) for row in rows)
+        if len(rows) < page_size:
+            return hashes
+        start += page_size
+
+
+@dataclass
+class SyncStats:
+    """同期の進捗（records/secの計算用）"""
+
+    fetched: int = 0
+    synced: int = 0
+    # content_hashが同じでupsertしなかった件数
+    unchanged: int = 0
+    errors: int = 0
+    # 取得したページのIDと最大last_edited_time（削除検出・ハイウォーターマーク用）
+    seen_ids: set = field(default_factory=set)
+    archived_ids: set = field(default_factory=set)
+    latest_edited: str = ""
+    # upsertが完了したバッチまでのNotionカーソル（途中で失敗したら次回ここから再開）
+    cursor: str | None = None
+    next_batch: int = 0
+    started_at: float = field(default_factory=time.perf_counter)
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started_at
+
+    @property
+    def records_per_sec(self) -> float:
+        return self.synced / self.elapsed if self.elapsed > 0 else 0.0
+
+    def batch_done(self, next_cursor: str | None):
+        """バッチのupsert完了を記録してカーソルを進める（バッチは順に完了する）"""
+        self.cursor = next_cursor
+        self.next_batch += 1
+
+
+async def fetch_stage(
+    client: httpx.AsyncClient,
+    out_q: asyncio.Queue,
+    stats: SyncStats,
+    edited_since: str | None = None,
+    limiter: TokenBucket | None = None,
+):
+    """Notionからページを順に取得してキューに流す（カーソルは前の応答にしかないので直列）"""
+    cursor = stats.cursor
     batch_num = 0
-
-    while has_more:
-        batch_num += 1
-        print(f"\n📥 Batch {batch_num}: Fetching from Notion...")
-        data = fetch_notion_pages(cursor)
-
+    while True:
+        data = await fetch_notion_pages(client, cursor, edited_since, limiter)
         pages = data.get("results", [])
-        print(f"   Got {len(pages)} pages")
+        stats.fetched += len(pages)
+        for page in pages:
+            if page.get("archived") or page.get("in_trash"):
+                stats.archived_ids.add(page.get("id"))
+            else:
+                stats.seen_ids.add(page.get("id"))
+            stats.latest_edited = max(stats.latest_edited, page.get("last_edited_time") or "")
+        pages = [p for p in pages if p.get("id") not in stats.archived_ids]
+        print(f"📥 Batch {batch_num + 1}: got {len(pages)} pages (total {stats.fetched})")
 
-        if not pages:
+        cursor = data.get("next_cursor")
+        await out_q.put((batch_num, cursor, pages))
+        batch_num += 1
+        if not data.get("results") or not data.get("has_more", False):
             break
+    await out_q.put(None)
 
-        # Convert records
+
+async def convert_stage(in_q: asyncio.Queue, out_q: asyncio.Queue):
+    """ページをSupabaseレコードに変換する"""
+    while (batch := await in_q.get()) is not None:
+        seq, next_cursor, pages = batch
         records = []
         for page in pages:
             try:
-                record = convert_page_to_record(page)
-                records.append(record)
+                records.append(convert_page_to_record(page))
             except Exception as e:
                 print(f"   ⚠️ Error converting page {page.get('id')}: {e}")
-
-        # Upsert to Supabase
+        await out_q.put((seq, next_cursor, records))
+    await out_q.put(None)
+
+
+async def upsert_stage(
+    client: httpx.AsyncClient,
+    in_q: asyncio.Queue,
+    stats: SyncStats,
+    known_hashes: dict | None = None,
+):
+    """変換済みレコードのうち変更があったものをSupabaseにupsertする（バッチ順に1つずつ）
+
+    known_hashesが無ければバッチのnotion_idについてだけcontent_hashを問い合わせる。
+    """
+    while (batch := await in_q.get()) is not None:
+        _, next_cursor, records = batch
         if records:
-            print(f"📤 Upserting {len(records)} records...")
-            result = upsert_to_supabase(records)
-            total_synced += result.get("count", 0)
-            print(f"   ✅ Synced {result.get('count', 0)}, errors: {result.get('errors', 0)}")
+            hashes = known_hashes
+            if hashes is None:
+                hashes = await fetch_content_hashes(client, [r["notion_id"] for r in records])
+            changed = [r for r in records if hashes.get(r["notion_id"]) != r["content_hash"]]
+            stats.unchanged += len(records) - len(changed)
+            records = changed
+        if not records:
+            stats.batch_done(next_cursor)
+            continue
+        result = await upsert_to_supabase(client, records)
+        stats.batch_done(next_cursor)
+        stats.synced += result.get("count", 0)
+        stats.errors += result.get("errors", 0)
+        print(
+            f"📤 Upserted {result.get('count', 0)}, errors: {result.get('errors', 0)} "
+            f"({stats.synced} records, {stats.records_per_sec:.1f} records/sec)"
+        )
+
+
+async def run_pipeline(
+    notion: httpx.AsyncClient,
+    supabase: httpx.AsyncClient,
+    edited_since: str | None = None,
+    stats: SyncStats | None = None,
+    limiter: TokenBucket | None = None,
+    known_hashes: dict | None = None,
+) -> SyncStats:
+    """取得 → 変換 → upsert のパイプラインを実行（stats.cursorがあればそこから再開）"""
+    stats = stats or SyncStats()
+    pages_q: asyncio.Queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+    records_q: asyncio.Queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+
+    # どこかのステージが失敗したら残りのステージもキャンセルする
+    async with asyncio.TaskGroup() as tg:
+        tg.create_task(fetch_stage(notion, pages_q, stats, edited_since, limiter))
+        tg.create_task(convert_stage(pages_q, records_q))
+        tg.create_task(upsert_stage(supabase, records_q, stats, known_hashes))
+    return stats
+
+
+async def load_sync_state(client: httpx.AsyncClient) -> dict:
+    """sync_stateから前回の同期状態を読む（無ければ空）"""
+    response = await request_with_retry(
+        client,
+        "GET",
+        "/sync_state",
+        params={"source": f"eq.{SYNC_SOURCE}", "select": "*"},
+        policy=RETRY_POLICY,
+    )
+    response.raise_for_status()
+    rows = response.json()
+    return rows[0] if rows else {}
+
+
+async def save_sync_state(client: httpx.AsyncClient, state: dict):
+    """同期状態を保存（成功した同期の後だけ呼ぶ）"""
+    row = {"source": SYNC_SOURCE, "updated_at": datetime.now(UTC).isoformat(), **state}
+    response = await request_with_retry(
+        client,
+        "POST",
+        "/sync_state",
+        params={"on_conflict": "source"},
+        json=[row],
+        policy=RETRY_POLICY,
+    )
+    response.raise_for_status()
 
-        has_more = data.get("has_more", False)
-        cursor = data.get("next_cursor")
 
-    print(f"\n🎉 Sync complete! Total: {total_synced} records")
-    return total_synced
+async def delete_records(client: httpx.AsyncClient, notion_ids: list) -> int:
+    """notion_idを指定して行を削除"""
+    for i in range(0, len(notion_ids), DELETE_CHUNK_SIZE):
+        chunk = ",".join(f'"{nid}"' for nid in notion_ids[i : i + DELETE_CHUNK_SIZE])
+        response = await request_with_retry(
+            client,
+            "DELETE",
+            "/notion_orders",
+            params={"notion_id": f"in.({chunk})"},
+            policy=RETRY_POLICY,
+        )
+        response.raise_for_status()
+    return len(notion_ids)
+
+
+def choose_mode(mode: str, state: dict, now: datetime) -> str:
+    """autoの場合に全件同期か差分同期かを決める"""
+    if mode != "auto":
+        return mode
+    if not state.get("high_water_mark") or not state.get("last_full_sync_at"):
+        return "full"
+    last_full = datetime.fromisoformat(state["last_full_sync_at"])
+    return "full" if now - last_full >= timedelta(days=FULL_RECONCILE_DAYS) else "incremental"
+
+
+def later_timestamp(a: str | None, b: str | None) -> str | None:
+    """2つのISO 8601時刻の新しい方（NotionのZ表記とPostgresの+00:00表記が混ざるため）"""
+    if not a or not b:
+        return a or b
+    return a if datetime.fromisoformat(a) >= datetime.fromisoformat(b) else b
+
+
+async def run_sync(
+    notion: httpx.AsyncClient,
+    supabase: httpx.AsyncClient,
+    mode: str = "auto",
+    limiter: TokenBucket | None = None,
+) -> SyncStats:
+    """同期状態を読み、差分または全件で同期して状態を更新する"""
+    now = datetime.now(UTC)
+    state = await load_sync_state(supabase)
+    stats = SyncStats()
+
+    # 前回が途中で失敗していれば同じモードで続きから再開する
+    resumed = bool(state.get("resume_cursor")) and mode in ("auto", state.get("resume_mode"))
+    if resumed:
+        mode = state["resume_mode"]
+        stats.cursor = state["resume_cursor"]
+    else:
+        mode = choose_mode(mode, state, now)
+    edited_since = state.get("high_water_mark") if mode == "incremental" else None
+    print(
+        f"   Mode: {mode}"
+        + (f" (edited since {edited_since})" if edited_since else "")
+        + (" (resumed)" if resumed else "")
+    )
+
+    new_state = {
+        "high_water_mark": state.get("high_water_mark"),
+        "last_full_sync_at": state.get("last_full_sync_at"),
+        "resume_cursor": None,
+        "resume_mode": None,
+    }
+    # 全件同期では全行のハッシュを先にまとめて取得する（削除検出にも使う）
+    known_hashes = await fetch_content_hashes(supabase) if mode == "full" else None
+    try:
+        await run_pipeline(
+            notion,
+            supabase,
+            edited_since=edited_since,
+            stats=stats,
+            limiter=limiter,
+            known_hashes=known_hashes,
+        )
+    except Exception:
+        if stats.cursor:
+            await save_sync_state(
+                supabase, {**new_state, "resume_cursor": stats.cursor, "resume_mode": mode}
+            )
+            print(f"   💾 Saved resume cursor after {stats.next_batch} batches")
+        raise
+
+    if stats.errors:
+        # 取りこぼしがあるのでハイウォーターマークは進めない（次回に再取得する）
+        print(f"   ⚠️ {stats.errors} records failed; high-water mark not advanced")
+        await save_sync_state(supabase, new_state)
+        return stats
+
+    deleted = list(stats.archived_ids)
+    # 再開した全件同期は前半のページを見ていないので削除検出しない
+    # 1件も取れなかった場合は権限などの問題の可能性があるので全削除しない
+    full_reconciled = mode == "full" and not resumed and bool(stats.seen_ids)
+    if full_reconciled:
+        deleted = list(known_hashes.keys() - stats.seen_ids)
+    if deleted:
+        await delete_records(supabase, deleted)
+        print(f"🗑️ Deleted {len(deleted)} records missing or archived in Notion")
+
+    new_state["high_water_mark"] = later_timestamp(
+        state.get("high_water_mark"), stats.latest_edited
+    )
+    if full_reconciled:
+        new_state["last_full_sync_at"] = now.isoformat()
+    await save_sync_state(supabase, new_state)
+    return stats
+
+
+async def import_stage(
+    path: str,
+    out_q: asyncio.Queue,
+    stats: SyncStats,
+    workers: int = IMPORT_WORKERS,
+    chunk_size: int = IMPORT_CHUNK_SIZE,
+):
+    """エクスポートを子プロセスで変換し、チャンクごとにキューに流す（fetch_stageの代わり）"""
+    chunks = convert_export(
+        path, "records", workers=workers, chunk_size=chunk_size, schema_path=NOTION_SCHEMA_PATH
+    )
+    seq = 0
+    # ファイルの読み出しと変換結果の待ち合わせでイベントループを止めないよう別スレッドで回す
+    while (result := await asyncio.to_thread(next, chunks, None)) is not None:
+        records, count, errors = result
+        stats.fetched += count + errors
+        stats.errors += errors
+        await out_q.put((seq, None, records))
+        seq += 1
+    await out_q.put(None)
+
+
+async def import_export_to_supabase(
+    supabase: httpx.AsyncClient,
+    path: str,
+    workers: int = IMPORT_WORKERS,
+    chunk_size: int = IMPORT_CHUNK_SIZE,
+) -> SyncStats:
+    """エクスポートを変換してSupabaseにupsertする（content_hashが同じ行は書き込まない）
+
+    sync_stateは変更しない（ハイウォーターマークは次回のAPI同期で進む）。
+    """
+    stats = SyncStats()
+    known_hashes = await fetch_content_hashes(supabase)
+    records_q: asyncio.Queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+    async with asyncio.TaskGroup() as tg:
+        tg.create_task(import_stage(path, records_q, stats, workers, chunk_size))
+        tg.create_task(upsert_stage(supabase, records_q, stats, known_hashes))
+    return stats
+
+
+async def import_export_to_postgres(
+    path: str,
+    dsn: str,
+    workers: int = IMPORT_WORKERS,
+    chunk_size: int = IMPORT_CHUNK_SIZE,
+) -> SyncStats:
+    """エクスポートを変換し、COPYでPostgresに一括ロードする"""
+    stats = SyncStats()
+    chunks = convert_export(
+        path, "copy", workers=workers, chunk_size=chunk_size, schema_path=NOTION_SCHEMA_PATH
+    )
+
+    async def copy_text():
+        while (result := await asyncio.to_thread(next, chunks, None)) is not None:
+            text, count, errors = result
+            stats.fetched += count + errors
+            stats.errors += errors
+            yield text
+
+    record_load(stats, await bulk_load(dsn, copy_text()))
+    return stats
+
+
+def import_export_to_file(
+    path: str,
+    output: str,
+    out_path: str,
+    workers: int = IMPORT_WORKERS,
+    chunk_size: int = IMPORT_CHUNK_SIZE,
+) -> SyncStats:
+    """エクスポートを変換してNDJSONまたはCOPY（text形式）のファイルに書き出す"""
+    stats = SyncStats()
+    chunks = convert_export(
+        path, output, workers=workers, chunk_size=chunk_size, schema_path=NOTION_SCHEMA_PATH
+    )
+    with open(out_path, "w", encoding="utf-8") as f:
+        for payload, count, errors in chunks:
+            f.write(payload)
+            stats.fetched += count + errors
+            stats.synced += count
+            stats.errors += errors
+            print(f"📝 Wrote {stats.synced} records ({stats.records_per_sec:.1f} records/sec)")
+    return stats
+
+
+def import_export(
+    path: str,
+    output: str = "supabase",
+    out_path: str | None = None,
+    workers: int = IMPORT_WORKERS,
+    chunk_size: int = IMPORT_CHUNK_SIZE,
+    dsn: str | None = None,
+) -> int:
+    """NotionのJSONエクスポートからの一括インポート"""
+    print(f"📦 Importing Notion export {path} → {output}")
+    if output == "postgres":
+        if not dsn:
+            print("❌ Error: --dsn or SUPABASE_DB_URL not set")
+            sys.exit(1)
+        stats = asyncio.run(import_export_to_postgres(path, dsn, workers, chunk_size))
+    elif output == "supabase":
+        if not SUPABASE_SERVICE_KEY:
+            print("❌ Error: SUPABASE_SERVICE_ROLE_KEY not set")
+            sys.exit(1)
+
+        async def run() -> SyncStats:
+            async with supabase_client() as supabase:
+                return await import_export_to_supabase(supabase, path, workers, chunk_size)
+
+        stats = asyncio.run(run())
+    else:
+        out_path = out_path or f"{os.path.splitext(path)[0]}.{output}"
+        stats = import_export_to_file(path, output, out_path, workers, chunk_size)
+        print(f"   Output: {out_path}")
+
+    print(
+        f"\n🎉 Import complete! Total: {stats.synced} records, unchanged: {stats.unchanged}, "
+        f"errors: {stats.errors} "
+        f"in {stats.elapsed:.1f}s ({stats.records_per_sec:.1f} records/sec)"
+    )
+    return stats.synced
+
+
+def record_load(stats: SyncStats, result: LoadResult):
+    stats.synced = result.merged
+    stats.unchanged = result.unchanged
+    print(f"📤 Merged {result.merged} of {result.staged} staged records")
+
+
+async def bulk_load_from_notion(
+    notion: httpx.AsyncClient, dsn: str, limiter: TokenBucket | None = None
+) -> SyncStats:
+    """Notionの全ページをCOPYでPostgresに一括ロードする（初回のバックフィル用）
+
+    取得・変換はrun_pipelineと同じステージを使い、upsertの代わりにCOPYへ流す。
+    全件を1トランザクションでロードするので、途中で失敗したら何も書き込まれない。
+    sync_stateはハイウォーターマークだけを進める（削除検出は次回のfull同期で行う）。
+    """
+    stats = SyncStats()
+    pages_q: asyncio.Queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+    records_q: asyncio.Queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+
+    async def copy_text():
+        while (batch := await records_q.get()) is not None:
+            _, _, records = batch
+            yield "".join(to_copy_line(record) for record in records)
+
+    async with asyncio.TaskGroup() as tg:
+        tg.create_task(fetch_stage(notion, pages_q, stats, limiter=limiter))
+        tg.create_task(convert_stage(pages_q, records_q))
+        result = await bulk_load(
+            dsn,
+            copy_text(),
+            source=SYNC_SOURCE,
+            high_water_mark=lambda: stats.latest_edited or None,
+        )
+    record_load(stats, result)
+    return stats
+
+
+async def sync_all_async(mode: str = "auto", dsn: str | None = None) -> int:
+    limiter = TokenBucket(rate=NOTION_RATE_LIMIT)
+    if mode == "bulk":
+        async with notion_client() as notion:
+            stats = await bulk_load_from_notion(notion, dsn, limiter)
+    else:
+        async with notion_client() as notion, supabase_client() as supabase:
+            stats = await run_sync(notion, supabase, mode, limiter)
+
+    print(
+        f"\n🎉 Sync complete! Total: {stats.synced} records, unchanged: {stats.unchanged}, "
+        f"errors: {stats.errors} "
+        f"in {stats.elapsed:.1f}s ({stats.records_per_sec:.1f} records/sec)"
+    )
+    return stats.synced
+
+
+def sync_all(mode: str = "auto", dsn: str | None = None):
+    """Main sync function"""
+    print("🔄 Starting Notion → Supabase sync...")
+    print(f"   Notion DB: {NOTION_DB_ID}")
+    print(f"   Supabase: {SUPABASE_URL}")
+    print("   Table: notion_orders (JSONB形式)")
+
+    if not NOTION_API_KEY:
+        print("Error: NOTION_API_KEY not set")
+        sys.exit(1)
+    if mode == "bulk" and not dsn:
+        print("❌ Error: --dsn or SUPABASE_DB_URL not set")
+        sys.exit(1)
+    if mode != "bulk" and not SUPABASE_SERVICE_KEY:
+        print("❌ Error: SUPABASE_SERVICE_ROLE_KEY not set")
+        sys.exit(1)
+
+    return asyncio.run(sync_all_async(mode, dsn))
 
 
 if __name__ == "__main__":
-    sync_all()
+    parser = argparse.ArgumentParser(description="Notion → Supabase 同期")
+    parser.add_argument(
+        "--mode",
+        choices=["auto", "incremental", "full", "bulk"],
+        default=os.getenv("SYNC_MODE", "auto"),
+        help="incremental: 編集されたページだけ / full: 全件＋削除検出 / "
+        "bulk: 全件をCOPYでPostgresに直接ロード（--dsnが必要）",
+    )
+    parser.add_argument(
+        "--dsn",
+        default=SUPABASE_DB_URL,
+        help="PostgresのDSN（--mode bulk・--output postgres用、省略時はSUPABASE_DB_URL）",
+    )
+    parser.add_argument(
+        "--import-export",
+        metavar="PATH",
+        help="Notion APIではなくJSONエクスポートから一括インポートする",
+    )
+    parser.add_argument(
+        "--output",
+        choices=["supabase", "postgres", "ndjson", "copy"],
+        default="supabase",
+        help="--import-exportの出力先（postgresはCOPYで直接ロード、ndjson・copyはファイル）",
+    )
+    parser.add_argument(
+        "--out", help="ndjson・copyの出力ファイル（省略時はエクスポートと同じ場所）"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=IMPORT_WORKERS, help="変換プロセス数（0ならCPU数）"
+    )
+    parser.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK_SIZE)
+    args = parser.parse_args()
+    # リトライ・変換エラーの通知はmanagement_dashboardのロガーに出る
+    configure_logging()
+    if args.import_export:
+        import_export(
+            args.import_export, args.output, args.out, args.workers, args.chunk_size, args.dsn
+        )
+    else:
+        sync_all(args.mode, args.dsn)
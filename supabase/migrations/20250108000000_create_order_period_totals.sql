@@ -0,0 +1,57 @@
+-- =====================================================
+-- 集計RPC: 申請日ごとの件数・総支給額をPostgres側で集計
+-- ダッシュボードが表示するバケット数だけを返す
+-- =====================================================
+
+-- 日付として解釈できない値はNULLにする（集計から除外）
+CREATE OR REPLACE FUNCTION try_cast_date(value TEXT)
+RETURNS DATE
+LANGUAGE plpgsql
+IMMUTABLE
+AS $$
+BEGIN
+  IF value IS NULL OR value !~ '^[0-9]{4}-[0-9]{2}-[0-9]{2}$' THEN
+    RETURN NULL;
+  END IF;
+  RETURN value::DATE;
+EXCEPTION WHEN OTHERS THEN
+  RETURN NULL;
+END;
+$$;
+
+-- granularity: 'daily' | 'weekly'（月曜始まり） | 'monthly'
+-- period: 日次・週次は 'YYYY-MM-DD'、月次は 'YYYY-MM'（新しい順）
+CREATE OR REPLACE FUNCTION order_period_totals(
+  granularity TEXT DEFAULT 'monthly',
+  bucket_limit INTEGER DEFAULT 12
+)
+RETURNS TABLE (period TEXT, count BIGINT, total BIGINT)
+LANGUAGE sql
+STABLE
+AS $$
+  WITH parsed AS (
+    SELECT
+      try_cast_date(properties->>'申請日') AS applied_on,
+      CASE
+        WHEN properties->>'総支給額' ~ '^-?[0-9]+(\.[0-9]*)?([eE][-+]?[0-9]+)?$'
+        THEN TRUNC((properties->>'総支給額')::NUMERIC)::BIGINT
+        ELSE 0
+      END AS amount
+    FROM notion_orders
+  )
+  SELECT
+    CASE granularity
+      WHEN 'daily' THEN TO_CHAR(applied_on, 'YYYY-MM-DD')
+      WHEN 'weekly' THEN TO_CHAR(DATE_TRUNC('week', applied_on), 'YYYY-MM-DD')
+      ELSE TO_CHAR(applied_on, 'YYYY-MM')
+    END AS period,
+    COUNT(*) AS count,
+    SUM(amount)::BIGINT AS total
+  FROM parsed
+  WHERE applied_on IS NOT NULL
+  GROUP BY 1
+  ORDER BY 1 DESC
+  LIMIT bucket_limit;
+$$;
+
+GRANT EXECUTE ON FUNCTION order_period_totals(TEXT, INTEGER) TO anon, authenticated;
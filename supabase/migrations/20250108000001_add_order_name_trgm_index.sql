@@ -0,0 +1,10 @@
+-- =====================================================
+-- 発注決裁名の部分一致検索（ilike）用 trigram インデックス
+-- ダッシュボードの DASHBOARD_SEARCH=remote で利用
+-- =====================================================
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- 3文字以上の検索語でインデックスが効く（1〜2文字は全件スキャン）
+CREATE INDEX IF NOT EXISTS idx_notion_orders_name_trgm
+  ON notion_orders USING GIN ((properties->>'発注決裁名') gin_trgm_ops);
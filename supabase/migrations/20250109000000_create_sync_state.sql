@@ -0,0 +1,16 @@
+-- =====================================================
+-- 同期状態: Notion同期のハイウォーターマーク
+-- 差分同期は high_water_mark 以降に編集されたページだけを取得する
+-- =====================================================
+
+CREATE TABLE IF NOT EXISTS sync_state (
+  source TEXT PRIMARY KEY,              -- 同期対象（例: 'notion_orders'）
+  high_water_mark TIMESTAMPTZ,          -- 取り込み済みの最大 last_edited_time
+  last_full_sync_at TIMESTAMPTZ,        -- 最後に全件突き合わせ（削除検出）をした時刻
+  updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+ALTER TABLE sync_state ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Allow service role all" ON sync_state
+  FOR ALL TO service_role USING (true);
@@ -0,0 +1,8 @@
+-- =====================================================
+-- 同期状態: 途中で失敗した同期の再開位置
+-- upsert済みのバッチまでのNotionカーソルを保存し、次回はそこから再開する
+-- =====================================================
+
+ALTER TABLE sync_state
+  ADD COLUMN IF NOT EXISTS resume_cursor TEXT,  -- 次に取得するNotionのstart_cursor
+  ADD COLUMN IF NOT EXISTS resume_mode TEXT;    -- 再開する同期モード（'incremental' | 'full'）
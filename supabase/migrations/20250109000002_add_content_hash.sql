@@ -0,0 +1,7 @@
+-- =====================================================
+-- notion_orders.content_hash: propertiesのハッシュ
+-- 同期スクリプトはハッシュが同じ行をupsertしない（不要な書き込み・dead tupleを減らす）
+-- =====================================================
+
+ALTER TABLE notion_orders
+  ADD COLUMN IF NOT EXISTS content_hash TEXT;  -- propertiesの正規化JSONのSHA-256
@@ -0,0 +1,66 @@
+"""RPC集計モードのテスト."""
+
+import json
+from collections import defaultdict
+
+import httpx
+
+from management_dashboard.aggregation import PERIOD_LIMITS, fetch_period_aggregates
+from management_dashboard.dataset import DatasetBuilder, build_dataset, period_keys
+from management_dashboard.order_cache import OrderCache
+
+ROWS = [
+    {
+        "notion_id": f"id-{i}",
+        "properties": {"総支給額": 1000 + i, "申請日": f"2025-{1 + i % 12:02d}-{1 + i % 28:02d}"},
+        "synced_at": "2026-01-01T00:00:00+00:00",
+    }
+    for i in range(200)
+] + [{"notion_id": "no-date", "properties": {"総支給額": "abc"}, "synced_at": ""}]
+
+
+def _rpc_stub(rows: list[dict]) -> httpx.AsyncClient:
+    """order_period_totalsをPythonで再現するPostgREST代替."""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        assert request.url.path == "/rest/v1/rpc/order_period_totals"
+        body = json.loads(request.content)
+        index = ["daily", "weekly", "monthly"].index(body["granularity"])
+        buckets: dict[str, dict] = defaultdict(lambda: {"count": 0, "total": 0})
+        for item in build_dataset(rows).orders:
+            keys = period_keys(item.date)
+            if keys:
+                buckets[keys[index]]["count"] += 1
+                buckets[keys[index]]["total"] += item.amount
+        result = [{"period": k, **v} for k, v in sorted(buckets.items(), reverse=True)]
+        return httpx.Response(200, json=result[: body["bucket_limit"]])
+
+    return httpx.AsyncClient(base_url="http://stub", transport=httpx.MockTransport(handler))
+
+
+async def test_rpc_aggregates_match_python():
+    """RPC集計が表示範囲についてPython集計と一致することを確認."""
+    expected = build_dataset(ROWS)
+
+    async with _rpc_stub(ROWS) as client:
+        periods = await fetch_period_aggregates(client)
+
+    assert periods["daily_agg"] == expected.daily_agg[: PERIOD_LIMITS["daily"]]
+    assert periods["weekly_agg"] == expected.weekly_agg[: PERIOD_LIMITS["weekly"]]
+    assert periods["monthly_agg"] == expected.monthly_agg[: PERIOD_LIMITS["monthly"]]
+
+
+async def test_cache_uses_period_loader():
+    """period_loader指定時はRPCの集計がデータセットに入ることを確認."""
+
+    async def load(builder: DatasetBuilder):
+        builder.add_rows(ROWS)
+
+    async with _rpc_stub(ROWS) as client:
+        cache = OrderCache(loader=load, period_loader=lambda: fetch_period_aggregates(client))
+        dataset = await cache.get()
+
+    assert dataset.total_count == len(ROWS)
+    assert dataset.total_amount == sum(1000 + i for i in range(200))
+    assert len(dataset.monthly_agg) == PERIOD_LIMITS["monthly"]
+    assert dataset.weekly_agg[0].period.endswith("週")
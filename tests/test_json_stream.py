@@ -0,0 +1,38 @@
+"""JSON配列の逐次デコードのテスト."""
+
+import json
+
+import pytest
+
+from management_dashboard.json_stream import JsonArrayDecoder, iter_json_array
+
+
+def test_decoder_handles_every_split_point():
+    """どこでテキストが切れても元の配列と同じ要素が得られることを確認."""
+    rows = [{"notion_id": f"id-{i}", "n": i * 10, "v": [1.5, "a,]}"]} for i in range(5)]
+    text = json.dumps(rows, ensure_ascii=False, indent=1)
+
+    for split in range(len(text) + 1):
+        decoder = JsonArrayDecoder()
+        items = decoder.feed(text[:split]) + decoder.feed(text[split:])
+        decoder.close()
+        assert items == rows, split
+
+
+def test_truncated_array_is_an_error():
+    """配列が閉じずに終わったらエラーになることを確認."""
+    decoder = JsonArrayDecoder()
+    assert decoder.feed('[{"a": 1}, {"b"') == [{"a": 1}]
+    with pytest.raises(ValueError):
+        decoder.close()
+
+
+async def test_iter_json_array_splits_utf8_bytes():
+    """UTF-8の1文字がチャンクの境目で割れても正しくデコードできることを確認."""
+    body = json.dumps([{"発注決裁名": "案件"}] * 3, ensure_ascii=False).encode()
+
+    async def chunks():
+        for i in range(0, len(body), 5):
+            yield body[i : i + 5]
+
+    assert [item async for item in iter_json_array(chunks())] == [{"発注決裁名": "案件"}] * 3
@@ -0,0 +1,39 @@
+"""KPIスナップショットAPIのテスト."""
+
+import httpx
+
+from management_dashboard.dataset import build_dataset
+from management_dashboard.kpi_api import KPI_PATH, create_kpi_api
+from tests.test_order_cache import _row, _rows
+
+
+class Holder:
+    dataset = None
+
+
+async def test_kpi_snapshot_with_etag():
+    """KPIを返し、ETagが一致すれば304、データが変われば新しいETagになることを確認."""
+    holder = Holder()
+    transport = httpx.ASGITransport(app=create_kpi_api(lambda: holder.dataset))
+    async with httpx.AsyncClient(transport=transport, base_url="http://dashboard") as client:
+        assert (await client.get(KPI_PATH)).status_code == 503
+
+        holder.dataset = build_dataset(_rows())
+        response = await client.get(KPI_PATH)
+        assert response.status_code == 200
+        assert response.json()["total_amount_formatted"] == "¥9,000"
+        assert response.json()["monthly_agg"] == [{"period": "2025-12", "count": 1, "total": 9000}]
+        assert "max-age=" in response.headers["cache-control"]
+        etag = response.headers["etag"]
+
+        cached = await client.get(KPI_PATH, headers={"If-None-Match": etag})
+        assert cached.status_code == 304
+        assert cached.content == b""
+
+        holder.dataset = build_dataset(
+            _rows() + [_row("b", 1000, "2025-12-27", "2026-01-02T00:00:00+00:00")]
+        )
+        updated = await client.get(KPI_PATH, headers={"If-None-Match": etag})
+        assert updated.status_code == 200
+        assert updated.headers["etag"] != etag
+        assert updated.json()["total_count"] == 2
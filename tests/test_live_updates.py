@@ -0,0 +1,109 @@
+"""更新配信（OrderFeed）のテスト."""
+
+import asyncio
+
+from management_dashboard.dataset import build_dataset
+from management_dashboard.live_updates import OrderFeed
+from management_dashboard.order_cache import OrderCache
+from tests.test_order_cache import FakeSupabase, _row, _rows
+
+
+class CountingSupabase(FakeSupabase):
+    """バージョン問い合わせの回数も数える."""
+
+    def __init__(self, rows: list[dict]):
+        super().__init__(rows)
+        self.probes = 0
+
+    async def probe(self) -> str:
+        self.probes += 1
+        return await super().probe()
+
+
+def _feed(source: FakeSupabase, interval: float = 60) -> OrderFeed:
+    cache = OrderCache(
+        loader=source.load, delta_loader=source.load_since, version_probe=source.probe, ttl=60
+    )
+    return OrderFeed(cache, interval=interval)
+
+
+async def test_one_poll_reaches_every_waiter():
+    """1回の問い合わせで待っている全セッションに新しいデータセットが届くことを確認."""
+    source = CountingSupabase(_rows())
+    feed = _feed(source)
+    await feed.poll_once()
+    first = source.probes + source.full_loads
+    version = feed.dataset.version
+
+    waiters = [asyncio.ensure_future(feed.wait_for_change(version)) for _ in range(500)]
+    await asyncio.sleep(0)
+    assert feed.waiters == 500
+
+    source.rows = source.rows + [_row("b", 1000, "2025-12-27", "2026-01-02T00:00:00+00:00")]
+    assert await feed.poll_once()
+    datasets = await asyncio.gather(*waiters)
+
+    assert source.probes + source.full_loads + source.delta_loads == first + 2
+    assert all(ds is datasets[0] for ds in datasets)
+    assert datasets[0].total_amount == 10000
+    assert feed.waiters == 0
+
+
+async def test_unchanged_data_is_not_published():
+    """データが変わらなければ配信せず、待機はtimeoutでNoneを返すことを確認."""
+    source = CountingSupabase(_rows())
+    feed = _feed(source)
+    await feed.poll_once()
+    version = feed.dataset.version
+
+    waiter = asyncio.ensure_future(feed.wait_for_change(version, timeout=0.05))
+    await asyncio.sleep(0)
+    assert not await feed.poll_once()
+
+    assert await waiter is None
+    # 古いバージョンを持つセッションにはすぐに最新を返す
+    assert (await feed.wait_for_change("old")).version == version
+
+
+async def test_run_polls_only_while_someone_is_waiting():
+    """待っているセッションが無い間はSupabaseに問い合わせないことを確認."""
+    source = CountingSupabase(_rows())
+    feed = _feed(source, interval=0.01)
+    task = asyncio.ensure_future(feed.run())
+    try:
+        await asyncio.sleep(0.05)
+        assert source.full_loads == source.probes == 0
+
+        dataset = await feed.wait_for_change("", timeout=1)
+        assert dataset.total_amount == 9000
+        assert source.full_loads == 1
+    finally:
+        task.cancel()
+
+
+async def test_waiters_never_receive_an_older_dataset():
+    """キャッシュより古いデータセットが配信されても、待機側には渡さないことを確認."""
+    source = CountingSupabase(_rows())
+    feed = _feed(source)
+    old = build_dataset(source.rows)
+    source.rows = source.rows + [_row("b", 1000, "2025-12-27", "2026-01-02T00:00:00+00:00")]
+    await feed.poll_once()
+    current = feed.dataset.version
+
+    feed.publish(old)
+    assert await feed.wait_for_change(current, timeout=0.05) is None
+    assert (await feed.wait_for_change(old.version)).version == current
+
+
+async def test_cache_updates_outside_the_poller_reach_waiters():
+    """セッションのfetch・refreshでキャッシュが更新されても待機側に届くことを確認."""
+    source = CountingSupabase(_rows())
+    feed = _feed(source)
+    await feed.poll_once()
+
+    waiter = asyncio.ensure_future(feed.wait_for_change(feed.dataset.version, timeout=1))
+    await asyncio.sleep(0)
+    source.rows = source.rows + [_row("b", 1000, "2025-12-27", "2026-01-02T00:00:00+00:00")]
+    await feed._cache.get(force=True)
+
+    assert (await waiter).total_amount == 10000
@@ -0,0 +1,90 @@
+"""計測（metrics）とログ設定のテスト."""
+
+import json
+import logging
+
+import httpx
+
+from management_dashboard import metrics
+from management_dashboard.dataset import build_dataset
+from management_dashboard.json_stream import iter_json_array
+from management_dashboard.kpi_api import create_kpi_api
+from management_dashboard.logging_config import JsonFormatter, KeyValueFormatter
+from management_dashboard.metrics import METRICS_PATH, SPAN_SECONDS, Registry, span
+from tests.test_order_cache import _rows
+
+
+def test_render_prometheus_text():
+    """カウンタとヒストグラムがPrometheusのテキスト形式で出力されることを確認."""
+    registry = Registry(enabled=True)
+    requests = registry.counter("requests_total", "Requests.", ["path"])
+    latency = registry.histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0))
+    requests.inc("/api/kpi")
+    requests.inc("/api/kpi", amount=2)
+    latency.observe(0.05)
+    latency.observe(0.5)
+    latency.observe(3.0)
+
+    lines = registry.render().splitlines()
+    assert "# TYPE requests_total counter" in lines
+    assert 'requests_total{path="/api/kpi"} 3' in lines
+    assert 'latency_seconds_bucket{le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{le="1.0"} 2' in lines
+    assert 'latency_seconds_bucket{le="+Inf"} 3' in lines
+    assert "latency_seconds_count 3" in lines
+    assert "latency_seconds_sum 3.55" in lines
+
+
+def test_disabled_span_records_nothing(monkeypatch):
+    """無効の間は共有の空のコンテキストを返し、何も記録しないことを確認."""
+    monkeypatch.setattr(metrics.registry, "enabled", False)
+    before = SPAN_SECONDS.count("parse")
+
+    assert span("parse") is span("aggregate")
+    build_dataset(_rows())
+    assert SPAN_SECONDS.count("parse") == before
+
+
+async def test_spans_and_metrics_endpoint(monkeypatch):
+    """有効ならパース・集計・デコードの時間が記録され、/metricsで読めることを確認."""
+    monkeypatch.setattr(metrics.registry, "enabled", True)
+    before = {name: SPAN_SECONDS.count(name) for name in ("parse", "aggregate", "decode")}
+
+    build_dataset(_rows())
+
+    async def chunks():
+        yield b'[{"a": 1},'
+        yield b'{"b": 2}]'
+
+    assert [item async for item in iter_json_array(chunks())] == [{"a": 1}, {"b": 2}]
+    for name, count in before.items():
+        assert SPAN_SECONDS.count(name) == count + 1, name
+
+    transport = httpx.ASGITransport(app=create_kpi_api(lambda: None))
+    async with httpx.AsyncClient(transport=transport, base_url="http://dashboard") as client:
+        response = await client.get(METRICS_PATH)
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        assert 'dashboard_span_seconds_count{span="aggregate"}' in response.text
+
+        monkeypatch.setattr(metrics.registry, "enabled", False)
+        assert (await client.get(METRICS_PATH)).status_code == 404
+
+
+def test_log_fields_are_structured():
+    """extraで渡した値がkey=value・JSONの項目として出力されることを確認."""
+    record = logging.LogRecord(
+        "management_dashboard.app", logging.INFO, "", 0, "dataset applied", (), None
+    )
+    record.version = "3:2026-01-01"
+    record.orders = 3
+
+    assert (
+        KeyValueFormatter()
+        .format(record)
+        .endswith("INFO management_dashboard.app dataset applied version=3:2026-01-01 orders=3")
+    )
+    payload = json.loads(JsonFormatter().format(record))
+    assert payload["message"] == "dataset applied"
+    assert payload["level"] == "INFO"
+    assert payload["orders"] == 3
@@ -0,0 +1,77 @@
+"""Notionエクスポートからの一括インポートのテスト."""
+
+import json
+from pathlib import Path
+
+from management_dashboard.notion_export import (
+    convert_export,
+    export_record_to_page,
+    iter_export_records,
+    to_copy_line,
+)
+from management_dashboard.notion_properties import compile_extractor, load_schema, page_to_record
+
+SAMPLE_PATH = Path(__file__).resolve().parent.parent / "data" / "notion_cost_records_sample.json"
+
+
+def _write_export(tmp_path, records: list[dict]):
+    path = tmp_path / "export.json"
+    export = {"database_id": "db", "record_count": len(records), "records": records}
+    path.write_text(json.dumps(export, ensure_ascii=False, indent=2), encoding="utf-8")
+    return path
+
+
+def test_iter_export_records_streams_across_buffer_boundaries():
+    """小さい読み込み単位でも全件をファイルの順に読み出せることを確認."""
+    with open(SAMPLE_PATH, encoding="utf-8") as f:
+        expected = json.load(f)["records"]
+
+    assert list(iter_export_records(SAMPLE_PATH, read_size=64)) == expected
+
+
+def test_export_converts_like_api_sync():
+    """エクスポートからの変換結果がAPI形式のページを変換した結果と同じになることを確認."""
+    schema = load_schema()
+    record = next(iter_export_records(SAMPLE_PATH))
+    expected = page_to_record(export_record_to_page(record, schema), compile_extractor(schema), "")
+
+    assert expected["properties"]["ToDoDB"] == record["ToDoDB"]
+    assert expected["properties"]["CL"] == ["KNOT", "大関鞄工房"]
+    assert expected["properties"]["総支給額"] == 9000
+
+    (records, count, errors), *_ = convert_export(SAMPLE_PATH, workers=1, chunk_size=1)
+    assert (count, errors) == (1, 0)
+    assert records[0]["content_hash"] == expected["content_hash"]
+
+
+def test_convert_export_in_processes_keeps_order(tmp_path):
+    """複数プロセスで変換しても読み出し順にチャンクが返ることを確認."""
+    records = [
+        {"id": f"page-{i}", "発注決裁名": f"案件{i}", "総支給額": i * 100} for i in range(25)
+    ]
+    path = _write_export(tmp_path, records)
+
+    chunks = list(convert_export(path, "ndjson", workers=2, chunk_size=4))
+
+    assert [count for _, count, _ in chunks] == [4, 4, 4, 4, 4, 4, 1]
+    lines = "".join(payload for payload, _, _ in chunks).splitlines()
+    assert [json.loads(line)["notion_id"] for line in lines] == [r["id"] for r in records]
+
+
+def test_copy_line_escapes_text_format():
+    """COPYのtext形式で区切り文字・改行・NULLがエスケープされることを確認."""
+    record = {
+        "notion_id": "page-1",
+        "properties": {"メモ": "a\tb\nc\\d"},
+        "content_hash": "abc",
+        "notion_created_at": None,
+        "notion_updated_at": "2025-12-01T00:00:00.000Z",
+        "synced_at": "2025-12-02T00:00:00+00:00",
+    }
+
+    fields = to_copy_line(record).rstrip("\n").split("\t")
+
+    assert fields[0] == "page-1"
+    assert fields[1] == '{"メモ":"a\\\\tb\\\\nc\\\\\\\\d"}'
+    assert fields[3] == "\\N"
+    assert len(fields) == 6
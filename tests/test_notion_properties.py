@@ -0,0 +1,60 @@
+"""Notionプロパティ抽出テーブルのテスト."""
+
+from management_dashboard.notion_properties import compile_extractor, content_hash, load_schema
+
+extract = compile_extractor(load_schema())
+
+
+def _text(text: str) -> list[dict]:
+    return [{"type": "text", "plain_text": text}]
+
+
+def test_schema_types_are_extracted():
+    """relation・checkbox・created_time・rollupなども取り出せることを確認."""
+    properties = {
+        "発注決裁名": {"type": "title", "title": _text("【ゴールド】") + _text("商品入稿")},
+        "ToDoDB": {"type": "relation", "relation": [{"id": "todo-1"}, {"id": "todo-2"}]},
+        "担当者": {"type": "people", "people": [{"name": "渡邉英寿"}]},
+        "総支給額": {"type": "formula", "formula": {"type": "number", "number": 0}},
+        "CL": {
+            "type": "rollup",
+            "rollup": {
+                "type": "array",
+                "function": "show_original",
+                "array": [
+                    {"type": "select", "select": {"name": "KNOT"}},
+                    {"type": "select", "select": None},
+                    {"type": "rich_text", "rich_text": _text("WEB")},
+                ],
+            },
+        },
+        "完了": {"type": "checkbox", "checkbox": False},
+        "作成日時": {"type": "created_time", "created_time": "2025-12-16T01:56:00.000Z"},
+        "申請日": {"type": "date", "date": {"start": "2025-12-26", "end": None}},
+        "発注採択理由": {"type": "rich_text", "rich_text": []},
+        "MBDB": {"type": "relation", "relation": []},
+    }
+
+    assert extract(properties) == {
+        "発注決裁名": "【ゴールド】商品入稿",
+        "ToDoDB": ["todo-1", "todo-2"],
+        "担当者": ["渡邉英寿"],
+        "総支給額": 0,
+        "CL": ["KNOT", "WEB"],
+        "完了": False,
+        "作成日時": "2025-12-16T01:56:00.000Z",
+        "申請日": "2025-12-26",
+    }
+
+
+def test_changed_type_falls_back_to_page_type():
+    """スキーマと型が違うプロパティはページ側の型で取り出すことを確認."""
+    properties = {"職務範囲": {"type": "multi_select", "multi_select": [{"name": "採用"}]}}
+
+    assert extract(properties) == {"職務範囲": ["採用"]}
+
+
+def test_content_hash_is_stable():
+    """キーの順序が違っても同じハッシュになることを確認."""
+    assert content_hash({"a": 1, "b": ["x"]}) == content_hash({"b": ["x"], "a": 1})
+    assert content_hash({"a": 1}) != content_hash({"a": 2})
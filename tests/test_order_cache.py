@@ -0,0 +1,131 @@
+"""共有発注キャッシュのテスト."""
+
+import asyncio
+
+from management_dashboard.dataset import DatasetBuilder, build_dataset
+from management_dashboard.order_cache import OrderCache
+
+
+def _row(notion_id: str, amount: int, date: str, synced_at: str) -> dict:
+    return {
+        "notion_id": notion_id,
+        "properties": {"総支給額": amount, "申請日": date, "発注決裁名": f"案件{notion_id}"},
+        "synced_at": synced_at,
+    }
+
+
+def _rows(synced_at: str = "2026-01-01T00:00:00+00:00") -> list[dict]:
+    return [_row("a", 9000, "2025-12-26", synced_at)]
+
+
+class FakeSupabase:
+    """呼び出し回数を数えるローダー."""
+
+    def __init__(self, rows: list[dict]):
+        self.rows = rows
+        self.full_loads = 0
+        self.delta_loads = 0
+
+    async def load(self, builder: DatasetBuilder):
+        self.full_loads += 1
+        await asyncio.sleep(0.01)
+        builder.add_rows(self.rows)
+
+    async def load_since(self, watermark: str) -> list[dict]:
+        self.delta_loads += 1
+        return [r for r in self.rows if r["synced_at"] >= watermark]
+
+    async def probe(self) -> str:
+        return build_dataset(self.rows).version
+
+
+async def test_concurrent_gets_share_one_fetch():
+    """同時取得は1回のfetchを共有することを確認."""
+    source = FakeSupabase(_rows())
+    cache = OrderCache(loader=source.load, ttl=60)
+
+    results = await asyncio.gather(*(cache.get() for _ in range(10)))
+
+    assert source.full_loads == 1
+    assert all(ds is results[0] for ds in results)
+    assert results[0].total_amount == 9000
+
+
+async def test_ttl_and_force_refresh():
+    """TTL内はキャッシュを返し、force指定で再取得することを確認."""
+    source = FakeSupabase(_rows())
+    cache = OrderCache(loader=source.load, ttl=60)
+
+    await cache.get()
+    await cache.get()
+    assert source.full_loads == 1
+
+    await cache.get(force=True)
+    assert source.full_loads == 2
+
+
+async def test_unchanged_version_keeps_dataset():
+    """データバージョンが同じなら全件取得しないことを確認."""
+    source = FakeSupabase(_rows())
+    cache = OrderCache(loader=source.load, version_probe=source.probe, ttl=0)
+
+    first = await cache.get()
+    second = await cache.get()
+    assert second is first
+    assert source.full_loads == 1
+
+    source.rows = _rows(synced_at="2026-01-02T00:00:00+00:00")
+    third = await cache.get()
+    assert third is not first
+
+
+async def test_changed_rows_are_merged_incrementally():
+    """変更行だけを取得してマージし、全件集計と同じ結果になることを確認."""
+    source = FakeSupabase(
+        [
+            _row("a", 1000, "2025-12-01", "2026-01-01T00:00:00+00:00"),
+            _row("b", 2000, "2025-12-02", "2026-01-01T00:00:00+00:00"),
+        ]
+    )
+    cache = OrderCache(
+        loader=source.load, delta_loader=source.load_since, version_probe=source.probe, ttl=0
+    )
+    await cache.get()
+
+    # bを更新（金額・月が変わる）、cを追加
+    source.rows = [
+        source.rows[0],
+        _row("b", 5000, "2025-11-30", "2026-01-02T00:00:00+00:00"),
+        _row("c", 300, "2025-12-01", "2026-01-02T00:00:01+00:00"),
+    ]
+    dataset = await cache.get()
+
+    assert source.full_loads == 1
+    assert source.delta_loads == 1
+    expected = build_dataset(source.rows)
+    assert dataset.version == expected.version
+    assert dataset.total_amount == expected.total_amount == 6300
+    assert dataset.monthly_agg == expected.monthly_agg
+    assert dataset.daily_agg == expected.daily_agg
+    assert [o.notion_id for o in dataset.orders] == ["c", "b", "a"]
+
+
+async def test_deleted_rows_trigger_full_reload():
+    """削除で件数が合わない場合は全件を取り直すことを確認."""
+    source = FakeSupabase(
+        [
+            _row("a", 1000, "2025-12-01", "2026-01-01T00:00:00+00:00"),
+            _row("b", 2000, "2025-12-02", "2026-01-01T00:00:00+00:00"),
+        ]
+    )
+    cache = OrderCache(
+        loader=source.load, delta_loader=source.load_since, version_probe=source.probe, ttl=0
+    )
+    await cache.get()
+
+    source.rows = [_row("c", 300, "2025-12-01", "2026-01-02T00:00:00+00:00")]
+    dataset = await cache.get()
+
+    assert source.full_loads == 2
+    assert dataset.total_count == 1
+    assert dataset.total_amount == 300
@@ -0,0 +1,97 @@
+"""RPC集計（order_period_totals）とPython集計の突き合わせ（Postgresが必要）.
+
+test_bulk_load.py と同じくTEST_DATABASE_URLのPostgresで実行する。
+"""
+
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+from management_dashboard.dataset import build_dataset
+from management_dashboard.periods import parse_date
+
+psycopg = pytest.importorskip("psycopg")
+
+DSN = os.getenv("TEST_DATABASE_URL")
+pytestmark = pytest.mark.skipif(not DSN, reason="TEST_DATABASE_URL not set")
+
+MIGRATION = (
+    Path(__file__).resolve().parent.parent
+    / "supabase"
+    / "migrations"
+    / "20250108000000_create_order_period_totals.sql"
+)
+
+# 申請日として入りうる値（正しい日付・ゼロ埋めしていない日付・実在しない日付など）
+DATE_INPUTS = [
+    "2024-01-05",
+    "2024-02-29",
+    "2025-12-28",
+    "0001-01-01",
+    "2024-1-5",
+    "2024-01- 5",
+    " 2024-01-05",
+    "2024-01-05T00:00:00",
+    "2024/01/05",
+    "20240105",
+    "２０２４-０１-０５",
+    "2025-02-29",
+    "2024-13-01",
+    "0000-01-01",
+    "",
+    "-",
+]
+
+
+@pytest.fixture
+def database():
+    with psycopg.connect(DSN, autocommit=True) as conn:
+        for role in ("anon", "authenticated"):
+            conn.execute(
+                f"DO $$ BEGIN CREATE ROLE {role}; EXCEPTION WHEN duplicate_object THEN NULL; END $$"
+            )
+        conn.execute("DROP TABLE IF EXISTS notion_orders CASCADE")
+        conn.execute(
+            "CREATE TABLE notion_orders (notion_id TEXT UNIQUE NOT NULL, properties JSONB NOT NULL,"
+            " synced_at TIMESTAMPTZ DEFAULT NOW())"
+        )
+        conn.execute(MIGRATION.read_text(encoding="utf-8"))
+        yield conn
+
+
+def test_try_cast_date_matches_parse_date(database):
+    """try_cast_dateとparse_dateが同じ値を日付として受け付けることを確認."""
+    for value in DATE_INPUTS:
+        (cast,) = database.execute("SELECT try_cast_date(%s)", (value,)).fetchone()
+        assert cast == parse_date(value), value
+
+
+def test_rpc_totals_match_python_totals(database):
+    """同じ行をRPCとPythonで集計した結果が一致することを確認."""
+    rows = [
+        {
+            "notion_id": f"id-{i}",
+            "properties": {"総支給額": 1000 + i, "申請日": DATE_INPUTS[i % len(DATE_INPUTS)]},
+        }
+        for i in range(200)
+    ]
+    with database.cursor() as cur:
+        cur.executemany(
+            "INSERT INTO notion_orders (notion_id, properties) VALUES (%s, %s)",
+            [(row["notion_id"], json.dumps(row["properties"])) for row in rows],
+        )
+    dataset = build_dataset(rows)
+
+    for granularity, expected, suffix in [
+        ("daily", dataset.daily_agg, ""),
+        ("weekly", dataset.weekly_agg, "週"),
+        ("monthly", dataset.monthly_agg, ""),
+    ]:
+        result = database.execute(
+            "SELECT period, count, total FROM order_period_totals(%s, 1000)", (granularity,)
+        ).fetchall()
+        assert [(f"{p}{suffix}", c, t) for p, c, t in result] == [
+            (a.period, a.count, a.total) for a in expected
+        ], granularity
@@ -0,0 +1,163 @@
+"""期間別集計（ベクトル化）のテスト."""
+
+import random
+from collections import defaultdict
+from datetime import date
+
+from management_dashboard.columns import OrderColumns
+from management_dashboard.dataset import DatasetBuilder, build_dataset, period_keys
+from management_dashboard.models import AggregateItem
+from management_dashboard.periods import parse_date
+
+
+def _reference(orders) -> tuple[list, list, list]:
+    """1件ずつperiod_keysで集計した結果."""
+    buckets = (
+        defaultdict(lambda: [0, 0]),
+        defaultdict(lambda: [0, 0]),
+        defaultdict(lambda: [0, 0]),
+    )
+    for item in orders:
+        keys = period_keys(item.date)
+        if keys is None:
+            continue
+        for bucket, key in zip(buckets, keys, strict=True):
+            bucket[key][0] += 1
+            bucket[key][1] += item.amount
+    return tuple(
+        [
+            AggregateItem(period=f"{k}{suffix}", count=c, total=t)
+            for k, (c, t) in sorted(bucket.items(), reverse=True)
+        ]
+        for bucket, suffix in zip(buckets, ["", "週", ""], strict=True)
+    )
+
+
+def _rows(n: int, seed: int = 0) -> list[dict]:
+    rng = random.Random(seed)
+    dates = [
+        f"{y}-{m:02d}-{d:02d}" for y in (2024, 2025) for m in range(1, 13) for d in (1, 15, 28)
+    ]
+    dates += ["", "-", "2025-02-30", "2025/01/01", "2025-1-5"]
+    return [
+        {
+            "notion_id": str(i),
+            "properties": {"総支給額": rng.randint(0, 100000), "申請日": rng.choice(dates)},
+            "synced_at": f"2026-01-01T00:00:{i % 60:02d}+00:00",
+        }
+        for i in range(n)
+    ]
+
+
+def test_matches_reference_loop():
+    """ベクトル化した集計が1件ずつの集計と一致することを確認."""
+    dataset = build_dataset(_rows(3000))
+
+    daily, weekly, monthly = _reference(dataset.orders)
+
+    assert dataset.daily_agg == daily
+    assert dataset.weekly_agg == weekly
+    assert dataset.monthly_agg == monthly
+    assert dataset.total_amount == sum(o.amount for o in dataset.orders)
+
+
+def test_week_starts_on_monday():
+    """週次の期間が月曜始まりになることを確認（2025-12-28は日曜日）."""
+    dataset = build_dataset(
+        [
+            {"notion_id": "a", "properties": {"総支給額": 100, "申請日": "2025-12-28"}},
+            {"notion_id": "b", "properties": {"総支給額": 200, "申請日": "2025-12-29"}},
+        ]
+    )
+
+    assert [(a.period, a.total) for a in dataset.weekly_agg] == [
+        ("2025-12-29週", 200),
+        ("2025-12-22週", 100),
+    ]
+    assert [(a.period, a.count) for a in dataset.monthly_agg] == [("2025-12", 2)]
+
+
+def test_merged_rows_replace_old_contribution():
+    """差分マージ後の集計が全件から作り直した集計と一致することを確認."""
+    rows = _rows(500)
+    changed = [
+        {**row, "properties": {**row["properties"], "申請日": "2026-01-05"}} for row in rows[:50]
+    ]
+
+    builder = DatasetBuilder()
+    builder.add_rows(rows)
+    builder.build()
+    builder.merge_rows(changed)
+    merged = builder.build()
+
+    expected = build_dataset(changed + rows[50:])
+    assert merged.daily_agg == expected.daily_agg
+    assert merged.weekly_agg == expected.weekly_agg
+    assert merged.monthly_agg == expected.monthly_agg
+    assert merged.total_amount == expected.total_amount
+
+
+def test_merge_patches_columns_without_rebuilding(monkeypatch):
+    """差分マージが全件の列データを作り直さず、全件から作った結果と同じになることを確認."""
+    rows = _rows(500)
+    changed = [
+        {
+            **row,
+            "properties": {**row["properties"], "申請日": "2026-01-05", "総支給額": 7},
+            "synced_at": "2026-01-02T00:00:00+00:00",
+        }
+        for row in rows[100:140]
+    ]
+    added = [{**rows[0], "notion_id": "new", "synced_at": "2026-01-03T00:00:00+00:00"}]
+
+    builder = DatasetBuilder()
+    builder.add_rows(rows)
+    builder.build()
+
+    def rebuild(orders):
+        raise AssertionError("差分マージで全件の列データを作り直した")
+
+    monkeypatch.setattr(OrderColumns, "from_orders", rebuild)
+    builder.merge_rows(changed + added)
+    merged = builder.build()
+    monkeypatch.undo()
+
+    expected = build_dataset(added + changed + rows[:100] + rows[140:])
+    assert merged.orders == expected.orders
+    assert merged.daily_agg == expected.daily_agg
+    assert merged.weekly_agg == expected.weekly_agg
+    assert merged.total_amount == expected.total_amount
+    assert builder.count == 501
+
+
+def test_merge_drops_unused_filter_labels():
+    """置き換えで使われなくなったステータスがラベル表から消えることを確認."""
+    builder = DatasetBuilder()
+    builder.add_rows(
+        [
+            {"notion_id": "a", "properties": {"発注ステータス": "未着手"}},
+            {"notion_id": "b", "properties": {"発注ステータス": "完了"}},
+        ]
+    )
+    builder.build()
+    builder.merge_rows([{"notion_id": "a", "properties": {"発注ステータス": "完了"}}])
+
+    columns = builder.build().columns
+    assert columns.status_labels == ["完了"]
+    assert [item.status for item in columns.to_items()] == ["完了", "完了"]
+
+
+def test_parse_date_accepts_only_zero_padded_dates():
+    """申請日はゼロ埋めのYYYY-MM-DDで実在する日付だけを受け付けることを確認（RPC集計と同じ規則）."""
+    assert parse_date("2024-01-05") == date(2024, 1, 5)
+    for value in [
+        "2024-1-5",
+        "2024-01- 5",
+        "２０２４-０１-０５",
+        "20240105",
+        "2025-02-29",
+        "-",
+        "",
+    ]:
+        assert parse_date(value) is None, value
+    assert period_keys("2024-1-5") is None
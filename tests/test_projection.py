@@ -0,0 +1,53 @@
+"""notion_ordersの射影のテスト."""
+
+from management_dashboard.dataset import build_dataset, parse_order
+from management_dashboard.projection import ORDER_PROJECTION_SELECT, project_row
+
+
+def _row(i: int, **properties) -> dict:
+    return {
+        "notion_id": f"id-{i}",
+        "properties": {
+            "発注決裁名": f"案件{i}",
+            "職務範囲": "採用",
+            "総支給額": i * 100,
+            "申請日": "2025-12-01",
+            "発注ステータス": "納品済",
+            "発注/依頼媒体": "タイミー",
+            "ToDoDB": ["2d540a7c-b53e-8023-962f-c7b17b21ab72"] * 3,
+            "要件": "長い説明" * 100,
+            **properties,
+        },
+        "synced_at": "2026-01-01T00:00:00+00:00",
+    }
+
+
+def test_select_uses_json_paths():
+    """propertiesを丸ごとではなく、使うキーだけをJSONパスで指定することを確認."""
+    columns = ORDER_PROJECTION_SELECT.split(",")
+
+    assert "properties" not in columns
+    assert "amount:properties->総支給額" in columns
+    assert "date:properties->>申請日" in columns
+    # スラッシュを含むキーはダブルクォートで囲む
+    assert 'platform:properties->>"発注/依頼媒体"' in columns
+
+
+def test_projected_rows_parse_like_full_rows():
+    """射影した行からも、propertiesを丸ごと持つ行と同じOrderItemになることを確認."""
+    rows = [
+        _row(1),
+        _row(2, 総支給額="5400.0", 職務範囲=None),
+        _row(3, 総支給額=None, 申請日="", 発注ステータス="-"),
+        _row(4, 総支給額="abc"),
+        {"notion_id": "id-5", "properties": {}, "synced_at": ""},
+    ]
+
+    for row in rows:
+        assert parse_order(project_row(row)) == parse_order(row)
+
+    projected = build_dataset([project_row(row) for row in rows])
+    full = build_dataset(rows)
+    assert projected.columns.to_items() == full.columns.to_items()
+    assert projected.monthly_agg == full.monthly_agg
+    assert "ToDoDB" not in str(project_row(rows[0]))
@@ -0,0 +1,73 @@
+"""レート制限・リトライのテスト."""
+
+import time
+
+import httpx
+import pytest
+
+from management_dashboard.retry import (
+    RetryPolicy,
+    TokenBucket,
+    request_with_retry,
+    retry_after_seconds,
+)
+
+NO_WAIT = RetryPolicy(max_attempts=4, base_delay=0)
+
+
+def _client(statuses: list[int], headers: dict | None = None) -> tuple[httpx.AsyncClient, list]:
+    calls: list[int] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        status = statuses[min(len(calls), len(statuses) - 1)]
+        calls.append(status)
+        return httpx.Response(status, headers=headers or {})
+
+    return httpx.AsyncClient(base_url="http://api", transport=httpx.MockTransport(handler)), calls
+
+
+async def test_retries_until_success(caplog):
+    """429・5xxは再試行して成功したレスポンスを返し、再試行をログに残すことを確認."""
+    client, calls = _client([429, 503, 200], headers={"Retry-After": "0"})
+
+    async with client:
+        response = await request_with_retry(client, "GET", "/", policy=NO_WAIT)
+
+    assert response.status_code == 200
+    assert calls == [429, 503, 200]
+    retries = [r for r in caplog.records if r.name == "management_dashboard.retry"]
+    assert [r.status for r in retries] == [429, 503]
+
+
+async def test_gives_up_after_max_attempts():
+    """試行回数を使い切ったら最後のレスポンスを返し、4xxは再試行しないことを確認."""
+    client, calls = _client([502])
+    async with client:
+        response = await request_with_retry(client, "GET", "/", policy=NO_WAIT)
+    assert response.status_code == 502
+    assert len(calls) == 4
+
+    client, calls = _client([400])
+    async with client:
+        response = await request_with_retry(client, "GET", "/", policy=NO_WAIT)
+    assert calls == [400]
+
+
+def test_retry_after_formats():
+    """Retry-Afterの秒数・HTTP日付を解釈することを確認."""
+    assert retry_after_seconds(httpx.Response(429, headers={"Retry-After": "1.5"})) == 1.5
+    past = {"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"}
+    assert retry_after_seconds(httpx.Response(429, headers=past)) == 0.0
+    assert retry_after_seconds(httpx.Response(429)) is None
+
+
+async def test_token_bucket_limits_rate():
+    """バースト分を使い切った後はrate req/sに抑えられることを確認."""
+    bucket = TokenBucket(rate=50, capacity=5)
+
+    started = time.monotonic()
+    for _ in range(15):
+        await bucket.acquire()
+
+    # 5件はすぐ、残り10件は1/50秒ずつ
+    assert time.monotonic() - started == pytest.approx(0.2, abs=0.08)
@@ -0,0 +1,161 @@
+"""集計キューブ（RollupCube）のテスト."""
+
+import random
+
+import pytest
+
+from management_dashboard.dataset import build_dataset, period_keys
+from management_dashboard.management_dashboard import FILTER_ALL, State
+from tests.test_periods import _reference
+
+
+def _rows(n: int, seed: int = 0) -> list[dict]:
+    rng = random.Random(seed)
+    dates = [
+        f"{y}-{m:02d}-{d:02d}" for y in (2024, 2025) for m in range(1, 13) for d in (1, 9, 15, 28)
+    ]
+    dates += ["", "-", "2025-02-30"]
+    return [
+        {
+            "notion_id": str(i),
+            "properties": {
+                "総支給額": rng.randint(0, 100000),
+                "申請日": rng.choice(dates),
+                "職務範囲": rng.choice(["撮影", "編集", "デザイン"]),
+                "発注ステータス": rng.choice(["発注済", "納品済", "支払済"]),
+                "発注/依頼媒体": rng.choice(["メール", "Slack"]),
+            },
+            "synced_at": "2026-01-01T00:00:00+00:00",
+        }
+        for i in range(n)
+    ]
+
+
+def _matches(order, date_from="", date_to="", scope="", status="", platform="") -> bool:
+    if scope and order.scope != scope:
+        return False
+    if status and order.status != status:
+        return False
+    if platform and order.platform != platform:
+        return False
+    if date_from or date_to:
+        return period_keys(order.date) is not None and (
+            (not date_from or order.date >= date_from) and (not date_to or order.date <= date_to)
+        )
+    return True
+
+
+def test_series_matches_period_aggregates():
+    """フィルタ無しの日次・週次・月次がデータセットの期間別集計と一致することを確認."""
+    dataset = build_dataset(_rows(3000))
+    cube = dataset.cube
+
+    assert cube.series("daily") == dataset.daily_agg
+    assert cube.series("weekly") == dataset.weekly_agg
+    assert cube.series("monthly") == dataset.monthly_agg
+    assert cube.totals() == (dataset.total_count, dataset.total_amount)
+
+
+@pytest.mark.parametrize(
+    "filters",
+    [
+        {"scope": "撮影"},
+        {"status": "支払済", "platform": "Slack"},
+        {"date_from": "2024-06-01", "date_to": "2025-03-15"},
+        {"date_from": "2025-01-09", "scope": "編集", "status": "発注済"},
+        {"date_to": "2024-01-01"},
+    ],
+)
+def test_filtered_slices_match_brute_force(filters):
+    """フィルタ・期間指定の集計が1件ずつ数えた結果と一致することを確認."""
+    dataset = build_dataset(_rows(3000, seed=1))
+    hits = [o for o in dataset.orders if _matches(o, **filters)]
+
+    assert dataset.cube.totals(**filters) == (len(hits), sum(o.amount for o in hits))
+    for series, expected in zip(
+        [dataset.cube.series(g, **filters) for g in ("daily", "weekly", "monthly")],
+        _reference(hits),
+        strict=True,
+    ):
+        assert series == expected
+
+
+def test_weekly_bucket_crossing_range_start():
+    """期間の途中から始まる週も月曜の週ラベルにまとまることを確認（2025-12-31は水曜日）."""
+    dataset = build_dataset(
+        [
+            {"notion_id": "a", "properties": {"総支給額": 100, "申請日": "2025-12-29"}},
+            {"notion_id": "b", "properties": {"総支給額": 200, "申請日": "2025-12-31"}},
+            {"notion_id": "c", "properties": {"総支給額": 400, "申請日": "2026-01-02"}},
+        ]
+    )
+
+    assert [(a.period, a.total) for a in dataset.cube.series("weekly", date_from="2025-12-30")] == [
+        ("2025-12-29週", 600)
+    ]
+    assert [(a.period, a.total) for a in dataset.cube.series("monthly")] == [
+        ("2026-01", 400),
+        ("2025-12", 300),
+    ]
+
+
+def test_outlier_dates_do_not_stretch_the_day_axis():
+    """誤入力の古い日付があっても日の軸は発注のある日付の数で済むことを確認."""
+    rows = _rows(1000, seed=2)
+    rows[0]["properties"]["申請日"] = "1925-01-01"
+    rows[1]["properties"]["申請日"] = "0001-01-01"
+    dataset = build_dataset(rows)
+    cube = dataset.cube
+
+    assert cube.n_days == len(dataset.daily_agg)
+    assert cube.series("monthly") == dataset.monthly_agg
+    assert cube.series("weekly") == dataset.weekly_agg
+    hits = [o for o in dataset.orders if _matches(o, date_from="1900-01-01", date_to="2024-01-09")]
+    assert cube.totals("1900-01-01", "2024-01-09") == (len(hits), sum(o.amount for o in hits))
+    assert [a.period for a in cube.series("monthly", date_to="1999-12-31")] == [
+        "1925-01",
+        "0001-01",
+    ]
+
+
+def test_unknown_label_and_empty_range():
+    """存在しないラベルや空の期間は0件になることを確認."""
+    cube = build_dataset(_rows(200)).cube
+
+    assert cube.totals(scope="存在しない") == (0, 0)
+    assert cube.series("daily", scope="存在しない") == []
+    assert cube.totals(date_from="2025-06-01", date_to="2025-05-01") == (0, 0)
+    assert cube.series("monthly", date_from="2030-01-01") == []
+    with pytest.raises(ValueError):
+        cube.series("yearly")
+
+
+def test_state_filters_update_kpis_and_series():
+    """フィルタを変えるとKPIと集計がキューブから更新されることを確認."""
+    state = State(_reflex_internal_init=True)
+    state._process_data(_rows(500))
+    orders = [o for o in build_dataset(_rows(500)).orders if o.scope == "撮影"]
+
+    state.set_filter_scope("撮影")
+    assert state.filters_active
+    assert state.total_count == len(orders)
+    assert state.total_amount == sum(o.amount for o in orders)
+    assert state.current_agg == _reference(orders)[2][:12]
+    assert state.scope_options == ["デザイン", "撮影", "編集"]
+
+    state.clear_filters()
+    assert state.filter_scope == FILTER_ALL
+    assert not state.filters_active
+    assert state.total_count == 500
+
+
+def test_state_builds_cube_only_when_filtering():
+    """フィルタを使うまでキューブを作らないことを確認."""
+    state = State(_reflex_internal_init=True)
+    dataset = build_dataset(_rows(200))
+    state._apply_dataset(dataset)
+    assert state.current_agg == dataset.monthly_agg[:12]
+    assert "cube" not in vars(dataset)
+
+    state.set_date_from("2025-01-01")
+    assert "cube" in vars(dataset)
@@ -0,0 +1,71 @@
+"""発注名検索インデックスのテスト."""
+
+import random
+
+from management_dashboard.dataset import build_dataset
+from management_dashboard.search import SearchIndex, normalize
+
+NAMES = [
+    "【ゴールド_ビジネス】商品入稿 1200〜",
+    "【シルバー_デザイン】バナー制作",
+    "マーケティング施策 SNS運用",
+    "採用広報 記事作成",
+    "ＡＢＣ商品入稿",
+]
+
+
+def test_search_matches_substring_scan():
+    """インデックス検索が線形の部分一致と同じ結果になることを確認."""
+    index = SearchIndex(NAMES)
+
+    for query in ["商品入稿", "入", "ー", "バナー制作", "sns", "abc", "存在しない", "稿 1"]:
+        expected = [i for i, name in enumerate(NAMES) if normalize(query) in normalize(name)]
+        assert index.search(query) == expected, query
+
+
+def test_search_normalizes_width_and_case():
+    """全角・半角や大文字小文字の違いを吸収することを確認."""
+    index = SearchIndex(NAMES)
+
+    assert index.search("abc") == [4]
+    assert index.search("ＳＮＳ") == [2]
+
+
+def test_search_limit_and_empty_query():
+    """件数制限と空クエリの動作を確認."""
+    index = SearchIndex(NAMES)
+
+    assert index.search("", limit=2) == [0, 1]
+    assert index.search("商品", limit=1) == [0]
+
+
+def test_dataset_search_random_names():
+    """ランダムな発注名でもデータセット検索が線形走査と一致することを確認."""
+    rng = random.Random(0)
+    chars = "発注入稿商品デザインバナー採用記事"
+    rows = [
+        {
+            "notion_id": str(i),
+            "properties": {"発注決裁名": "".join(rng.choices(chars, k=rng.randint(1, 12)))},
+        }
+        for i in range(500)
+    ]
+    columns = build_dataset(rows).columns
+
+    for query in ["発注", "バナー", "稿商", "記", "デザイン採用"]:
+        expected = [i for i, name in enumerate(columns.names) if query in name]
+        assert columns.search(query).tolist() == expected, query
+
+
+def test_search_hits_keep_columns():
+    """検索結果の列データから元の発注を復元できることを確認."""
+    columns = build_dataset(
+        [
+            {"notion_id": str(i), "properties": {"発注決裁名": name, "総支給額": i * 100}}
+            for i, name in enumerate(NAMES)
+        ]
+    ).columns
+
+    hits = columns.take(columns.search("商品入稿"))
+
+    assert [(o.notion_id, o.amount) for o in hits.to_items()] == [("0", 0), ("4", 400)]
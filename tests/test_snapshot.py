@@ -0,0 +1,107 @@
+"""ローカルスナップショットのテスト."""
+
+import asyncio
+
+from management_dashboard.dataset import build_dataset
+from management_dashboard.order_cache import OrderCache
+from management_dashboard.snapshot import SnapshotStore
+from tests.test_order_cache import FakeSupabase, _row
+
+ROWS = [
+    _row("a", 1000, "2025-12-01", "2026-01-01T00:00:00+00:00"),
+    _row("b", 2000, "-", "2026-01-01T00:00:01+00:00"),
+    {"notion_id": "c", "properties": {"発注決裁名": "【ゴールド】商品入稿 1200〜", "総支給額": 30}},
+]
+
+
+def test_round_trip(tmp_path):
+    """保存したデータセットが同じ内容で読み戻せることを確認."""
+    dataset = build_dataset(ROWS)
+    store = SnapshotStore(tmp_path / "orders.npz")
+
+    store.save(dataset, "2026-01-01T00:00:01+00:00")
+    restored, watermark = store.load()
+
+    assert watermark == "2026-01-01T00:00:01+00:00"
+    assert restored.version == dataset.version
+    assert restored.orders == dataset.orders
+    assert restored.total_amount == dataset.total_amount
+    assert restored.daily_agg == dataset.daily_agg
+    assert restored.weekly_agg == dataset.weekly_agg
+    assert restored.columns.search("商品入稿").tolist() == [2]
+
+
+def test_missing_or_broken_snapshot(tmp_path):
+    """ファイルが無い・壊れている場合はNoneになることを確認."""
+    path = tmp_path / "orders.npz"
+    assert SnapshotStore(path).load() is None
+
+    path.write_bytes(b"not a snapshot")
+    assert SnapshotStore(path).load() is None
+
+
+async def test_cache_serves_snapshot_then_reconciles(tmp_path):
+    """起動時はスナップショットを即座に返し、裏で差分を取り込むことを確認."""
+    store = SnapshotStore(tmp_path / "orders.npz")
+    store.save(build_dataset(ROWS[:2]), "2026-01-01T00:00:01+00:00")
+
+    source = FakeSupabase(ROWS[:2] + [_row("d", 500, "2025-12-03", "2026-01-02T00:00:00+00:00")])
+    cache = OrderCache(
+        loader=source.load,
+        delta_loader=source.load_since,
+        version_probe=source.probe,
+        snapshot=store,
+        ttl=60,
+    )
+    assert cache.restore()
+
+    first = await cache.get()
+    assert first.total_count == 2
+
+    await asyncio.sleep(0.05)
+    second = await cache.get()
+    assert second.total_count == 3
+    assert source.full_loads == 0
+    assert source.delta_loads == 1
+
+    # 取り込んだ結果が次回起動用に保存される
+    await asyncio.sleep(0.05)
+    saved, watermark = store.load()
+    assert saved.version == second.version
+    assert watermark == "2026-01-02T00:00:00+00:00"
+
+
+async def test_failed_reconcile_is_reported(tmp_path, caplog):
+    """裏で進めた突き合わせが失敗したら記録し、次の取得でやり直すことを確認."""
+    store = SnapshotStore(tmp_path / "orders.npz")
+    store.save(build_dataset(ROWS[:2]), "2026-01-01T00:00:01+00:00")
+
+    source = FakeSupabase(ROWS[:2])
+    probes = 0
+
+    async def probe() -> str:
+        nonlocal probes
+        probes += 1
+        if probes == 1:
+            raise ConnectionError("supabase unreachable")
+        return await source.probe()
+
+    cache = OrderCache(
+        loader=source.load,
+        delta_loader=source.load_since,
+        version_probe=probe,
+        snapshot=store,
+        ttl=60,
+    )
+    assert cache.restore()
+
+    assert (await cache.get()).total_count == 2
+    await asyncio.sleep(0.05)
+    assert cache.reconcile_error == "supabase unreachable"
+    assert "snapshot reconcile failed" in caplog.text
+
+    # 次の取得で突き合わせをやり直し、成功すれば理由は消える
+    await cache.get()
+    await asyncio.sleep(0.05)
+    assert probes == 2
+    assert cache.reconcile_error == ""
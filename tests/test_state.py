@@ -0,0 +1,113 @@
+"""State（ページング・並び替え）のテスト."""
+
+from management_dashboard.management_dashboard import State
+from management_dashboard.state_metrics import state_metrics
+
+
+def _state(n: int = 120) -> State:
+    state = State(_reflex_internal_init=True)
+    state._process_data(
+        [
+            {
+                "notion_id": str(i),
+                "properties": {
+                    "総支給額": i * 10,
+                    "申請日": f"2025-12-{1 + i % 28:02d}",
+                    "発注決裁名": f"案件{i}",
+                },
+                "synced_at": "2026-01-01T00:00:00+00:00",
+            }
+            for i in range(n)
+        ]
+    )
+    return state
+
+
+def test_only_current_page_is_sent():
+    """全件ではなく表示中のページだけが送られることを確認."""
+    state = _state()
+
+    assert len(state.filtered_orders) == state.page_size
+    assert state.filtered_count == 120
+    assert state.page_count == 3
+
+    delta = state.get_delta()[State.get_full_name()]
+    sent = {key.removesuffix("_rx_state_"): value for key, value in delta.items()}
+    assert set(sent) == {
+        "data_loaded",
+        "page",
+        "filtered_orders",
+        "filtered_count",
+        "page_count",
+        "page_range_label",
+        "current_agg",
+        "max_agg_total",
+        "total_count",
+        "total_amount",
+        "total_amount_formatted",
+        "avg_amount",
+        "avg_amount_formatted",
+        "scope_options",
+        "status_options",
+        "platform_options",
+    }
+    assert len(sent["filtered_orders"]) == state.page_size
+    # 全件の列データはバックエンドにだけ置き、全件分のリストは送らない
+    assert not any(key.startswith("_") for key in sent)
+    assert all(
+        len(value) < state.filtered_count for value in sent.values() if isinstance(value, list)
+    )
+
+
+def test_paging_is_clamped():
+    """最終ページより先には進まないことを確認."""
+    state = _state()
+
+    for _ in range(5):
+        state.next_page()
+
+    assert state.page == 2
+    assert len(state.filtered_orders) == 20
+    assert state.page_range_label == "120件中 101〜120件"
+
+
+def test_sort_toggles_direction():
+    """同じ列を選び直すと昇順・降順が切り替わることを確認."""
+    state = _state()
+
+    state.set_sort("amount")
+    assert state.filtered_orders[0].amount == 1190
+
+    state.set_sort("amount")
+    assert state.filtered_orders[0].amount == 0
+    assert state.page == 0
+
+
+def test_unrelated_change_does_not_recompute_views(monkeypatch):
+    """依存していない変数の変更では集計・一覧を再計算せず、差分にも含めないことを確認."""
+    monkeypatch.setattr(state_metrics, "enabled", True)
+    state = _state()
+    state.get_delta()
+    state._clean()
+    state_metrics.reset()
+
+    state.loading = False
+    delta = state.get_delta()
+    state._clean()
+    assert not state_metrics.recomputes
+    assert [name.split("_rx_")[0] for name in state_metrics.last_delta_vars] == ["loading"]
+    assert state_metrics.last_delta_bytes == state_metrics.delta_bytes > 0
+    assert len(next(iter(delta.values()))) == 1
+
+    state.set_agg_mode("daily")
+    state.get_delta()
+    # max_agg_totalはキャッシュ済みのcurrent_aggを読むだけ
+    assert state_metrics.recomputes == {"current_agg": 1, "max_agg_total": 1}
+    assert state.max_agg_total == max(item.total for item in state.current_agg)
+    assert state_metrics.recomputes["current_agg"] == 1
+
+
+def test_kpi_cards_switch_to_state_once_data_is_applied():
+    """データセットを反映するまではKPIカードが/api/kpiの値を使うことを確認."""
+    assert State(_reflex_internal_init=True).data_loaded is False
+    assert _state().data_loaded is True
@@ -0,0 +1,119 @@
+"""Supabase全件ページング取得のテスト."""
+
+import gzip
+import json
+
+import httpx
+
+from management_dashboard import metrics
+from management_dashboard.dataset import DatasetBuilder
+from management_dashboard.http_client import create_client
+from management_dashboard.projection import ORDER_PROJECTION_SELECT, project_row
+from management_dashboard.supabase_api import (
+    fetch_order_version,
+    fetch_orders_page,
+    iter_order_pages,
+    parse_total,
+)
+
+
+def _postgrest_stub(rows: list[dict]) -> httpx.AsyncClient:
+    """Rangeヘッダに応じて行を返すPostgRESTスタブ."""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        start, end = (int(x) for x in request.headers["Range"].split("-"))
+        if start >= len(rows) and rows:
+            return httpx.Response(416, headers={"Content-Range": f"*/{len(rows)}"})
+        page = rows[start : end + 1]
+        total = str(len(rows)) if "count=exact" in request.headers.get("Prefer", "") else "*"
+        headers = {"Content-Range": f"{start}-{start + len(page) - 1}/{total}"}
+        select = request.url.params["select"]
+        if select == ORDER_PROJECTION_SELECT:
+            return httpx.Response(206, json=[project_row(r) for r in page], headers=headers)
+        columns = select.split(",")
+        return httpx.Response(206, json=[{k: r[k] for k in columns} for r in page], headers=headers)
+
+    return httpx.AsyncClient(base_url="http://stub", transport=httpx.MockTransport(handler))
+
+
+def _rows(n: int) -> list[dict]:
+    return [
+        {
+            "notion_id": f"id-{i:05d}",
+            "properties": {"総支給額": 100, "申請日": "2025-12-01", "発注決裁名": f"案件{i}"},
+            "synced_at": f"2026-01-01T00:00:{59 - i % 60:02d}+00:00",
+        }
+        for i in range(n)
+    ]
+
+
+def test_parse_total():
+    """Content-Rangeから総件数を取り出せることを確認."""
+    assert parse_total("0-999/5234") == 5234
+    assert parse_total("*/0") == 0
+    assert parse_total("0-9/*") is None
+    assert parse_total(None) is None
+
+
+async def test_iter_order_pages_fetches_all_rows():
+    """1000件を超えても全行を取得し、ページ順に集計できることを確認."""
+    rows = _rows(2345)
+    builder = DatasetBuilder()
+
+    async with _postgrest_stub(rows) as client:
+        async for page, page_rows in iter_order_pages(client, page_size=1000):
+            builder.add_rows(page_rows, page=page)
+
+    dataset = builder.build()
+    assert dataset.total_count == 2345
+    assert dataset.total_amount == 234500
+    assert [o.notion_id for o in dataset.orders] == [r["notion_id"] for r in rows]
+
+
+async def test_fetch_order_version_matches_full_load():
+    """バージョン確認が全件取得時のバージョンと一致することを確認."""
+    rows = _rows(30)
+
+    async with _postgrest_stub(rows) as client:
+        builder = DatasetBuilder()
+        async for page, page_rows in iter_order_pages(client, page_size=7):
+            builder.add_rows(page_rows, page=page)
+        version = await fetch_order_version(client)
+
+    assert version == builder.version
+
+
+async def test_gzip_response_is_streamed_into_rows():
+    """gzipで圧縮されたレスポンスも逐次デコードして行にできることを確認."""
+    rows = _rows(50)
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        assert "gzip" in request.headers["Accept-Encoding"]
+        body = gzip.compress(json.dumps(rows).encode())
+        return httpx.Response(
+            200,
+            content=body,
+            headers={"Content-Encoding": "gzip", "Content-Range": "0-49/50"},
+        )
+
+    async with create_client("http://stub", transport=httpx.MockTransport(handler)) as client:
+        page, total = await fetch_orders_page(client, 0, 999, count=True)
+
+    assert page == rows
+    assert total == 50
+
+
+async def test_fetch_with_metrics_enabled(monkeypatch):
+    """メトリクスが有効でもページ取得が動き、fetch_pageの時間が記録されることを確認."""
+    monkeypatch.setattr(metrics.registry, "enabled", True)
+    before = metrics.SPAN_SECONDS.count("fetch_page")
+    rows = _rows(30)
+
+    async with _postgrest_stub(rows) as client:
+        page, total = await fetch_orders_page(client, 0, 9, count=True)
+        version = await fetch_order_version(client)
+
+    assert len(page) == 10
+    assert total == 30
+    assert version.startswith("30:")
+    assert metrics.SPAN_SECONDS.count("fetch_page") == before + 2
@@ -0,0 +1,309 @@
+"""Notion → Supabase 同期スクリプトのテスト."""
+
+import importlib.util
+import json
+from pathlib import Path
+
+import httpx
+import pytest
+
+from management_dashboard.retry import RetryPolicy
+
+_SCRIPT = Path(__file__).resolve().parent.parent / "scripts" / "sync_notion_to_supabase.py"
+_spec = importlib.util.spec_from_file_location("sync_notion_to_supabase", _SCRIPT)
+sync = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(sync)
+
+
+@pytest.fixture(autouse=True)
+def _no_retry_wait(monkeypatch):
+    monkeypatch.setattr(sync, "RETRY_POLICY", RetryPolicy(max_attempts=2, base_delay=0))
+
+
+def _page(i: int) -> dict:
+    return {
+        "id": f"page-{i}",
+        "created_time": "2025-12-01T00:00:00.000Z",
+        "last_edited_time": f"2025-12-{1 + i % 28:02d}T00:00:00.000Z",
+        "properties": {
+            "発注決裁名": {"type": "title", "title": [{"plain_text": f"案件{i}"}]},
+            "総支給額": {"type": "number", "number": i * 100},
+        },
+    }
+
+
+class FakeApis:
+    """NotionのカーソルページングとPostgRESTのupsertを再現する."""
+
+    def __init__(self, n_pages: int, page_size: int = 3):
+        self.pages = [_page(i) for i in range(n_pages)]
+        self.page_size = page_size
+        self.upserted: dict[str, dict] = {}
+        self.upsert_calls = 0
+        # コミットしたupsertごとのsynced_at（コミット順）
+        self.committed_synced_at: list[str] = []
+        self.sync_state: dict = {}
+        self.notion_filters: list = []
+        # 400で拒否するレコードと、500を返し続けるNotionのカーソル
+        self.bad_ids: set = set()
+        self.failing_cursor: str | None = None
+
+    def notion(self, request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        self.notion_filters.append(body.get("filter"))
+        pages = self.pages
+        if body.get("filter"):
+            since = body["filter"]["last_edited_time"]["on_or_after"]
+            pages = sorted(
+                (p for p in pages if p["last_edited_time"] >= since),
+                key=lambda p: p["last_edited_time"],
+            )
+        if body.get("start_cursor") and body["start_cursor"] == self.failing_cursor:
+            return httpx.Response(500)
+        start = int(body.get("start_cursor") or 0)
+        end = start + self.page_size
+        return httpx.Response(
+            200,
+            json={
+                "results": pages[start:end],
+                "has_more": end < len(pages),
+                "next_cursor": str(end) if end < len(pages) else None,
+            },
+        )
+
+    def supabase(self, request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/sync_state":
+            if request.method == "GET":
+                return httpx.Response(200, json=[self.sync_state] if self.sync_state else [])
+            self.sync_state = json.loads(request.content)[0]
+            return httpx.Response(201)
+
+        if request.method == "GET":
+            start, end = map(int, request.headers["Range"].split("-"))
+            ids = sorted(self.upserted)
+            if "notion_id" in request.url.params:
+                wanted = self._in_filter(request)
+                ids = [nid for nid in ids if nid in wanted]
+            rows = [
+                {"notion_id": nid, "content_hash": self.upserted[nid]["content_hash"]}
+                for nid in ids[start : end + 1]
+            ]
+            return httpx.Response(200, json=rows)
+        if request.method == "DELETE":
+            for nid in self._in_filter(request):
+                self.upserted.pop(nid, None)
+            return httpx.Response(204)
+
+        assert request.url.params["on_conflict"] == "notion_id"
+        self.upsert_calls += 1
+        records = json.loads(request.content)
+        if any(r["notion_id"] in self.bad_ids for r in records):
+            return httpx.Response(400, json={"message": "invalid input"})
+        for record in records:
+            self.upserted[record["notion_id"]] = record
+        self.committed_synced_at.extend(r["synced_at"] for r in records)
+        return httpx.Response(201)
+
+    @staticmethod
+    def _in_filter(request: httpx.Request) -> set[str]:
+        ids = request.url.params["notion_id"].removeprefix("in.(").removesuffix(")")
+        return {nid.strip('"') for nid in ids.split(",")}
+
+    def clients(self) -> tuple[httpx.AsyncClient, httpx.AsyncClient]:
+        return (
+            httpx.AsyncClient(base_url="http://notion", transport=httpx.MockTransport(self.notion)),
+            httpx.AsyncClient(
+                base_url="http://supabase", transport=httpx.MockTransport(self.supabase)
+            ),
+        )
+
+
+async def test_pipeline_syncs_every_page():
+    """全ページが変換されてupsertされることを確認."""
+    apis = FakeApis(n_pages=10)
+    notion, supabase = apis.clients()
+
+    async with notion, supabase:
+        stats = await sync.run_pipeline(notion, supabase)
+
+    assert stats.fetched == stats.synced == 10
+    assert stats.errors == 0
+    assert apis.upsert_calls == 4
+    assert apis.upserted["page-7"]["properties"] == {"発注決裁名": "案件7", "総支給額": 700}
+
+
+async def test_upserts_commit_in_synced_at_order():
+    """synced_atの古い行が後からコミットされない（差分取得で取りこぼさない）ことを確認."""
+    apis = FakeApis(n_pages=30)
+    notion, supabase = apis.clients()
+
+    async with notion, supabase:
+        await sync.run_pipeline(notion, supabase)
+
+    assert len(apis.committed_synced_at) == 30
+    assert apis.committed_synced_at == sorted(apis.committed_synced_at)
+
+
+async def test_incremental_sync_uses_high_water_mark():
+    """2回目以降は前回の最大last_edited_time以降だけを取得することを確認."""
+    apis = FakeApis(n_pages=10)
+    notion, supabase = apis.clients()
+
+    async with notion, supabase:
+        first = await sync.run_sync(notion, supabase)
+        assert first.synced == 10
+        assert apis.sync_state["high_water_mark"] == "2025-12-10T00:00:00.000Z"
+        assert apis.notion_filters[0] is None
+
+        apis.pages.append(_page(20))
+        second = await sync.run_sync(notion, supabase)
+
+    assert apis.notion_filters[-1]["last_edited_time"] == {
+        "on_or_after": "2025-12-10T00:00:00.000Z"
+    }
+    # 境界の分に編集されたページは再取得されるが、内容が同じなのでupsertしない
+    assert second.synced == 1
+    assert second.unchanged == 1
+    assert apis.sync_state["high_water_mark"] == "2025-12-21T00:00:00.000Z"
+
+
+async def test_full_sync_deletes_missing_and_archived_pages():
+    """全件同期でNotionから消えたページとアーカイブされたページを削除することを確認."""
+    apis = FakeApis(n_pages=6)
+    notion, supabase = apis.clients()
+
+    async with notion, supabase:
+        await sync.run_sync(notion, supabase, mode="full")
+        apis.pages = [p for p in apis.pages if p["id"] != "page-2"]
+        apis.pages[0]["archived"] = True
+        await sync.run_sync(notion, supabase, mode="full")
+
+    assert sorted(apis.upserted) == ["page-1", "page-3", "page-4", "page-5"]
+
+
+def test_choose_mode():
+    """autoモードでの全件・差分の選択を確認."""
+    now = sync.datetime(2026, 1, 10, tzinfo=sync.UTC)
+
+    assert sync.choose_mode("auto", {}, now) == "full"
+    state = {
+        "high_water_mark": "2026-01-09T00:00:00+00:00",
+        "last_full_sync_at": "2026-01-08T00:00:00+00:00",
+    }
+    assert sync.choose_mode("auto", state, now) == "incremental"
+    assert (
+        sync.choose_mode("auto", {**state, "last_full_sync_at": "2025-12-01T00:00:00+00:00"}, now)
+        == "full"
+    )
+    assert sync.choose_mode("full", state, now) == "full"
+
+
+async def test_failed_batch_is_bisected():
+    """不正なレコードがあってもバッチの残りはupsertされることを確認."""
+    apis = FakeApis(n_pages=8, page_size=8)
+    apis.bad_ids = {"page-5"}
+    notion, supabase = apis.clients()
+
+    async with notion, supabase:
+        stats = await sync.run_pipeline(notion, supabase)
+
+    assert stats.synced == 7
+    assert stats.errors == 1
+    assert "page-5" not in apis.upserted
+
+
+async def test_non_record_error_is_not_bisected():
+    """認証エラーなどレコードによらない失敗では二分割せずに中断することを確認."""
+    calls = 0
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        return httpx.Response(401, json={"message": "invalid JWT"})
+
+    records = [{"notion_id": f"page-{i}"} for i in range(8)]
+    async with httpx.AsyncClient(
+        base_url="http://supabase", transport=httpx.MockTransport(handler)
+    ) as client:
+        with pytest.raises(httpx.HTTPStatusError):
+            await sync.upsert_to_supabase(client, records)
+
+    assert calls == 1
+
+
+async def test_failed_run_resumes_from_cursor():
+    """途中で失敗した同期が次回upsert済みのカーソルから再開することを確認."""
+    apis = FakeApis(n_pages=12)
+    apis.failing_cursor = "6"
+    notion, supabase = apis.clients()
+
+    async with notion, supabase:
+        with pytest.raises(ExceptionGroup):
+            await sync.run_sync(notion, supabase, mode="full")
+        assert apis.sync_state["resume_cursor"] == "6"
+        assert apis.sync_state["resume_mode"] == "full"
+
+        apis.failing_cursor = None
+        stats = await sync.run_sync(notion, supabase)
+
+    assert stats.synced == 6
+    assert len(apis.upserted) == 12
+    assert apis.sync_state["resume_cursor"] is None
+    # 再開した全件同期では全件突き合わせ済みにしない
+    assert apis.sync_state["last_full_sync_at"] is None
+
+
+async def test_unchanged_records_are_not_upserted():
+    """内容が変わっていないレコードは書き込まないことを確認."""
+    apis = FakeApis(n_pages=9)
+    notion, supabase = apis.clients()
+
+    async with notion, supabase:
+        await sync.run_sync(notion, supabase, mode="full")
+        synced_at = apis.upserted["page-0"]["synced_at"]
+        calls = apis.upsert_calls
+
+        apis.pages[4]["properties"]["総支給額"]["number"] = 1
+        stats = await sync.run_sync(notion, supabase, mode="full")
+
+    assert (stats.synced, stats.unchanged) == (1, 8)
+    assert apis.upsert_calls == calls + 1
+    assert apis.upserted["page-0"]["synced_at"] == synced_at
+    assert apis.upserted["page-4"]["properties"]["総支給額"] == 1
+
+
+async def test_import_export_upserts_only_changed_records(tmp_path):
+    """エクスポートからの一括インポートで、Supabaseと同じ内容の行は書き込まないことを確認."""
+    records = [{"id": f"page-{i}", "発注決裁名": f"案件{i}", "総支給額": i * 100} for i in range(7)]
+    path = tmp_path / "export.json"
+    path.write_text(json.dumps({"records": records}, ensure_ascii=False), encoding="utf-8")
+    apis = FakeApis(n_pages=0)
+    _, supabase = apis.clients()
+
+    async with supabase:
+        first = await sync.import_export_to_supabase(supabase, str(path), workers=1, chunk_size=3)
+        again = await sync.import_export_to_supabase(supabase, str(path), workers=1, chunk_size=3)
+
+    assert (first.fetched, first.synced, first.errors) == (7, 7, 0)
+    assert apis.upserted["page-6"]["properties"] == {"発注決裁名": "案件6", "総支給額": 600}
+    assert (again.synced, again.unchanged) == (0, 7)
+
+
+async def test_bulk_mode_streams_every_page_into_copy(monkeypatch):
+    """bulkモードでは全ページをCOPYの行にして1回のロードに流すことを確認."""
+    apis = FakeApis(n_pages=8)
+    notion, _ = apis.clients()
+    loaded: dict = {}
+
+    async def fake_bulk_load(dsn, chunks, *, source=None, high_water_mark=None):
+        loaded["lines"] = "".join([text async for text in chunks]).splitlines()
+        loaded["state"] = (source, high_water_mark())
+        return sync.LoadResult(staged=len(loaded["lines"]), merged=5)
+
+    monkeypatch.setattr(sync, "bulk_load", fake_bulk_load)
+    async with notion:
+        stats = await sync.bulk_load_from_notion(notion, "postgresql://test")
+
+    assert [line.split("\t")[0] for line in loaded["lines"]] == [f"page-{i}" for i in range(8)]
+    assert loaded["state"] == ("notion_orders", "2025-12-08T00:00:00.000Z")
+    assert (stats.synced, stats.unchanged) == (5, 3)